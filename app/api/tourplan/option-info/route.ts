@@ -1,38 +1,77 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { getOptionInfo } from "@/lib/tourplan-api"
+import { tourplanAPI } from "@/lib/tourplan-api"
 
 export const runtime = "nodejs"
 
+// Server-Timing header so callers can split the route's cost from the upstream call
+// (parse = request JSON, upstream = HostConnect, serialize = response JSON)
+function serverTiming(timings: Record<string, number>): string {
+  return Object.entries(timings)
+    .map(([name, dur]) => `${name};dur=${dur.toFixed(2)}`)
+    .join(", ")
+}
+
+function timedJson(body: unknown, init: { status?: number }, timings: Record<string, number>, start: number) {
+  const serializeStart = performance.now()
+  const json = JSON.stringify(body)
+  timings.serialize = performance.now() - serializeStart
+  timings.total = performance.now() - start
+  return new NextResponse(json, {
+    status: init.status ?? 200,
+    headers: {
+      "Content-Type": "application/json",
+      "Server-Timing": serverTiming(timings),
+    },
+  })
+}
+
 export async function POST(request: NextRequest) {
+  const start = performance.now()
+  const timings: Record<string, number> = {}
+
   try {
-    const { tourId } = await request.json()
+    // Accept the tester's HostConnect-style "opt" as well as "tourId"
+    const { tourId, opt, info } = await request.json()
+    const optionId = tourId ?? opt
+    timings.parse = performance.now() - start
 
-    if (!tourId) {
-      return NextResponse.json(
+    if (!optionId) {
+      return timedJson(
         {
           success: false,
           error: "Tour ID is required",
         },
         { status: 400 },
+        timings,
+        start,
       )
     }
 
-    const tourInfo = await getOptionInfo(tourId)
+    const upstreamStart = performance.now()
+    const tourInfo = await tourplanAPI.getOptionInfo(optionId, info)
+    timings.upstream = performance.now() - upstreamStart
 
-    return NextResponse.json({
-      success: true,
-      tour: tourInfo,
-    })
+    return timedJson(
+      {
+        success: true,
+        tour: tourInfo,
+      },
+      {},
+      timings,
+      start,
+    )
   } catch (error) {
     console.error("Option info API error:", error)
 
-    return NextResponse.json(
+    return timedJson(
       {
         success: false,
         error: "Failed to get tour information",
         message: error instanceof Error ? error.message : "Unknown error",
       },
       { status: 500 },
+      timings,
+      start,
     )
   }
 }
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+HostConnect Reply Parser Benchmark
+Measures how fast each XML parser extracts the options of an OptionInfoReply,
+and how much memory it needs, from a single option up to 50,000.
+
+Replies are generated by the stand-in's responder (the same element layout
+Tourplan sends), optionally padded, or taken from the OptionInfoReply bodies
+captured in a cassette. Every parser does the same job - (Opt, SupplierName)
+for each <Option> - and its output is checked against the others. Timing runs
+in this process; peak RSS is measured for each parser and size in a fresh
+child process so earlier runs do not inflate it.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+from hostconnect.parser import iter_options
+from hostconnect.standin import StandinResponder
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # optional: the lxml rows are skipped without it
+    lxml_etree = None
+
+SIZES = (1, 10, 100, 1000, 10000, 50000)
+
+OPTION_RE = re.compile(rb"<Option>(.*?)</Option>", re.S)
+OPT_RE = re.compile(rb"<Opt>(.*?)</Opt>")
+SUPPLIER_RE = re.compile(rb"<SupplierName>(.*?)</SupplierName>")
+
+
+def generate_reply(options, pad_bytes=0):
+    """OptionInfoReply (Info=GS) with the given number of <Option> records"""
+    responder = StandinResponder(search_options=options, pad_bytes=pad_bytes)
+    request = ET.fromstring("<OptionInfoRequest><Info>GS</Info></OptionInfoRequest>")
+    return responder.option_info(request)
+
+
+def captured_replies(cassette_path):
+    """(label, body) of every OptionInfoReply recorded in a cassette"""
+    from hostconnect.cassette import Cassette
+
+    with Cassette(cassette_path, mode="replay", speed=0) as cassette:
+        for interaction in cassette.interactions():
+            if b"<OptionInfoReply" in interaction.response_body[:512]:
+                yield f"captured #{interaction.seq} {interaction.key[-8:]}", interaction.response_body
+
+
+def parse_minidom(body):
+    document = minidom.parseString(body)
+    results = []
+    for option in document.getElementsByTagName("Option"):
+        opt = option.getElementsByTagName("Opt")[0].firstChild
+        supplier = option.getElementsByTagName("SupplierName")
+        supplier = supplier[0].firstChild if supplier else None
+        results.append((opt.data if opt else "", supplier.data if supplier else None))
+    return results
+
+
+def parse_etree(body):
+    root = ET.fromstring(body)
+    return [(option.findtext("Opt"), option.findtext("OptGeneral/SupplierName"))
+            for option in root.iter("Option")]
+
+
+def parse_iterparse(body):
+    results = []
+    for _, elem in ET.iterparse(io.BytesIO(body)):
+        if elem.tag == "Option":
+            results.append((elem.findtext("Opt"), elem.findtext("OptGeneral/SupplierName")))
+            elem.clear()
+    return results
+
+
+def parse_reply_reader(body):
+    """The client's streaming path: full Option dicts via hostconnect.parser"""
+    return [(option.get("Opt"), (option.get("OptGeneral") or {}).get("SupplierName"))
+            for option in iter_options(body)]
+
+
+def parse_lxml(body):
+    root = lxml_etree.fromstring(body)
+    return [(option.findtext("Opt"), option.findtext("OptGeneral/SupplierName"))
+            for option in root.iter("Option")]
+
+
+def parse_lxml_iterparse(body):
+    results = []
+    for _, elem in lxml_etree.iterparse(io.BytesIO(body), tag="Option"):
+        results.append((elem.findtext("Opt"), elem.findtext("OptGeneral/SupplierName")))
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return results
+
+
+def parse_regex(body):
+    results = []
+    for match in OPTION_RE.finditer(body):
+        option = match.group(1)
+        supplier = SUPPLIER_RE.search(option)
+        results.append((OPT_RE.search(option).group(1).decode(),
+                        supplier.group(1).decode() if supplier else None))
+    return results
+
+
+PARSERS = {
+    'minidom': parse_minidom,
+    'etree': parse_etree,
+    'iterparse': parse_iterparse,
+    'reply-reader': parse_reply_reader,
+    'regex': parse_regex,
+}
+if lxml_etree is not None:
+    PARSERS['lxml'] = parse_lxml
+    PARSERS['lxml-iterparse'] = parse_lxml_iterparse
+
+
+def time_parse(func, body, min_time):
+    """Best seconds per parse, repeating until min_time has been spent"""
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while spent < min_time or runs < 3:
+        start = time.perf_counter()
+        func(body)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+def peak_rss_mb(parser_name, body):
+    """Extra peak RSS (MB) of one parse, measured in a fresh interpreter"""
+    with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as f:
+        f.write(body)
+        path = f.name
+    try:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", parser_name, path],
+            capture_output=True, check=True, text=True,
+        ).stdout
+        return json.loads(output)['peak_rss_mb']
+    finally:
+        os.unlink(path)
+
+
+def _rss_kb(field):
+    """VmRSS/VmHWM of this process in KB
+
+    ru_maxrss is not usable here: Linux carries the parent's high-water mark
+    over fork and exec, so every child would report the benchmark's own peak.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(parser_name, path):
+    """Child-process side of peak_rss_mb"""
+    with open(path, "rb") as f:
+        body = f.read()
+    func = PARSERS[parser_name]
+    func(generate_reply(1))  # import-time and first-call allocations are not the parse's
+    before = _rss_kb("VmRSS")
+    func(body)
+    after = _rss_kb("VmHWM")
+    print(json.dumps({'peak_rss_mb': round(max(after - before, 0) / 1024, 1)}))
+
+
+def run(payloads, parsers, min_time, measure_rss):
+    """Time (and optionally measure) every parser on every payload; returns result rows"""
+    rows = []
+    for label, body in payloads:
+        expected = None
+        for name in parsers:
+            func = PARSERS[name]
+            result = func(body)
+            if expected is None:
+                expected = result
+            elif result != expected:
+                raise AssertionError(f"{name} disagrees with {parsers[0]} on {label}")
+            seconds = time_parse(func, body, min_time)
+            rows.append({
+                'payload': label,
+                'parser': name,
+                'options': len(result),
+                'bytes': len(body),
+                'ms': round(seconds * 1000, 3),
+                'mb_per_s': round(len(body) / seconds / 1e6, 1),
+                'options_per_s': round(len(result) / seconds),
+                'peak_rss_mb': peak_rss_mb(name, body) if measure_rss else None,
+            })
+    return rows
+
+
+def print_rows(rows):
+    print(f"{'Payload':<18}{'Parser':<16}{'options':>9}{'KB':>10}{'ms':>11}{'MB/s':>8}{'options/s':>12}{'peak MB':>9}")
+    print("-" * 93)
+    previous = None
+    for row in rows:
+        if previous is not None and row['payload'] != previous:
+            print()
+        previous = row['payload']
+        rss = f"{row['peak_rss_mb']:.1f}" if row['peak_rss_mb'] is not None else "-"
+        print(f"{row['payload']:<18}{row['parser']:<16}{row['options']:>9}{row['bytes'] / 1024:>10.1f}"
+              f"{row['ms']:>11.3f}{row['mb_per_s']:>8.1f}{row['options_per_s']:>12,}{rss:>9}")
+
+
+def recommend(rows):
+    """Fastest tree-building and streaming parser, by total time over all payloads"""
+    totals = {}
+    for row in rows:
+        totals[row['parser']] = totals.get(row['parser'], 0) + row['ms']
+    ranking = sorted(totals.items(), key=lambda item: item[1])
+    print()
+    print("Total time over all payloads: " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in ranking))
+    streaming = [name for name, _ in ranking if "iterparse" in name or name == "reply-reader"]
+    if streaming:
+        print(f"Fastest streaming parser: {streaming[0]}")
+    return ranking
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HostConnect reply parser benchmark")
+    parser.add_argument("--child", nargs=2, metavar=("PARSER", "PATH"), help=argparse.SUPPRESS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="options per reply")
+    parser.add_argument("--pad-bytes", type=int, default=0, help="extra comment bytes per option")
+    parser.add_argument("--cassette", help="also benchmark the OptionInfoReply bodies captured in this cassette")
+    parser.add_argument("--parsers", nargs="+", choices=sorted(PARSERS), default=list(PARSERS))
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each parser/size")
+    parser.add_argument("--no-rss", action="store_true", help="skip the peak RSS child processes")
+    parser.add_argument("--report", help="write the rows as JSON to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    payloads = [(f"{n} options", generate_reply(n, args.pad_bytes)) for n in args.sizes]
+    if args.cassette:
+        payloads += list(captured_replies(args.cassette))
+
+    print("=" * 93)
+    print("HOSTCONNECT REPLY PARSER BENCHMARK")
+    print("=" * 93)
+    print(f"Parsers: {', '.join(args.parsers)}" + ("" if lxml_etree is not None else " (lxml not installed)"))
+    print(f"Best of at least {args.min_time}s per parser and payload; peak MB is extra RSS in a fresh process")
+    print()
+
+    rows = run(payloads, args.parsers, args.min_time, not args.no_rss)
+    print_rows(rows)
+    recommend(rows)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nDetailed results saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
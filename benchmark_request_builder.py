@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+HostConnect Request Builder Microbenchmark
+Measures the cost of building each request type with the precompiled byte
+templates in hostconnect.builders against the f-string builders the scripts
+used before, and what that cost means at 10,000 requests/sec.
+"""
+
+import argparse
+import itertools
+import timeit
+
+from hostconnect.builders import (
+    build_agent_info_request,
+    build_option_info_request,
+    build_ping_request,
+    build_soap_search_request,
+)
+from hostconnect.config import AGENT_ID, PASSWORD
+
+TARGET_RATE = 10000  # requests/sec
+
+ROOM_CONFIGS = [{"adults": 2, "room_type": "DB"}]
+
+
+def legacy_agent_info():
+    """AgentInfoRequest as the scripts used to render it"""
+    return f"""<?xml version="1.0"?>
+<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
+<Request>
+    <AgentInfoRequest>
+        <AgentID>{AGENT_ID}</AgentID>
+        <Password>{PASSWORD}</Password>
+        <ReturnAccountInfo>Y</ReturnAccountInfo>
+    </AgentInfoRequest>
+</Request>""".encode("utf-8")
+
+
+def legacy_option_info(params):
+    """OptionInfoRequest with conditional fragments, as in the search scripts"""
+    return f"""<?xml version="1.0"?>
+<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
+<Request>
+  <OptionInfoRequest>
+    <AgentID>{AGENT_ID}</AgentID>
+    <Password>{PASSWORD}</Password>
+    {f'<Opt>{params.get("opt")}</Opt>' if params.get("opt") else ""}
+    {f'<DestinationName>{params.get("destination")}</DestinationName>' if params.get("destination") else ""}
+    <Info>{params.get("info")}</Info>
+    {f'<DateFrom>{params.get("dateFrom")}</DateFrom>' if params.get("dateFrom") else ""}
+    {f'<DateTo>{params.get("dateTo")}</DateTo>' if params.get("dateTo") else ""}
+    <RoomConfigs>
+      <RoomConfig>
+        <Adults>{params.get("adults")}</Adults>
+        <RoomType>{params.get("roomType")}</RoomType>
+      </RoomConfig>
+    </RoomConfigs>
+  </OptionInfoRequest>
+</Request>""".encode("utf-8")
+
+
+def legacy_ping():
+    return """<?xml version="1.0"?>
+<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
+<Request><PingRequest/></Request>""".encode("utf-8")
+
+
+def legacy_soap_search(params):
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Header>
+    <Authentication>
+      <Username>{AGENT_ID}</Username>
+      <Password>{PASSWORD}</Password>
+      <AgentId>{AGENT_ID}</AgentId>
+    </Authentication>
+  </soap:Header>
+  <soap:Body>
+    <SearchTours>
+      {f'<Country>{params.get("country")}</Country>' if params.get("country") else ""}
+      {f'<Destination>{params.get("destination")}</Destination>' if params.get("destination") else ""}
+      {f'<StartDate>{params.get("startDate")}</StartDate>' if params.get("startDate") else ""}
+      <IncludeCancellationDeadlines>true</IncludeCancellationDeadlines>
+    </SearchTours>
+  </soap:Body>
+</soap:Envelope>""".encode("utf-8")
+
+
+def benchmark_cases():
+    """(name, legacy builder, compiled builder) for each request type"""
+    option_params = {
+        "opt": "CPTDTJOHCPTCITY", "destination": "Cape Town", "info": "GS",
+        "dateFrom": "2025-07-01", "dateTo": "2025-07-05", "adults": 2, "roomType": "DB",
+    }
+    unique_codes = (f"CPTDT{n:010d}" for n in itertools.count())
+    soap_params = {"country": "South Africa", "destination": "Cape Town", "startDate": "2025-07-01"}
+
+    return [
+        ("PingRequest", legacy_ping, build_ping_request),
+        ("AgentInfoRequest", legacy_agent_info,
+         lambda: build_agent_info_request(AGENT_ID, PASSWORD)),
+        ("OptionInfoRequest", lambda: legacy_option_info(option_params),
+         lambda: build_option_info_request(
+             AGENT_ID, PASSWORD,
+             opt="CPTDTJOHCPTCITY", destination_name="Cape Town", info="GS",
+             date_from="2025-07-01", date_to="2025-07-05", room_configs=ROOM_CONFIGS)),
+        ("OptionInfo (unique)", lambda: legacy_option_info(dict(option_params, opt=next(unique_codes))),
+         lambda: build_option_info_request(
+             AGENT_ID, PASSWORD,
+             opt=next(unique_codes), destination_name="Cape Town", info="GS",
+             date_from="2025-07-01", date_to="2025-07-05", room_configs=ROOM_CONFIGS)),
+        ("SOAP SearchTours", lambda: legacy_soap_search(soap_params),
+         lambda: build_soap_search_request(
+             AGENT_ID, PASSWORD, AGENT_ID,
+             country="South Africa", destination="Cape Town", start_date="2025-07-01")),
+    ]
+
+
+def time_per_call_us(func, number, repeat):
+    """Best-of-repeat cost of one call in microseconds"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HostConnect request builder microbenchmark")
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    args = parser.parse_args()
+
+    budget_us = 1e6 / TARGET_RATE
+
+    print("=" * 80)
+    print("HOSTCONNECT REQUEST BUILDER MICROBENCHMARK")
+    print("=" * 80)
+    print(f"Calls per run: {args.number}, runs: {args.repeat} (best run reported)")
+    print(f"Budget at {TARGET_RATE:,} requests/sec: {budget_us:.0f}µs per request per core")
+    print()
+    print(f"{'Request':<22}{'f-string µs':>13}{'compiled µs':>13}{'speedup':>9}{'CPU @10k/s':>13}")
+    print("-" * 70)
+
+    for name, legacy, compiled in benchmark_cases():
+        legacy_us = time_per_call_us(legacy, args.number, args.repeat)
+        compiled_us = time_per_call_us(compiled, args.number, args.repeat)
+        cpu_share = compiled_us / budget_us * 100
+        print(f"{name:<22}{legacy_us:>13.2f}{compiled_us:>13.2f}{legacy_us / compiled_us:>8.1f}x{cpu_share:>12.1f}%")
+
+    print("-" * 70)
+    print("CPU @10k/s is the share of one core spent building requests at the target rate.")
+    print("Compiled builders escape values and leave out empty fields; nothing is memoized,")
+    print("so the unique row (a new option code on every call) costs the same as the row above.")
+
+
+if __name__ == "__main__":
+    main()
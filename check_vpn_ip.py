@@ -4,7 +4,8 @@ VPN IP Address Verification Script
 This script checks your current IP address and verifies if you're using your VPN.
 """
 
-import requests
+from hostconnect.config import EXPECTED_EGRESS_IP
+from hostconnect.egress import check_egress_ip
 
 def check_vpn_ip():
     """Check current IP and verify if VPN is active."""
@@ -16,23 +17,23 @@ def check_vpn_ip():
     try:
         # Check your current IP
         print("Checking current IP address...")
-        ip_check = requests.get('https://httpbin.org/ip', timeout=10)
-        current_ip = ip_check.json()['origin']
+        result = check_egress_ip()
+        current_ip = result.ip
         print(f"Current IP: {current_ip}")
         
         # Verify it matches your VPN IP
-        expected_ip = "84.46.231.251"
-        if current_ip == expected_ip:
+        expected_ip = EXPECTED_EGRESS_IP
+        if result.matches(expected_ip):
             print("✅ Correct IP - you're using your VPN!")
+        elif not result.quorum_met:
+            print(f"❌ Error checking IP address: {result.summary()}")
+            for name, error in result.errors.items():
+                print(f"   {name}: {error}")
+            print("Please check your internet connection")
         else:
             print(f"❌ Wrong IP - Expected {expected_ip}, got {current_ip}")
             print("Make sure your VPN is connected")
             
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error checking IP address: {e}")
-        print("Please check your internet connection")
-    except KeyError as e:
-        print(f"❌ Error parsing response: {e}")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
     
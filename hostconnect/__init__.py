@@ -0,0 +1,17 @@
+"""
+HostConnect Client Package
+Shared, connection-pooled access to the Tourplan HostConnect API for the test scripts.
+"""
+
+from hostconnect.aio import AsyncHostConnectClient
+from hostconnect.batcher import BatchedOption, OptionInfoBatcher
+from hostconnect.client import HostConnectClient, HostConnectReply, get_default_client
+
+__all__ = [
+    "AsyncHostConnectClient",
+    "BatchedOption",
+    "HostConnectClient",
+    "HostConnectReply",
+    "OptionInfoBatcher",
+    "get_default_client",
+]
@@ -0,0 +1,132 @@
+"""
+Async HostConnect Client
+asyncio front-end for fanning many HostConnect requests out concurrently.
+
+Calls run on the pooled HostConnectClient in a bounded worker pool, so a
+sweep over Info codes, destinations or dates costs roughly the slowest
+request instead of the sum of all of them.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from hostconnect.client import HostConnectClient
+from hostconnect.config import DEFAULT_CONCURRENCY, POOL_MAXSIZE
+
+
+class AsyncHostConnectClient:
+    """Bounded-concurrency asyncio client
+
+    Results of the *_many methods come back in request order. With
+    fail_fast=True the first failure cancels all remaining work and is
+    re-raised; with fail_fast=False each failure is returned in place of its
+    reply. A per-request deadline (seconds) covers the HTTP call only, not the
+    time spent waiting for a free slot or worker thread: a worker still busy
+    with a call that timed out must not eat into the next call's deadline.
+    """
+
+    def __init__(self, client=None, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self.client = client or HostConnectClient(pool_maxsize=max(concurrency, POOL_MAXSIZE))
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="hostconnect",
+        )
+
+    def _bind(self, method, deadline, **params):
+        """Bind a client call, capping its HTTP timeout at the deadline"""
+        if deadline is not None:
+            params['timeout'] = min(deadline, self.client.timeout)
+        return functools.partial(method, **params)
+
+    async def _call(self, call, deadline=None):
+        """Run one blocking client call in the worker pool"""
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            return await loop.run_in_executor(self._executor, call)
+
+        started = loop.create_future()
+
+        def mark_started():
+            if not started.done():
+                started.set_result(None)
+
+        def run():
+            try:
+                loop.call_soon_threadsafe(mark_started)
+            except RuntimeError:
+                pass  # the event loop is gone; nobody is waiting for the result
+            return call()
+
+        future = loop.run_in_executor(self._executor, run)
+        try:
+            # The deadline starts when a worker picks the call up, not while it is queued
+            await asyncio.wait((started, future), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        return await asyncio.wait_for(future, deadline)
+
+    async def _fan_out(self, calls, concurrency=None, deadline=None, fail_fast=True):
+        """Run calls concurrently under a semaphore and return results in order"""
+        semaphore = asyncio.Semaphore(min(concurrency or self.concurrency, self.concurrency))
+
+        async def run(call):
+            async with semaphore:
+                return await self._call(call, deadline)
+
+        tasks = [asyncio.ensure_future(run(call)) for call in calls]
+        if not fail_fast:
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop everything still queued or in flight, then surface the failure
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def post(self, body, deadline=None, **kwargs):
+        """POST a raw request body"""
+        return await self._call(self._bind(self.client.post, deadline, body=body, **kwargs), deadline)
+
+    async def ping(self, deadline=None):
+        """Send a PingRequest"""
+        return await self._call(self._bind(self.client.ping, deadline), deadline)
+
+    async def agent_info(self, return_account_info=True, deadline=None):
+        """Send an AgentInfoRequest"""
+        call = self._bind(self.client.agent_info, deadline, return_account_info=return_account_info)
+        return await self._call(call, deadline)
+
+    async def option_info(self, deadline=None, **params):
+        """Send one OptionInfoRequest (params as HostConnectClient.option_info)"""
+        return await self._call(self._bind(self.client.option_info, deadline, **params), deadline)
+
+    async def post_many(self, bodies, concurrency=None, deadline=None, fail_fast=True):
+        """POST many raw request bodies concurrently"""
+        calls = [self._bind(self.client.post, deadline, body=body) for body in bodies]
+        return await self._fan_out(calls, concurrency, deadline, fail_fast)
+
+    async def option_info_many(self, option_requests, concurrency=None, deadline=None,
+                               fail_fast=True):
+        """Send many OptionInfoRequests concurrently
+
+        option_requests is a list of HostConnectClient.option_info keyword dicts, e.g.
+        [{"opt": "CPTDTJOHCPTCITY", "info": "G"}, {"opt": "CPTDTJOHCPTCITY", "info": "S"}]
+        """
+        calls = [self._bind(self.client.option_info, deadline, **params) for params in option_requests]
+        return await self._fan_out(calls, concurrency, deadline, fail_fast)
+
+    def close(self):
+        """Stop the worker pool; calls already in flight finish in the background"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
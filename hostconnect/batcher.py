@@ -0,0 +1,193 @@
+"""
+HostConnect OptionInfo Batcher
+Coalesces single-option OptionInfo lookups into multi-<Opt> requests.
+
+HostConnect accepts several <Opt> codes in one OptionInfoRequest. Pricing a
+results page one option per round trip costs 20-50 round trips over the VPN;
+the batcher holds each lookup for up to window_ms (or until max_options codes
+are waiting), sends one request for the whole batch and hands every caller
+back its own <Option> record.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from hostconnect.client import get_default_client
+from hostconnect.config import BATCH_MAX_OPTIONS, BATCH_WINDOW_MS, DEFAULT_CONCURRENCY
+from hostconnect.parser import iter_options
+
+
+class BatchedOption:
+    """One caller's share of a batched OptionInfo reply
+
+    option is the caller's <Option> record (None if the reply did not include
+    its code, e.g. an unknown option or an ErrorReply). reply is the shared
+    HostConnectReply, for reply_type / error / elapsed_ms.
+    """
+
+    def __init__(self, opt, option, reply):
+        self.opt = opt
+        self.option = option
+        self.reply = reply
+
+    @property
+    def found(self):
+        return self.option is not None
+
+
+class _Batch:
+    """Lookups waiting to share one OptionInfoRequest"""
+
+    def __init__(self, params, due):
+        self.params = params
+        self.due = due
+        self.waiters = []
+
+    def codes(self):
+        """Distinct option codes in arrival order"""
+        return list(dict.fromkeys(opt for opt, _ in self.waiters))
+
+
+class OptionInfoBatcher:
+    """Thread-safe collector of OptionInfo lookups
+
+    Lookups are only batched with others that share every other request
+    parameter (Info code, dates, room configs), since those apply to the whole
+    request. submit() returns a concurrent.futures.Future; asyncio callers can
+    await it with asyncio.wrap_future(). Network errors are set on every
+    future of the failed batch.
+    """
+
+    def __init__(self, client=None, max_options=BATCH_MAX_OPTIONS, window_ms=BATCH_WINDOW_MS,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.client = client or get_default_client()
+        self.max_options = max_options
+        self.window = window_ms / 1000
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats = {'lookups': 0, 'requests': 0, 'full_batches': 0}
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="hostconnect-batch",
+        )
+        self._flusher = threading.Thread(target=self._flush_loop, name="hostconnect-batcher", daemon=True)
+        self._flusher.start()
+
+    @staticmethod
+    def _batch_key(params):
+        room_configs = params.get('room_configs')
+        rooms = tuple(tuple(sorted(config.items())) for config in room_configs) if room_configs else None
+        return tuple((name, rooms if name == 'room_configs' else value)
+                     for name, value in sorted(params.items()))
+
+    def submit(self, opt, info="G", date_from=None, date_to=None, rate_convert=None,
+               room_configs=None):
+        """Queue one option lookup; the Future resolves to a BatchedOption"""
+        params = {
+            'info': info,
+            'date_from': date_from,
+            'date_to': date_to,
+            'rate_convert': rate_convert,
+            'room_configs': room_configs,
+        }
+        key = self._batch_key(params)
+        future = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("OptionInfoBatcher is closed")
+            self._stats['lookups'] += 1
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = _Batch(params, time.monotonic() + self.window)
+                self._condition.notify()
+            batch.waiters.append((opt, future))
+            if len(batch.codes()) >= self.max_options:
+                del self._pending[key]
+                self._stats['full_batches'] += 1
+                self._dispatch(batch)
+        return future
+
+    def option_info(self, opt, **params):
+        """Blocking lookup of one option through the batcher"""
+        return self.submit(opt, **params).result()
+
+    def option_info_many(self, opts, **params):
+        """Look up several options (same params) and return BatchedOptions in order"""
+        futures = [self.submit(opt, **params) for opt in opts]
+        return [future.result() for future in futures]
+
+    def _dispatch(self, batch):
+        """Hand a closed batch to the send pool (caller holds the lock)"""
+        self._stats['requests'] += 1
+        self._executor.submit(self._send, batch)
+
+    def _flush_loop(self):
+        """Send batches whose window has elapsed"""
+        with self._condition:
+            while not self._closed:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                due = [key for key, batch in self._pending.items() if batch.due <= now]
+                for key in due:
+                    self._dispatch(self._pending.pop(key))
+                if self._pending:
+                    next_due = min(batch.due for batch in self._pending.values())
+                    self._condition.wait(max(next_due - now, 0))
+
+    def _send(self, batch):
+        """Send one multi-<Opt> request and resolve every waiter"""
+        try:
+            reply = self.client.option_info(opt=batch.codes(), **batch.params)
+        except BaseException as e:
+            for _, future in batch.waiters:
+                future.set_exception(e)
+            return
+
+        options = {}
+        if reply.reply_type == "OptionInfoReply":
+            for option in iter_options(reply.content):
+                code = option.get('Opt') if isinstance(option, dict) else None
+                if code:
+                    options.setdefault(code, option)
+
+        for opt, future in batch.waiters:
+            future.set_result(BatchedOption(opt, options.get(opt), reply))
+
+    def flush(self):
+        """Send everything pending now instead of waiting for the window"""
+        with self._condition:
+            for batch in self._pending.values():
+                self._dispatch(batch)
+            self._pending.clear()
+
+    def stats(self):
+        """Lookups, requests sent and the resulting round-trip reduction"""
+        with self._condition:
+            stats = dict(self._stats)
+        stats['saved_round_trips'] = max(stats['lookups'] - stats['requests'], 0)
+        stats['options_per_request'] = (stats['lookups'] / stats['requests']) if stats['requests'] else 0.0
+        return stats
+
+    def close(self):
+        """Send what is pending, wait for in-flight batches and stop"""
+        with self._condition:
+            # One critical section: no submit() can slip in between the last
+            # dispatch and _closed, so nothing is left pending unresolved
+            self._closed = True
+            for batch in self._pending.values():
+                self._dispatch(batch)
+            self._pending.clear()
+            self._condition.notify_all()
+        self._flusher.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
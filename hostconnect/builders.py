@@ -0,0 +1,312 @@
+"""
+HostConnect Request Builders
+Precompiled templates for the HostConnect (and SOAP SearchTours) requests.
+
+Each request type is compiled once into a small Python function. When every
+value is a plain string without XML special characters (the usual case) the
+request is one f-string over constant tag text, as a hand-written builder
+would be; otherwise each field is checked and escaped on its own. Nothing is
+memoized, so every call costs the same whether or not the values were seen
+before. Empty fields are left out either way.
+"""
+
+from xml.sax.saxutils import escape
+
+from hostconnect.config import DTD_NAME
+
+HOSTCONNECT_PROLOG = f"""<?xml version="1.0"?>
+<!DOCTYPE Request SYSTEM "{DTD_NAME}">
+<Request>
+"""
+
+SOAP_PROLOG = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Header>
+    <Authentication>
+"""
+
+
+def element_text(value):
+    """Escaped element text for a Python value: bools become Y/N, dates ISO format"""
+    kind = type(value)
+    if kind is int:
+        return str(value)
+    if kind is not str:
+        if kind is bool:
+            return "Y" if value else "N"
+        value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    if "&" in value or "<" in value or ">" in value:
+        value = escape(value)
+    return value
+
+
+def _element(open_tag, value, close_tag):
+    """Elements for a value that is not a plain string or int (one per item of a list or tuple)"""
+    if type(value) is list or type(value) is tuple:
+        return "".join([open_tag + element_text(item) + close_tag for item in value])
+    return open_tag + element_text(value) + close_tag
+
+
+def _field_code(fields, indent, namespace, value_of, prefix, depth):
+    """Source lines setting one variable per field to its elements; returns (lines, variable names)
+
+    value_of(key) is the source expression of a field's value.
+    """
+    pad = "    " * depth
+    lines = []
+    names = []
+    for field in fields:
+        name = f"{prefix}{len(names)}"
+        names.append(name)
+        if isinstance(field, GroupField):
+            for part in ("open", "close", "item_open", "item_close"):
+                namespace[f"{name}_{part}"] = getattr(field, part)
+            item_lines, item_names = _field_code(field.item_fields, field.item_indent, namespace,
+                                                 lambda key: f"_get({key!r})", f"{name}_", depth + 2)
+            lines += [
+                f"{pad}if {value_of(field.key)}:",
+                f"{pad}    _parts = [{name}_open]",
+                f"{pad}    for _item in {value_of(field.key)}:",
+                f"{pad}        _get = _item.get",
+                *item_lines,
+                f"{pad}        _parts.append(f'{{{name}_item_open}}"
+                + "".join(f"{{{item}}}" for item in item_names) + f"{{{name}_item_close}}')",
+                f"{pad}    _parts.append({name}_close)",
+                f"{pad}    {name} = ''.join(_parts)",
+                f"{pad}else:",
+                f"{pad}    {name} = ''",
+            ]
+            continue
+        key, element = field
+        namespace[f"{name}_open"] = f"{indent}<{element}>"
+        namespace[f"{name}_close"] = f"</{element}>\n"
+        lines += [
+            f"{pad}_v = {value_of(key)}",
+            f"{pad}if _v is None:",
+            f"{pad}    {name} = ''",
+            f"{pad}elif type(_v) is str and '&' not in _v and '<' not in _v and '>' not in _v:",
+            f"{pad}    {name} = {name}_open + _v + {name}_close if _v else ''",
+            f"{pad}elif type(_v) is int:",
+            f"{pad}    {name} = {name}_open + str(_v) + {name}_close",
+            f"{pad}else:",
+            f"{pad}    {name} = _element({name}_open, _v, {name}_close) if _v != '' else ''",
+        ]
+    return lines, names
+
+
+class GroupField:
+    """A container of repeated items, e.g. <RoomConfigs><RoomConfig>...</RoomConfig></RoomConfigs>
+
+    items are dicts keyed like item_fields.
+    """
+
+    def __init__(self, key, name, item_name, item_fields, indent):
+        self.key = key
+        self.open = f"{indent}<{name}>\n"
+        self.close = f"{indent}</{name}>\n"
+        self.item_open = f"{indent}  <{item_name}>\n"
+        self.item_close = f"{indent}  </{item_name}>\n"
+        self.item_fields = item_fields
+        self.item_indent = indent + "    "
+
+
+def _fast_code(fields, indent, prefix):
+    """Source for the fast path: (f-string parts, group lines, scalar keys)
+
+    The fast path only runs once every scalar value is known to be a str
+    (or None) without XML special characters, so each field is a plain
+    conditional f-string with its tags inline.
+    """
+    parts = []
+    lines = []
+    keys = []
+    for number, field in enumerate(fields):
+        name = f"{prefix}{number}"
+        if not isinstance(field, GroupField):
+            key, element = field
+            keys.append(key)
+            parts.append(f"{{f'{indent}<{element}>{{{key}}}</{element}>{{_n}}' if {key} else ''}}")
+            continue
+        item_parts = []
+        for item_number, (key, element) in enumerate(field.item_fields):
+            item = f"{name}_{item_number}"
+            item_parts.append(
+                f"{{'' if (_v := _item.get({key!r})) is None "
+                f"else f'{field.item_indent}<{element}>{{_v}}</{element}>{{_n}}' if type(_v) is int "
+                "or type(_v) is str and _v and '&' not in _v and '<' not in _v and '>' not in _v "
+                f"else '' if _v == '' else _element({item}_open, _v, {item}_close)}}"
+            )
+        lines += [
+            f"    if {field.key}:",
+            f"        _group = {name}_open",
+            f"        for _item in {field.key}:",
+            f'            _group = f"{{_group}}{{{name}_item_open}}{"".join(item_parts)}{{{name}_item_close}}"',
+            f"        {name} = _group + {name}_close",
+            "    else:",
+            f"        {name} = ''",
+        ]
+        parts.append(f"{{{name}}}")
+    return parts, lines, keys
+
+
+class RequestTemplate:
+    """A request type compiled into a render function
+
+    prefix and suffix are the static text around the request, credentials the
+    (key, element) pairs of the credentials block and middle any static text
+    between the credentials and the request fields. fields are rendered in
+    order; GroupField instances may be mixed in with (key, element) pairs.
+
+    render() takes the credentials and field values as keyword arguments (or
+    positionally, in that order) and returns the request as UTF-8 bytes. It
+    is generated source. When every scalar value is a str (or None) without
+    XML special characters - one join and three substring checks - the
+    request is a single f-string with the tags inline, like a hand-written
+    builder. Otherwise each field is checked and escaped on its own. Either
+    way a field is omitted when its value is None or empty; strings without
+    XML special characters and ints are used as they are, anything else goes
+    through element_text().
+    """
+
+    def __init__(self, prefix, credentials, fields, suffix, middle="", indent="    "):
+        self.keys = [key for key, _ in credentials] + [
+            field.key if isinstance(field, GroupField) else field[0] for field in fields
+        ]
+        signature = ", ".join(f"{key}=None" for key in self.keys)
+        arguments = ", ".join(self.keys)
+        namespace = {'_element': _element, '_prefix': prefix, '_middle': middle, '_suffix': suffix}
+
+        credential_lines, credential_names = _field_code(credentials, indent, namespace, str, "c", 1)
+        field_lines, field_names = _field_code(fields, indent, namespace, str, "f", 1)
+        body = "".join(f"{{{name}}}" for name in credential_names) + "{_middle}" + "".join(
+            f"{{{name}}}" for name in field_names)
+        escaped = [
+            f"def _render_escaped({signature}):",
+            *credential_lines,
+            *field_lines,
+            f"    return f'{{_prefix}}{body}{{_suffix}}'.encode('utf-8')",
+        ]
+
+        credential_parts, _, credential_keys = _fast_code(credentials, indent, "c")
+        field_parts, group_lines, field_keys = _fast_code(fields, indent, "f")
+        probe = ", ".join(f"'' if {key} is None else {key}" for key in credential_keys + field_keys)
+        fast = [
+            f"def render({signature}):",
+            "    try:",
+            f"        _probe = ''.join(({probe},))",
+            "    except TypeError:",
+            f"        return _render_escaped({arguments})",
+            "    if '&' in _probe or '<' in _probe or '>' in _probe:",
+            f"        return _render_escaped({arguments})",
+            "    _n = '\\n'",
+            *group_lines,
+            f'    return f"{{_prefix}}{"".join(credential_parts)}{{_middle}}{"".join(field_parts)}{{_suffix}}"'
+            ".encode('utf-8')",
+        ]
+        exec("\n".join(escaped + fast), namespace)
+        self.render = namespace['render']
+
+
+def hostconnect_template(request_name, fields, credentials=(("agent_id", "AgentID"), ("password", "Password"))):
+    """Compile a <Request><{request_name}> template in the HostConnect dialect"""
+    return RequestTemplate(
+        HOSTCONNECT_PROLOG + f"  <{request_name}>\n",
+        credentials,
+        fields,
+        f"  </{request_name}>\n</Request>",
+    )
+
+
+PING_REQUEST = (HOSTCONNECT_PROLOG + "  <PingRequest/>\n</Request>").encode("utf-8")
+
+AGENT_INFO_TEMPLATE = hostconnect_template("AgentInfoRequest", [
+    ("return_account_info", "ReturnAccountInfo"),
+])
+
+OPTION_INFO_TEMPLATE = hostconnect_template("OptionInfoRequest", [
+    ("opt", "Opt"),
+    ("button_name", "ButtonName"),
+    ("destination_name", "DestinationName"),
+    ("info", "Info"),
+    ("date_from", "DateFrom"),
+    ("date_to", "DateTo"),
+    ("rate_convert", "RateConvert"),
+    GroupField("room_configs", "RoomConfigs", "RoomConfig", [
+        ("adults", "Adults"),
+        ("children", "Children"),
+        ("infants", "Infants"),
+        ("room_type", "RoomType"),
+    ], "    "),
+])
+
+# Search formats HostConnect might accept (see hostconnect.discovery); same criteria as SearchTours
+SEARCH_REQUEST_TEMPLATE = hostconnect_template("SearchRequest", [
+    ("country", "Country"),
+    ("destination", "Destination"),
+    ("tour_level", "TourLevel"),
+    ("start_date", "StartDate"),
+    ("end_date", "EndDate"),
+])
+
+TOUR_SEARCH_REQUEST_TEMPLATE = hostconnect_template("TourSearchRequest", [
+    ("country", "Country"),
+    ("destination", "Destination"),
+    ("tour_level", "TourLevel"),
+    ("start_date", "DateFrom"),
+    ("end_date", "DateTo"),
+])
+
+SOAP_SEARCH_TEMPLATE = RequestTemplate(
+    SOAP_PROLOG,
+    [("username", "Username"), ("password", "Password"), ("agent_id", "AgentId")],
+    [
+        ("country", "Country"),
+        ("destination", "Destination"),
+        ("tour_level", "TourLevel"),
+        ("start_date", "StartDate"),
+        ("end_date", "EndDate"),
+    ],
+    "      <IncludeCancellationDeadlines>true</IncludeCancellationDeadlines>\n"
+    "    </SearchTours>\n"
+    "  </soap:Body>\n"
+    "</soap:Envelope>",
+    middle="    </Authentication>\n  </soap:Header>\n  <soap:Body>\n    <SearchTours>\n",
+    indent="      ",
+)
+
+
+def build_ping_request():
+    """Build a PingRequest (no credentials required)"""
+    return PING_REQUEST
+
+
+def build_agent_info_request(agent_id, password, return_account_info=True):
+    """Build an AgentInfoRequest"""
+    return AGENT_INFO_TEMPLATE.render(agent_id, password, "Y" if return_account_info else "N")
+
+
+def build_option_info_request(agent_id, password, opt=None, button_name=None,
+                              destination_name=None, info="G", date_from=None,
+                              date_to=None, rate_convert=None, room_configs=None):
+    """Build an OptionInfoRequest
+
+    Info codes: G=General, S=Stay Pricing, R=Rates, A=Availability (combinable, e.g. GS).
+    opt may be a single option code or a list of codes (one <Opt> each).
+    room_configs is a list of dicts with adults/children/infants/room_type keys.
+    """
+    return OPTION_INFO_TEMPLATE.render(agent_id, password, opt, button_name, destination_name, info,
+                                       date_from, date_to, "Y" if rate_convert else None, room_configs)
+
+
+def build_soap_search_request(username, password, agent_id, country=None, destination=None,
+                              tour_level=None, start_date=None, end_date=None):
+    """Build a SOAP SearchTours envelope"""
+    return SOAP_SEARCH_TEMPLATE.render(username, password, agent_id, country, destination, tour_level,
+                                       start_date, end_date)
+
+
+def build_search_request(agent_id, password, country=None, destination=None, tour_level=None,
+                         start_date=None, end_date=None, request_name="SearchRequest"):
+    """Build a HostConnect SearchRequest (or TourSearchRequest, which names its dates DateFrom/DateTo)"""
+    template = TOUR_SEARCH_REQUEST_TEMPLATE if request_name == "TourSearchRequest" else SEARCH_REQUEST_TEMPLATE
+    return template.render(agent_id, password, country, destination, tour_level, start_date, end_date)
@@ -0,0 +1,290 @@
+"""
+HostConnect Reply Cache
+In-process TTL + LRU cache of OptionInfo replies.
+
+The Python-side counterpart of CacheManager in lib/cache.ts: replies are
+keyed by a canonical request key (in the spirit of getTourCacheKey) that
+leaves out credentials and whitespace, so the same lookup made by any agent
+or script formatting hits the same entry. Entries expire per Info code -
+general info is stable for hours, availability only for minutes - and the
+least recently used entry is evicted once the cache is full.
+
+An expired entry stays usable as stale for a grace window: lookup() still
+returns it so the caller can answer immediately and refresh it in the
+background (stale-while-revalidate). Terminal ErrorReply results are cached
+for a short TTL with no grace (negative caching).
+"""
+
+import hashlib
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from hostconnect.config import (
+    CACHE_DEFAULT_TTL,
+    CACHE_MAX_ENTRIES,
+    CACHE_STALE_GRACE,
+    CACHE_TTLS,
+    NEGATIVE_CACHE_ERROR_CODES,
+    NEGATIVE_CACHE_MESSAGES,
+    NEGATIVE_CACHE_TTL,
+)
+from hostconnect.parser import local_name
+
+
+def _canonical(value):
+    """Whitespace- and order-insensitive text for one request field"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Y" if value else "N"
+    if isinstance(value, (list, tuple)):
+        return ",".join(sorted(_canonical(item) for item in value))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return " ".join(str(value).split())
+
+
+def _canonical_rooms(room_configs):
+    """RoomConfigs as 'adults=2&room_type=DB' items, ignoring key order and empty fields"""
+    if not room_configs:
+        return ""
+    rooms = []
+    for config in room_configs:
+        items = sorted(
+            f"{key}={_canonical(value)}"
+            for key, value in dict(config).items()
+            if value is not None and value != ""
+        )
+        rooms.append("&".join(items))
+    return "|".join(rooms)
+
+
+def info_code(info):
+    """Info letters in a fixed order, so GS and SG are the same request type"""
+    return "".join(sorted(_canonical(info).upper()))
+
+
+def option_info_cache_key(opt=None, button_name=None, destination_name=None, info="G",
+                          date_from=None, date_to=None, rate_convert=None, room_configs=None):
+    """Canonical cache key for an OptionInfoRequest
+
+    Mirrors CacheManager.getTourCacheKey: a prefix plus the request fields in a
+    fixed order. Credentials never take part; values are whitespace-normalized,
+    option codes are sorted and Info letters are order-insensitive (GS == SG).
+    """
+    return ":".join([
+        "optioninfo",
+        _canonical(opt),
+        _canonical(button_name),
+        _canonical(destination_name),
+        info_code(info),
+        _canonical(date_from),
+        _canonical(date_to),
+        "Y" if rate_convert else "",
+        _canonical_rooms(room_configs),
+    ])
+
+
+# Credential elements of the HostConnect and SOAP dialects; never part of a key
+CREDENTIAL_ELEMENTS = {"AgentID", "AgentId", "Password", "Username"}
+
+
+def _canonical_xml(body):
+    """Element paths and whitespace-normalized text, credentials left out"""
+    root = ET.fromstring(body)
+    lines = []
+
+    def walk(elem, path):
+        name = local_name(elem.tag)
+        if name in CREDENTIAL_ELEMENTS:
+            return
+        path = f"{path}/{name}"
+        text = _canonical(elem.text)
+        if text or not len(elem):
+            lines.append(f"{path}={text}")
+        for child in elem:
+            walk(child, path)
+
+    walk(root, "")
+    return "\n".join(lines)
+
+
+def canonical_request_key(method, url, body):
+    """Canonical key for any HTTP request (cassettes, raw posts)
+
+    The host is left out, so traffic recorded against Tourplan matches the
+    same request sent to the stand-in. XML bodies are reduced to element
+    paths and normalized text without credentials, JSON bodies to sorted
+    compact JSON; anything else is keyed by its raw bytes.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    body = body or b""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+    stripped = body.lstrip()
+    try:
+        if stripped.startswith(b"<"):
+            canonical = _canonical_xml(body).encode("utf-8")
+        elif stripped.startswith((b"{", b"[")):
+            canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        else:
+            canonical = body
+    except (ET.ParseError, ValueError):
+        canonical = body
+
+    digest = hashlib.sha256(canonical).hexdigest()[:24]
+    return f"{method.upper()} {path} {digest}"
+
+
+def ttl_for_info(info, ttls=CACHE_TTLS, default=CACHE_DEFAULT_TTL):
+    """TTL (seconds) of a reply: the shortest TTL of its Info letters"""
+    letters = _canonical(info).upper() or "G"
+    return min(ttls.get(letter, default) for letter in letters)
+
+
+def is_terminal_error(reply):
+    """True for ErrorReply results that will not change on retry (e.g. 2050)"""
+    if reply.reply_type != "ErrorReply":
+        return False
+    if reply.error_code in NEGATIVE_CACHE_ERROR_CODES:
+        return True
+    message = (reply.error or "").lower()
+    return any(phrase in message for phrase in NEGATIVE_CACHE_MESSAGES)
+
+
+class ReplyCache:
+    """Thread-safe, size-bounded LRU cache with per-entry expiry
+
+    backing is an optional second tier shared with other processes (see
+    DiskReplyCache): misses fall through to it, hits there are promoted into
+    memory for their remaining lifetime, and every put is written through.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttls=None, default_ttl=CACHE_DEFAULT_TTL,
+                 backing=None, stale_grace=CACHE_STALE_GRACE, negative_ttl=NEGATIVE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.backing = backing
+        self.stale_grace = stale_grace
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._revalidating = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+            'stale_hits': 0, 'revalidations': 0, 'negative_stores': 0,
+        }
+
+    def ttl_for(self, info):
+        return ttl_for_info(info, self.ttls, self.default_ttl)
+
+    def lookup(self, key):
+        """(value, stale) for a fresh or in-grace entry, (None, False) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fresh_until, stale_until, value = entry
+                now = time.monotonic()
+                if now < stale_until:
+                    self._entries.move_to_end(key)
+                    stale = now >= fresh_until
+                    self._stats['stale_hits' if stale else 'hits'] += 1
+                    return value, stale
+                del self._entries[key]
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+
+        if self.backing is None:
+            return None, False
+        backed = self.backing.get_entry(key)
+        if backed is None:
+            return None, False
+        expires_at, stale_until, value = backed
+        now = time.time()
+        self._store(key, value, expires_at - now, stale_until - expires_at)
+        return value, now >= expires_at
+
+    def get(self, key):
+        """Fresh cached value, or None on a miss or an expired entry"""
+        value, stale = self.lookup(key)
+        return None if stale else value
+
+    def _store(self, key, value, ttl, grace):
+        if ttl + grace <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, now + ttl + grace, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def put(self, key, value, ttl, grace=None):
+        """Store value for ttl seconds (then stale for grace), evicting LRU entries"""
+        if grace is None:
+            grace = self.stale_grace
+        self._store(key, value, ttl, grace)
+        if self.backing is not None:
+            self.backing.put(key, value, ttl, grace)
+
+    def put_negative(self, key, reply):
+        """Cache a terminal ErrorReply briefly, with no stale grace"""
+        with self._lock:
+            self._stats['negative_stores'] += 1
+        self.put(key, reply, self.negative_ttl, grace=0)
+
+    def begin_revalidation(self, key):
+        """Claim the background refresh of a stale entry (False if already claimed)"""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            self._stats['revalidations'] += 1
+            return True
+
+    def end_revalidation(self, key):
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if self.backing is not None:
+            self.backing.invalidate(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss/eviction counters and the hit ratio"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_ratio'] = ((stats['hits'] + stats['stale_hits']) / lookups) if lookups else 0.0
+        return stats
+
+    def summary(self):
+        """One-line cache summary for reports"""
+        stats = self.stats()
+        summary = (
+            f"Reply cache: {stats['hit_ratio'] * 100:.1f}% hits "
+            f"({stats['hits']} hits, {stats['stale_hits']} stale, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['entries']} entries)"
+        )
+        if self.backing is not None:
+            disk = self.backing.stats()
+            summary += f"; disk: {disk['hits']} hits, {disk['entries']} entries"
+        return summary
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+HostConnect Cassettes
+Record real HTTP traffic once, replay it as often as needed.
+
+A cassette is a SQLite file of request/response pairs with compressed bodies,
+indexed by canonical request key (see cache.canonical_request_key: host and
+credentials are ignored). Mounted on a requests session through
+CassetteAdapter it either records every exchange that goes out, or answers
+every request from the file, sleeping for the originally observed latency
+divided by the replay speed (0 = no delays). Both HostConnect traffic
+(HostConnectClient) and local-API traffic (LoadGenerator) can be recorded.
+
+The command line lists cassettes, imports the JSON reports written by the
+SOAP debugging scripts, and re-drives recorded traffic against a live server
+at its original arrival times (or N x faster) for reproducible load runs.
+
+Usage:
+    python -m hostconnect.cassette list traffic.cassette
+    python -m hostconnect.cassette import traffic.cassette soap_search_error_for_tourplan_*.json
+    python -m hostconnect.cassette replay traffic.cassette --base-url http://127.0.0.1:8900 --speed 4
+"""
+
+import argparse
+import io
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from hostconnect.cache import canonical_request_key
+from hostconnect.compression import compress, decompress
+from hostconnect.config import REPLAY_SPEED
+from hostconnect.metrics import LatencyHistogram
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    offset_s REAL NOT NULL,
+    elapsed_ms INTEGER NOT NULL,
+    label TEXT,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    request_headers TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    reason TEXT,
+    response_headers TEXT NOT NULL,
+    encoding TEXT,
+    codec TEXT NOT NULL,
+    request_body BLOB NOT NULL,
+    response_body BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS interactions_key_seq ON interactions (key, seq);
+CREATE INDEX IF NOT EXISTS interactions_session ON interactions (session, offset_s);
+"""
+
+COLUMNS = (
+    "key, seq, session, offset_s, elapsed_ms, label, method, url, request_headers, status_code, "
+    "reason, response_headers, encoding, codec, request_body, response_body"
+)
+
+# Headers that describe the wire encoding; recorded bodies are stored decoded
+WIRE_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay mode was asked for a request that was never recorded"""
+
+
+class Interaction:
+    """One recorded request/response pair"""
+
+    def __init__(self, key, seq, session, offset_s, elapsed_ms, method, url, request_headers,
+                 request_body, status_code, reason, response_headers, response_body,
+                 encoding=None, label=None):
+        self.key = key
+        self.seq = seq
+        self.session = session
+        self.offset_s = offset_s
+        self.elapsed_ms = elapsed_ms
+        self.method = method
+        self.url = url
+        self.request_headers = request_headers
+        self.request_body = request_body
+        self.status_code = status_code
+        self.reason = reason
+        self.response_headers = response_headers
+        self.response_body = response_body
+        self.encoding = encoding
+        self.label = label
+
+
+class Cassette:
+    """Indexed request/response store, opened for "record" or "replay"
+
+    Recording appends; a request recorded several times is replayed in
+    recording order, and the last recording repeats once they run out.
+    """
+
+    def __init__(self, path, mode="replay", speed=REPLAY_SPEED):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.session = time.strftime("%Y%m%dT%H%M%S")
+        self._started = time.perf_counter()
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._stats = {'recorded': 0, 'replayed': 0, 'misses': 0}
+
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+
+    def offset(self, perf_counter_time):
+        """Seconds since this recording session started"""
+        return perf_counter_time - self._started
+
+    def record(self, method, url, request_headers, request_body, status_code, response_headers,
+               response_body, elapsed_ms, reason=None, encoding=None, label=None,
+               session=None, offset_s=None):
+        """Append one exchange; returns its canonical key"""
+        request_body = request_body or b""
+        if isinstance(request_body, str):
+            request_body = request_body.encode("utf-8")
+        key = canonical_request_key(method, url, request_body)
+        codec, compressed_response = compress(response_body or b"")
+        _, compressed_request = compress(request_body)
+        headers = {k: v for k, v in dict(response_headers).items() if k.lower() not in WIRE_HEADERS}
+        if offset_s is None:
+            offset_s = self.offset(time.perf_counter())
+
+        with self._lock:
+            seq = self._db.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM interactions WHERE key = ?", (key,)
+            ).fetchone()[0]
+            self._db.execute(
+                "INSERT INTO interactions (key, seq, session, offset_s, elapsed_ms, label, method, url, "
+                "request_headers, status_code, reason, response_headers, encoding, codec, "
+                "request_body, response_body) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, seq, session or self.session, offset_s, int(elapsed_ms), label, method.upper(), url,
+                 json.dumps(dict(request_headers or {})), status_code, reason, json.dumps(headers), encoding,
+                 codec, compressed_request, compressed_response),
+            )
+            self._stats['recorded'] += 1
+        return key
+
+    def _interaction(self, row):
+        (key, seq, session, offset_s, elapsed_ms, label, method, url, request_headers, status_code,
+         reason, response_headers, encoding, codec, request_body, response_body) = row
+        request_body = decompress(codec, request_body)
+        response_body = decompress(codec, response_body)
+        if response_body is None:
+            return None
+        return Interaction(
+            key, seq, session, offset_s, elapsed_ms, method, url, json.loads(request_headers),
+            request_body, status_code, reason, json.loads(response_headers), response_body,
+            encoding=encoding, label=label,
+        )
+
+    def lookup(self, key):
+        """Next recorded Interaction for a key, or None if it was never recorded"""
+        with self._lock:
+            seq = self._cursors.get(key, 0)
+            row = self._db.execute(
+                f"SELECT {COLUMNS} FROM interactions WHERE key = ? AND seq <= ? "
+                "ORDER BY seq DESC LIMIT 1",
+                (key, seq),
+            ).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            self._cursors[key] = seq + 1
+            self._stats['replayed'] += 1
+        return self._interaction(row)
+
+    def interactions(self):
+        """Every interaction in recording order (session, then arrival time)"""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {COLUMNS} FROM interactions ORDER BY session, offset_s, id"
+            ).fetchall()
+        for row in rows:
+            interaction = self._interaction(row)
+            if interaction is not None:
+                yield interaction
+
+    def import_report(self, path):
+        """Add the exchange from a JSON debugging report (soap_search_error_for_tourplan_*.json)"""
+        with open(path) as f:
+            report = json.load(f)
+        request = report['request']
+        response = report['response']
+        body = response.get('body') or ""
+        return self.record(
+            request.get('method', "POST"),
+            report['api_endpoint'],
+            request.get('headers', {}),
+            request.get('body', ""),
+            response['status_code'],
+            response.get('headers', {}),
+            body.encode("utf-8") if isinstance(body, str) else body,
+            response.get('response_time_ms', 0),
+            label=report.get('issue_description') or "imported",
+            session=f"import:{report.get('timestamp', path)}",
+            offset_s=0.0,
+        )
+
+    def stats(self):
+        """Recorded/replayed/missed counts of this process plus the stored total"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['interactions'] = self._db.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+        return stats
+
+    def summary(self):
+        """One-line cassette summary for reports"""
+        stats = self.stats()
+        return (
+            f"Cassette ({self.mode}, {self.path}): {stats['interactions']} interactions, "
+            f"{stats['recorded']} recorded, {stats['replayed']} replayed, {stats['misses']} misses"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records to, or replays from, a Cassette"""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "replay":
+            return self._replay(request)
+
+        start_time = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.cassette.record(
+            request.method, request.url, request.headers, request.body, response.status_code,
+            response.headers, content, elapsed_ms, reason=response.reason, encoding=response.encoding,
+            offset_s=self.cassette.offset(start_time),
+        )
+        # The body has been read; streaming callers get it back from memory
+        response.raw = _recorded_raw(content)
+        return response
+
+    def _replay(self, request):
+        key = canonical_request_key(request.method, request.url, request.body)
+        interaction = self.cassette.lookup(key)
+        if interaction is None:
+            raise CassetteMiss(f"No recording for {key}", request=request)
+        if self.cassette.speed > 0:
+            time.sleep(interaction.elapsed_ms / 1000 / self.cassette.speed)
+
+        response = requests.Response()
+        response.status_code = interaction.status_code
+        response.reason = interaction.reason
+        response.headers = CaseInsensitiveDict(interaction.response_headers)
+        response.headers['Content-Length'] = str(len(interaction.response_body))
+        response._content = interaction.response_body
+        response.raw = _recorded_raw(interaction.response_body)
+        response.encoding = interaction.encoding
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(milliseconds=interaction.elapsed_ms)
+        return response
+
+
+def _recorded_raw(content):
+    raw = io.BytesIO(content)
+    raw.decode_content = True  # StreamedReply sets this on urllib3 bodies
+    return raw
+
+
+def replay_against(cassette, base_url, speed=1.0, timeout=30, max_workers=64):
+    """Re-send every recorded request to base_url at its recorded arrival time / speed
+
+    Sessions are replayed back to back. Latency is measured from each
+    request's scheduled start (open loop), per recorded endpoint.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max_workers, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    histograms = {}
+    statuses = {}
+    lock = threading.Lock()
+
+    def fire(interaction, scheduled):
+        parts = urlsplit(interaction.url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {k: v for k, v in interaction.request_headers.items() if k.lower() not in WIRE_HEADERS}
+        try:
+            response = session.request(interaction.method, f"{base_url}{path}", data=interaction.request_body,
+                                       headers=headers, timeout=timeout)
+            response.content
+            status = str(response.status_code)
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+        latency = time.perf_counter() - scheduled
+        with lock:
+            histograms.setdefault(path, LatencyHistogram()).record_seconds(latency)
+            statuses.setdefault(path, {}).setdefault(status, 0)
+            statuses[path][status] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cassette-replay") as pool:
+        session_start = 0.0
+        current = None
+        last_offset = 0.0
+        for interaction in cassette.interactions():
+            if interaction.session != current:
+                session_start += last_offset
+                current = interaction.session
+            last_offset = interaction.offset_s
+            scheduled = start + (session_start + interaction.offset_s) / speed if speed > 0 else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, interaction, scheduled)
+
+    return {
+        'base_url': base_url,
+        'speed': speed,
+        'wall_time_s': round(time.perf_counter() - start, 2),
+        'endpoints': {
+            path: {'latency': histogram.summary_ms(), 'status_codes': statuses[path]}
+            for path, histogram in histograms.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HostConnect record/replay cassettes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="show the recorded interactions")
+    list_parser.add_argument("cassette")
+
+    import_parser = commands.add_parser("import", help="add JSON debugging reports to a cassette")
+    import_parser.add_argument("cassette")
+    import_parser.add_argument("reports", nargs="+")
+
+    replay_parser = commands.add_parser("replay", help="re-drive recorded traffic against a server")
+    replay_parser.add_argument("cassette")
+    replay_parser.add_argument("--base-url", required=True, help="e.g. http://127.0.0.1:8900")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="N x original pace, 0 = back to back")
+    replay_parser.add_argument("--timeout", type=float, default=30)
+    replay_parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    with Cassette(args.cassette, mode="replay", speed=0) as cassette:
+        if args.command == "list":
+            for interaction in cassette.interactions():
+                print(
+                    f"{interaction.session:<32} +{interaction.offset_s:>8.3f}s {interaction.method:<5} "
+                    f"{urlsplit(interaction.url).path:<45} {interaction.status_code} "
+                    f"{interaction.elapsed_ms:>6} ms {len(interaction.response_body):>9} B"
+                )
+            print(cassette.summary())
+
+        elif args.command == "import":
+            cassette.mode = "record"
+            for path in args.reports:
+                print(f"{path} -> {cassette.import_report(path)}")
+
+        else:
+            report = replay_against(cassette, args.base_url.rstrip("/"), speed=args.speed, timeout=args.timeout)
+            print(f"Replayed against {report['base_url']} at {report['speed']:g}x in {report['wall_time_s']}s")
+            for path, data in report['endpoints'].items():
+                latency = data['latency']
+                print(f"  {path:<45} n={latency['count']:<6} p50={latency['p50_ms']} ms "
+                      f"p99={latency['p99_ms']} ms  {data['status_codes']}")
+            if args.report:
+                with open(args.report, 'w') as f:
+                    json.dump(report, f, indent=2)
+                print(f"Detailed report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
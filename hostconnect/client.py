@@ -0,0 +1,459 @@
+"""
+HostConnect Client
+A keep-alive, connection-pooled client for the Tourplan HostConnect API.
+
+Every script used to call requests.post() directly, which opens a new TCP+TLS
+connection per request. Over the VPN egress that handshake is most of the
+round trip, so all HostConnect traffic now goes through one pooled session.
+"""
+
+import copy
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hostconnect.builders import (
+    build_agent_info_request,
+    build_option_info_request,
+    build_ping_request,
+)
+from hostconnect.cache import ReplyCache, info_code, is_terminal_error, option_info_cache_key
+from hostconnect.config import (
+    ADAPTIVE_TIMEOUTS,
+    AGENT_ID,
+    API_BASE_URL,
+    BREAKER_ENABLED,
+    CASSETTE_MODE,
+    CASSETTE_PATH,
+    DEFAULT_TIMEOUT,
+    DISK_CACHE_PATH,
+    PASSWORD,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    PROBE_TIMEOUT,
+    ROUTER_ENDPOINTS,
+    SOAP_HEADERS,
+    SOAP_SEARCH_URL,
+    XML_HEADERS,
+)
+from hostconnect.parser import ReplyReader, error_code
+from hostconnect.resilience import AdaptiveTimeouts, CircuitBreakers
+from hostconnect.singleflight import SingleFlight
+from hostconnect.timing import PhaseStats, capture, instrument
+
+_UNPARSED = object()
+
+
+class HostConnectReply:
+    """A fully read HostConnect HTTP reply"""
+
+    def __init__(self, status_code, headers, content, elapsed_ms, url,
+                 encoding=None, request_body=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed_ms = elapsed_ms
+        self.url = url
+        self.encoding = encoding
+        self.request_body = request_body
+        self.from_cache = False
+        self.phases = None
+        self._reply_type = _UNPARSED
+
+    @property
+    def text(self):
+        """Reply body decoded to str"""
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def reader(self):
+        """A fresh streaming ReplyReader over the body"""
+        return ReplyReader(self.content)
+
+    @property
+    def reply_type(self):
+        """First element inside <Reply> (e.g. OptionInfoReply, ErrorReply), or None"""
+        if self._reply_type is _UNPARSED:
+            self._reply_type = self.reader().reply_type
+        return self._reply_type
+
+    @property
+    def errors(self):
+        """All <Error> messages of an ErrorReply (or SOAP faultstrings)"""
+        if self.reply_type not in ("ErrorReply", "Fault"):
+            return []
+        return self.reader().errors()
+
+    @property
+    def error(self):
+        """First error message, or None"""
+        errors = self.errors
+        return errors[0] if errors else None
+
+    @property
+    def error_code(self):
+        """Numeric HostConnect error code of the first error (e.g. "2050"), or None"""
+        return error_code(self.error)
+
+    def findtext(self, name):
+        """Text of the first element called name, or None"""
+        return self.reader().find_text(name)
+
+    @classmethod
+    def from_response(cls, response, elapsed_ms, request_body=None):
+        """Build a reply from a requests.Response (reads the whole body)"""
+        return cls(
+            response.status_code,
+            dict(response.headers),
+            response.content,
+            elapsed_ms,
+            response.url,
+            encoding=response.encoding,
+            request_body=request_body,
+        )
+
+
+class StreamedReply:
+    """A HostConnect reply parsed straight off the socket
+
+    The body is never buffered: reply_type is classified from the first
+    element, then options() or errors() consumes the rest. Close it (or use it
+    as a context manager) to hand the connection back to the pool.
+    """
+
+    def __init__(self, response, elapsed_ms=None, request_body=None):
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.elapsed_ms = elapsed_ms  # up to the response headers; the body is still unread
+        self.url = response.url
+        self.request_body = request_body
+        self.phases = None
+        self._response = response
+        self._errors = None
+        response.raw.decode_content = True
+        self._reader = ReplyReader(response.raw)
+        self.reply_type = self._reader.reply_type
+
+    def options(self):
+        """Yield Option records one at a time"""
+        if self.reply_type != "OptionInfoReply":
+            return
+        yield from self._reader.options()
+
+    def errors(self):
+        """All <Error> messages of an ErrorReply (read once)"""
+        if self._errors is None:
+            self._errors = self._reader.errors()
+        return self._errors
+
+    @property
+    def error(self):
+        """First error message of an ErrorReply (or SOAP fault), or None"""
+        if self.reply_type not in ("ErrorReply", "Fault"):
+            return None
+        errors = self.errors()
+        return errors[0] if errors else None
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class HostConnectClient:
+    """Pooled HostConnect client with typed request methods
+
+    Network errors propagate as requests.exceptions.RequestException, so callers
+    keep their existing error handling. With a ReplyCache attached, successful
+    OptionInfo replies are served from it (reply.from_cache is then True).
+    Concurrent identical OptionInfo requests share one upstream call. Stale
+    entries are served immediately and refreshed in the background, and
+    terminal ErrorReply results (e.g. 2050) are cached briefly. With a
+    Cassette attached, all traffic is recorded to it or replayed from it.
+
+    Every request that reaches the server carries a DNS/connect/TLS/TTFB/body
+    breakdown (reply.phases), aggregated per request type and Info code in
+    phase_stats. With an EndpointRouter attached, requests without an explicit
+    url go to the healthiest of its endpoints and fail over between them. With
+    AdaptiveTimeouts, timeouts follow observed latency (the fixed timeout is
+    the ceiling); with CircuitBreakers, a URL that keeps failing fails fast
+    with CircuitOpenError until a trial call succeeds again.
+    """
+
+    def __init__(self, url=API_BASE_URL, agent_id=AGENT_ID, password=PASSWORD,
+                 timeout=DEFAULT_TIMEOUT, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, cache=None, cassette=None, router=None, timeouts=None,
+                 breakers=None):
+        self.url = url
+        self.agent_id = agent_id
+        self.password = password
+        self.timeout = timeout
+        self.cache = cache
+        self.cassette = cassette
+        self.router = router
+        self.timeouts = timeouts
+        self.breakers = breakers
+        self.flights = SingleFlight()
+        self.phase_stats = PhaseStats()
+
+        self.session = requests.Session()
+        pool_settings = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        if cassette is not None:
+            from hostconnect.cassette import CassetteAdapter
+            self._adapter = CassetteAdapter(cassette, **pool_settings)
+        else:
+            self._adapter = HTTPAdapter(**pool_settings)
+        instrument(self._adapter)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+    def post(self, body, url=None, headers=None, timeout=None, request_name=None, info=None, stream=False):
+        """POST a raw request body and return the fully read reply (a StreamedReply if stream)
+
+        request_name and info label the request in phase_stats (the URL path
+        is used when there is no request_name).
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        if url is None and self.router is not None:
+            return self.router.send(lambda endpoint_url: self._post(body, endpoint_url, headers, timeout,
+                                                                    request_name, info, stream))
+        return self._post(body, url or self.url, headers, timeout, request_name, info, stream)
+
+    def _post(self, body, url, headers, timeout, request_name, info, stream=False):
+        return self._send("POST", url, request_name or urlsplit(url).path, info, timeout or self.timeout,
+                          stream=stream, data=body, headers=headers or XML_HEADERS)
+
+    def _send(self, method, url, label, info, timeout, stream=False, **kwargs):
+        """One HTTP request, through the URL's circuit breaker and with an adaptive timeout
+
+        With stream, the body is left on the socket and a StreamedReply is
+        returned; its timings then end at the response headers.
+        """
+        key = (label, info)
+        if self.timeouts is not None:
+            timeout = self.timeouts.timeout_for(key, timeout)
+        breaker = self.breakers.get(url) if self.breakers is not None else None
+        if breaker is not None:
+            breaker.before()
+
+        failed = True
+        try:
+            with capture() as phases:
+                response = self.session.request(method, url, timeout=timeout, stream=stream, **kwargs)
+            if stream:
+                reply = StreamedReply(response, int(phases.total_ms), request_body=kwargs.get('data'))
+            else:
+                reply = HostConnectReply.from_response(response, int(phases.total_ms),
+                                                       request_body=kwargs.get('data'))
+            failed = reply.status_code >= 500
+        except requests.exceptions.Timeout:
+            if self.timeouts is not None:
+                # Censored at the timeout, so a slower Tourplan raises the timeout
+                self.timeouts.record(key, timeout)
+            raise
+        finally:
+            if breaker is not None:
+                breaker.record(failed)
+
+        if self.timeouts is not None:
+            self.timeouts.record(key, phases.total_ms / 1000)
+        if phases.ttfb_ms is not None:
+            reply.phases = phases
+            self.phase_stats.record(label, phases, info)
+        return reply
+
+    def post_soap(self, envelope, url=SOAP_SEARCH_URL, headers=None, timeout=None):
+        """POST a SOAP envelope (SearchTours etc.)"""
+        return self.post(envelope, url=url, headers=headers or SOAP_HEADERS, timeout=timeout)
+
+    def get(self, url=None, timeout=PROBE_TIMEOUT):
+        """Plain GET, used as a reachability probe"""
+        return self._send("GET", url or self.url, "GET", None, timeout)
+
+    def ping(self, timeout=None):
+        """Send a PingRequest"""
+        return self.post(build_ping_request(), timeout=timeout, request_name="PingRequest")
+
+    def agent_info(self, return_account_info=True, timeout=None):
+        """Send an AgentInfoRequest for the configured agent"""
+        xml_request = build_agent_info_request(self.agent_id, self.password, return_account_info)
+        return self.post(xml_request, timeout=timeout, request_name="AgentInfoRequest")
+
+    def option_info(self, opt=None, button_name=None, destination_name=None, info="G",
+                    date_from=None, date_to=None, rate_convert=None, room_configs=None,
+                    timeout=None):
+        """Send an OptionInfoRequest for the configured agent"""
+        params = {
+            'opt': opt,
+            'button_name': button_name,
+            'destination_name': destination_name,
+            'info': info,
+            'date_from': date_from,
+            'date_to': date_to,
+            'rate_convert': rate_convert,
+            'room_configs': room_configs,
+        }
+        cache_key = option_info_cache_key(**params)
+
+        def fetch():
+            xml_request = build_option_info_request(self.agent_id, self.password, **params)
+            reply = self.post(xml_request, timeout=timeout, request_name="OptionInfoRequest",
+                              info=info_code(info or "G"))
+            if self.cache is not None and reply.status_code == 200:
+                if reply.reply_type == "OptionInfoReply":
+                    self.cache.put(cache_key, reply, self.cache.ttl_for(info))
+                elif is_terminal_error(reply):
+                    self.cache.put_negative(cache_key, reply)
+            return reply
+
+        if self.cache is not None:
+            cached, stale = self.cache.lookup(cache_key)
+            if cached is not None:
+                if stale and self.cache.begin_revalidation(cache_key):
+                    self._revalidate(cache_key, fetch)
+                reply = copy.copy(cached)
+                reply.from_cache = True
+                reply.phases = None
+                return reply
+
+        return self.flights.do(cache_key, fetch)
+
+    def _revalidate(self, cache_key, fetch):
+        """Refresh a stale cache entry in the background
+
+        A failed refresh leaves the stale entry in place until its grace
+        window ends, after which callers go upstream again.
+        """
+        def run():
+            try:
+                self.flights.do(cache_key, fetch)
+            except requests.exceptions.RequestException:
+                pass
+            finally:
+                self.cache.end_revalidation(cache_key)
+
+        threading.Thread(target=run, name="hostconnect-revalidate", daemon=True).start()
+
+    def stream_option_info(self, timeout=None, **params):
+        """Send an OptionInfoRequest and parse the reply incrementally
+
+        Use for large GS/rates replies:
+            with client.stream_option_info(button_name="Day Tours", info="GS") as reply:
+                for option in reply.options():
+                    ...
+        It goes through the same router, circuit breaker, adaptive timeout and
+        phase_stats as post(); the reply cache and request coalescing do not
+        apply, since the body is never held in memory.
+        """
+        body = build_option_info_request(self.agent_id, self.password, **params)
+        return self.post(body, timeout=timeout, request_name="OptionInfoRequest",
+                         info=info_code(params.get('info') or "G"), stream=True)
+
+    def connection_stats(self):
+        """Connection reuse across every pool this client has opened
+
+        reuse_ratio is the share of requests that went out on an already
+        established connection (i.e. skipped the TCP+TLS handshake).
+        """
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        sent = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            sent += pool.num_requests
+
+        reused = max(sent - connections, 0)
+        return {
+            'requests': sent,
+            'connections': connections,
+            'reused': reused,
+            'reuse_ratio': (reused / sent) if sent else 0.0,
+        }
+
+    def connection_summary(self):
+        """One-line connection reuse summary for reports"""
+        stats = self.connection_stats()
+        return (
+            f"Connection reuse: {stats['reuse_ratio'] * 100:.1f}% "
+            f"({stats['connections']} connections for {stats['requests']} requests)"
+        )
+
+    def coalescing_stats(self):
+        """Single-flight counters: calls, upstream executions and coalesced calls"""
+        return self.flights.stats()
+
+    def cache_summary(self):
+        """One-line reply cache summary for reports, or None without a cache"""
+        return self.cache.summary() if self.cache is not None else None
+
+    def phase_summary(self):
+        """Per-phase latency summaries per request type and Info code"""
+        return self.phase_stats.summary()
+
+    def router_summary(self):
+        """Endpoint routing table for reports, or None without a router"""
+        return self.router.table() if self.router is not None else None
+
+    def breaker_summary(self):
+        """Circuit breaker table for reports, or None without breakers"""
+        return self.breakers.table() if self.breakers is not None else None
+
+    def cassette_summary(self):
+        """One-line cassette summary for reports, or None without a cassette"""
+        return self.cassette.summary() if self.cassette is not None else None
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Process-wide shared client, so every script and tester reuses one pool (and reply cache)
+
+    HOSTCONNECT_CASSETTE attaches a cassette (record or replay), and
+    HOSTCONNECT_ENDPOINTS an EndpointRouter. Adaptive timeouts and circuit
+    breakers are on unless HOSTCONNECT_ADAPTIVE_TIMEOUTS / HOSTCONNECT_BREAKER is 0.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            backing = None
+            if DISK_CACHE_PATH:
+                from hostconnect.disk_cache import DiskReplyCache
+                backing = DiskReplyCache(DISK_CACHE_PATH)
+            cassette = None
+            if CASSETTE_PATH:
+                from hostconnect.cassette import Cassette
+                cassette = Cassette(CASSETTE_PATH, mode=CASSETTE_MODE)
+            router = None
+            if ROUTER_ENDPOINTS:
+                from hostconnect.routing import EndpointRouter
+                router = EndpointRouter(ROUTER_ENDPOINTS)
+            _default_client = HostConnectClient(
+                cache=ReplyCache(backing=backing),
+                cassette=cassette,
+                router=router,
+                timeouts=AdaptiveTimeouts() if ADAPTIVE_TIMEOUTS else None,
+                breakers=CircuitBreakers() if BREAKER_ENABLED else None,
+            )
+        return _default_client
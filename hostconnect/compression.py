@@ -0,0 +1,30 @@
+"""
+HostConnect Body Compression
+zstd when the zstandard package is installed, gzip otherwise.
+
+The codec name is stored next to every compressed body, so files written on
+a machine with zstandard stay readable (as misses) on one without it.
+"""
+
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
+
+def compress(content):
+    """(codec, compressed bytes) using the best codec available"""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(content)
+    return "gzip", gzip.compress(content, compresslevel=6)
+
+
+def decompress(codec, data):
+    """Inverse of compress(); None if the codec is not available here"""
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return None
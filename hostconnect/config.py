@@ -0,0 +1,167 @@
+"""
+HostConnect Configuration
+Endpoints, credentials and transport defaults shared by the Tourplan test scripts.
+"""
+
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Local HostConnect stand-in (python -m hostconnect.standin). Setting
+# HOSTCONNECT_STANDIN=http://127.0.0.1:8900 points every script at it instead of Tourplan.
+STANDIN_URL = os.environ.get("HOSTCONNECT_STANDIN", "").rstrip("/")
+STANDIN_PORT = 8900
+
+# API Configuration
+TOURPLAN_HOST_URL = STANDIN_URL or "https://pa-thisis.nx.tourplan.net"
+API_BASE_URL = f"{TOURPLAN_HOST_URL}/hostconnect_test/api/hostConnectApi"
+SOAP_SEARCH_URL = f"{TOURPLAN_HOST_URL}/soap/search"
+LOCAL_API_URL = "http://localhost:3000"
+AGENT_ID = "SAMAGT"
+PASSWORD = "S@MAgt01"
+
+# Request format
+DTD_NAME = "hostConnect_5_05_000.dtd"
+XML_HEADERS = {
+    'Content-Type': 'application/xml',
+    'Accept': 'application/xml'
+}
+SOAP_HEADERS = {
+    'Content-Type': 'text/xml; charset=utf-8',
+    'SOAPAction': ''
+}
+
+# Transport defaults (seconds / connections)
+DEFAULT_TIMEOUT = 30
+PROBE_TIMEOUT = 10
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+# Async fan-out (concurrent requests in flight)
+DEFAULT_CONCURRENCY = 5
+
+# Multi-Opt batching (OptionInfoBatcher): send when either limit is reached
+BATCH_MAX_OPTIONS = 25
+BATCH_WINDOW_MS = 10
+
+# Reply cache (seconds per OptionInfo Info code; combined codes use the shortest)
+CACHE_MAX_ENTRIES = 1024
+CACHE_DEFAULT_TTL = 300
+CACHE_TTLS = {
+    'G': 6 * 3600,  # General info
+    'R': 30 * 60,   # Rates
+    'S': 10 * 60,   # Stay pricing
+    'A': 2 * 60,    # Availability
+}
+
+# Disk reply cache shared by all processes (HOSTCONNECT_CACHE_PATH="" disables it).
+# Stand-in replies are kept apart from real Tourplan ones.
+DISK_CACHE_PATH = os.environ.get(
+    "HOSTCONNECT_CACHE_PATH",
+    os.path.join(REPO_ROOT, ".hostconnect_cache.standin.sqlite3" if STANDIN_URL else ".hostconnect_cache.sqlite3"),
+)
+DISK_CACHE_COMPACT_INTERVAL = 300
+
+# Stale-while-revalidate: expired replies are still served for this long while refreshed
+CACHE_STALE_GRACE = 120
+
+# Negative caching of ErrorReply results that will fail again (seconds)
+NEGATIVE_CACHE_TTL = 60
+NEGATIVE_CACHE_ERROR_CODES = {"2050"}
+NEGATIVE_CACHE_MESSAGES = ("not found", "invalid option")
+
+# Record/replay cassette (python -m hostconnect.cassette). HOSTCONNECT_CASSETTE=path
+# attaches it to the default client; mode is "record" or "replay", speed 0 = no delays.
+CASSETTE_PATH = os.environ.get("HOSTCONNECT_CASSETTE", "")
+CASSETTE_MODE = os.environ.get("HOSTCONNECT_CASSETTE_MODE", "replay")
+REPLAY_SPEED = float(os.environ.get("HOSTCONNECT_REPLAY_SPEED", "1.0"))
+
+# Streaming tester results (JSONL): flush every N seconds or N lines; failures kept for the report
+RESULTS_FLUSH_INTERVAL = 1.0
+RESULTS_BUFFER_SIZE = 100
+RESULTS_MAX_FAILURES = 50
+
+# Latency trend store (python -m hostconnect.trends): the latest TRENDS_RECENT_RUNS runs
+# are compared with the TRENDS_BASELINE_RUNS before them; a regression needs p < alpha
+# and a median slowdown of at least TRENDS_MIN_SLOWDOWN
+TRENDS_DB_PATH = os.environ.get("HOSTCONNECT_TRENDS_DB", os.path.join(REPO_ROOT, ".hostconnect_trends.sqlite3"))
+TRENDS_RECENT_RUNS = 5
+TRENDS_BASELINE_RUNS = 20
+TRENDS_ALPHA = 0.01
+TRENDS_MIN_SLOWDOWN = 0.10
+
+# Request/response bodies in tester output: "never", "failures" or "always"; bodies longer
+# than LOG_BODY_MAX_CHARS are cut off, and written out in full to LOG_BODY_SPILL_DIR if set
+LOG_BODIES = os.environ.get("HOSTCONNECT_LOG_BODIES", "failures")
+LOG_BODY_MAX_CHARS = int(os.environ.get("HOSTCONNECT_LOG_BODY_MAX_CHARS", "4000"))
+LOG_BODY_SPILL_DIR = os.environ.get("HOSTCONNECT_LOG_BODY_DIR", "")
+
+# Tester suites: test methods run concurrently, at most this many at a time
+RUNNER_MAX_WORKERS = 8
+
+# The suite's load test drives only the read-only local API endpoints unless
+# HOSTCONNECT_LOAD_WRITES=1, which adds booking creation and payment processing
+LOAD_TEST_WRITES = os.environ.get("HOSTCONNECT_LOAD_WRITES", "") == "1"
+
+# Egress IP check (python -m hostconnect.egress): the echo services are asked concurrently
+# and the first address EGRESS_QUORUM of them agree on is cached in a file shared by every
+# process for EGRESS_CACHE_TTL seconds. With HOSTCONNECT_STANDIN set, the stand-in's echo is used.
+EXPECTED_EGRESS_IP = os.environ.get("HOSTCONNECT_EXPECTED_IP", "84.46.231.251")
+EGRESS_QUORUM = 2
+EGRESS_TIMEOUT = 5
+EGRESS_CACHE_TTL = 60
+EGRESS_CACHE_PATH = os.environ.get("HOSTCONNECT_EGRESS_CACHE", os.path.join(REPO_ROOT, ".hostconnect_egress.json"))
+
+# VPN / whitelist health monitor (python -m hostconnect.monitor): each probe (egress IP,
+# PingRequest, AgentInfoRequest) repeats every MONITOR_INTERVAL seconds +/- MONITOR_JITTER,
+# recording into a ring buffer of MONITOR_CAPACITY samples (about a week at the defaults)
+MONITOR_INTERVAL = float(os.environ.get("HOSTCONNECT_MONITOR_INTERVAL", "60"))
+MONITOR_JITTER = 0.2
+MONITOR_CAPACITY = 32768
+MONITOR_PATH = os.environ.get(
+    "HOSTCONNECT_MONITOR_FILE",
+    os.path.join(REPO_ROOT, ".hostconnect_monitor.standin.ring" if STANDIN_URL else ".hostconnect_monitor.ring"),
+)
+
+# Endpoint x request format discovery (python -m hostconnect.discovery): the working
+# combination is remembered for DISCOVERY_TTL seconds, "nothing works" for DISCOVERY_RETRY
+DISCOVERY_TTL = 6 * 3600
+DISCOVERY_RETRY = 60
+DISCOVERY_PATH = os.environ.get(
+    "HOSTCONNECT_DISCOVERY_FILE",
+    os.path.join(REPO_ROOT, ".hostconnect_discovery.json"),
+)
+
+# Endpoint routing (hostconnect.routing): EWMA weight of the latest call, consecutive failures
+# before an endpoint leaves rotation, its cooldown in seconds (doubling per failed passive
+# probe) and the share of calls sent to a slower endpoint to keep its averages fresh.
+# HOSTCONNECT_ENDPOINTS="name=url,name=url" routes the default client between those URLs.
+ROUTER_ENDPOINTS = dict(
+    entry.strip().split("=", 1)
+    for entry in os.environ.get("HOSTCONNECT_ENDPOINTS", "").split(",")
+    if "=" in entry
+)
+ROUTER_EWMA_ALPHA = 0.2
+ROUTER_EJECT_AFTER = 3
+ROUTER_COOLDOWN = 30
+ROUTER_MAX_COOLDOWN = 300
+ROUTER_EXPLORE = 0.05
+
+# Adaptive timeouts (hostconnect.resilience): per request type, MULTIPLIER x the PERCENTILE of
+# the last WINDOW latencies once MIN_SAMPLES are in, at least MIN seconds; a call site's own
+# timeout stays the ceiling. HOSTCONNECT_ADAPTIVE_TIMEOUTS=0 turns them off for the default client.
+ADAPTIVE_TIMEOUTS = os.environ.get("HOSTCONNECT_ADAPTIVE_TIMEOUTS", "1") != "0"
+ADAPTIVE_TIMEOUT_PERCENTILE = 99
+ADAPTIVE_TIMEOUT_MULTIPLIER = 3
+ADAPTIVE_TIMEOUT_MIN = 2.0
+ADAPTIVE_TIMEOUT_WINDOW = 256
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 20
+
+# Circuit breaker per URL: opens when BREAKER_FAILURE_RATE of the last BREAKER_WINDOW calls
+# (at least BREAKER_MIN_CALLS) failed, lets a trial call through after BREAKER_OPEN_SECONDS.
+# HOSTCONNECT_BREAKER=0 turns it off for the default client.
+BREAKER_ENABLED = os.environ.get("HOSTCONNECT_BREAKER", "1") != "0"
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 10
+BREAKER_OPEN_SECONDS = 30
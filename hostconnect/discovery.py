@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+HostConnect Format Discovery
+Finds which endpoint and request format combination actually answers.
+
+Tourplan has not told us which search dialect this HostConnect install
+accepts (SearchRequest, TourSearchRequest, SOAP SearchTours or an
+OptionInfoRequest search) or at which endpoint; test_hostconnect_search.py
+and test_correct_soap_endpoint.py report on the same candidates.
+FormatDiscovery probes every endpoint x format candidate at once, records
+which ones work and how long each took, and keeps the winner (the most
+preferred working format, fastest endpoint first) in a small JSON file for
+DISCOVERY_TTL seconds. Production calls go straight to the winner; only when
+it stops working (a transport error, or an ErrorReply refusing the request
+format itself) is everything probed again. Other replies, such as errors
+about the criteria, are handed back as they are. When nothing works, that is
+remembered for DISCOVERY_RETRY seconds, so a VPN outage does not turn every
+call into a full probe.
+
+Usage:
+    python -m hostconnect.discovery            # remembered winner if fresh
+    python -m hostconnect.discovery --refresh  # probe every candidate
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from hostconnect.builders import build_option_info_request, build_search_request, build_soap_search_request
+from hostconnect.config import (
+    API_BASE_URL,
+    DISCOVERY_PATH,
+    DISCOVERY_RETRY,
+    DISCOVERY_TTL,
+    PROBE_TIMEOUT,
+    SOAP_HEADERS,
+    SOAP_SEARCH_URL,
+    XML_HEADERS,
+)
+
+
+class NoWorkingFormat(Exception):
+    """No endpoint x format candidate answered successfully"""
+
+
+class RequestFormat:
+    """One request dialect: how to build it for given criteria and which replies mean it worked"""
+
+    def __init__(self, name, build, headers=XML_HEADERS, replies=()):
+        self.name = name
+        self.build = build  # build(client, params) -> request body
+        self.headers = headers
+        self.replies = tuple(replies)
+
+    def accepts(self, reply):
+        return reply.status_code == 200 and reply.reply_type in self.replies
+
+
+def rejects_format(reply):
+    """Whether a reply says the request format is not understood (see FORMAT_REJECTIONS)"""
+    return reply.reply_type == "ErrorReply" and any(text in (reply.error or "") for text in FORMAT_REJECTIONS)
+
+
+class Candidate:
+    """A request format sent to one endpoint"""
+
+    def __init__(self, request_format, endpoint, url):
+        self.format = request_format
+        self.endpoint = endpoint
+        self.url = url
+        self.name = f"{request_format.name}@{endpoint}"
+
+    def send(self, client, params, timeout=None):
+        body = self.format.build(client, params)
+        return client.post(body, url=self.url, headers=self.format.headers, timeout=timeout,
+                           request_name=self.format.name)
+
+
+class ProbeResult:
+    """Outcome of sending one candidate (reply is kept in memory only)"""
+
+    def __init__(self, name, ok, latency_ms=None, status_code=None, reply_type=None, error=None, reply=None):
+        self.name = name
+        self.ok = ok
+        self.latency_ms = latency_ms
+        self.status_code = status_code
+        self.reply_type = reply_type
+        self.error = error
+        self.reply = reply
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'ok': self.ok,
+            'latency_ms': self.latency_ms,
+            'status_code': self.status_code,
+            'reply_type': self.reply_type,
+            'error': self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['ok'], data.get('latency_ms'), data.get('status_code'),
+                   data.get('reply_type'), data.get('error'))
+
+
+# Preferred first: a real search reply beats the OptionInfo fallback
+SEARCH_FORMATS = [
+    RequestFormat(
+        "SearchRequest",
+        lambda client, params: build_search_request(client.agent_id, client.password, **params),
+        replies=("SearchReply",),
+    ),
+    RequestFormat(
+        "TourSearchRequest",
+        lambda client, params: build_search_request(client.agent_id, client.password,
+                                                    request_name="TourSearchRequest", **params),
+        replies=("TourSearchReply",),
+    ),
+    RequestFormat(
+        "SearchTours",
+        lambda client, params: build_soap_search_request(client.agent_id, client.password, client.agent_id,
+                                                         **params),
+        headers=SOAP_HEADERS,
+        replies=("SearchToursResponse",),
+    ),
+    RequestFormat(
+        "OptionInfoRequest",
+        lambda client, params: build_option_info_request(client.agent_id, client.password,
+                                                         destination_name=params.get("destination"), info="G"),
+        replies=("OptionInfoReply",),
+    ),
+]
+
+SEARCH_ENDPOINTS = {'hostconnect': API_BASE_URL, 'soap': SOAP_SEARCH_URL}
+
+# ErrorReply text meaning the endpoint refused the request format, not the criteria
+FORMAT_REJECTIONS = ("was not expected", "Unsupported request")
+
+SEARCH_PROBE_PARAMS = {'country': "South Africa", 'destination': "Cape Town"}
+
+
+class FormatDiscovery:
+    """Concurrent endpoint x format probing with a remembered winner
+
+    params are the criteria sent with the probes; production calls pass their own.
+    """
+
+    def __init__(self, name="search", formats=SEARCH_FORMATS, endpoints=SEARCH_ENDPOINTS,
+                 params=SEARCH_PROBE_PARAMS, client=None, path=DISCOVERY_PATH, ttl=DISCOVERY_TTL,
+                 retry=DISCOVERY_RETRY, timeout=PROBE_TIMEOUT):
+        if client is None:
+            from hostconnect import get_default_client
+            client = get_default_client()
+        self.name = name
+        self.client = client
+        self.params = params
+        self.path = path
+        self.ttl = ttl
+        self.retry = retry
+        self.timeout = timeout
+        self.candidates = {candidate.name: candidate
+                           for candidate in (Candidate(request_format, endpoint, url)
+                                             for request_format in formats for endpoint, url in endpoints.items())}
+        self.results = []
+        self.winner_name = None
+        self.checked_at = None
+        self.from_cache = False
+        self._lock = threading.Lock()
+
+    def _fingerprint(self):
+        # A remembered winner only counts for the same candidates at the same URLs
+        return [[candidate.name, candidate.url] for candidate in self.candidates.values()]
+
+    def _probe(self, candidate):
+        try:
+            reply = candidate.send(self.client, self.params, self.timeout)
+        except requests.exceptions.RequestException as e:
+            return ProbeResult(candidate.name, False, error=f"{type(e).__name__}: {e}")
+        latency_ms = reply.phases.total_ms if reply.phases else reply.elapsed_ms
+        ok = candidate.format.accepts(reply)
+        return ProbeResult(candidate.name, ok, round(latency_ms, 1), reply.status_code, reply.reply_type,
+                           None if ok else reply.error, reply)
+
+    def probe_all(self):
+        """Send every candidate concurrently; results in candidate order"""
+        with ThreadPoolExecutor(max_workers=len(self.candidates), thread_name_prefix="hostconnect-discovery") as pool:
+            return list(pool.map(self._probe, self.candidates.values()))
+
+    def _pick(self, results):
+        ranks = {}
+        for candidate in self.candidates.values():
+            ranks.setdefault(candidate.format.name, len(ranks))
+        working = [result for result in results if result.ok]
+        if not working:
+            return None
+        return min(working, key=lambda result: (ranks[self.candidates[result.name].format.name],
+                                                result.latency_ms)).name
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entry = json.load(f).get(self.name)
+        except (OSError, ValueError, AttributeError):
+            return False
+        if not entry or entry.get('candidates') != self._fingerprint():
+            return False
+        age = time.time() - entry.get('checked_at', 0)
+        if age > (self.ttl if entry.get('winner') else self.retry):
+            return False
+        self.results = [ProbeResult.from_dict(result) for result in entry.get('results', [])]
+        self.winner_name = entry.get('winner')
+        self.checked_at = entry['checked_at']
+        self.from_cache = True
+        return True
+
+    def _store(self):
+        """Read-modify-write of this discovery's entry, replaced atomically"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data[self.name] = {
+            'candidates': self._fingerprint(),
+            'winner': self.winner_name,
+            'checked_at': self.checked_at,
+            'results': [result.as_dict() for result in self.results],
+        }
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def discover(self, refresh=False):
+        """Probe every candidate (unless a remembered result is fresh); returns the winner or None"""
+        with self._lock:
+            if refresh or not self._load():
+                self.results = self.probe_all()
+                self.winner_name = self._pick(self.results)
+                self.checked_at = time.time()
+                self.from_cache = False
+                if self.path:
+                    self._store()
+            return self.candidates.get(self.winner_name)
+
+    def winner(self):
+        """The remembered (or freshly discovered) working candidate, or None"""
+        if self.checked_at and time.time() - self.checked_at <= (self.ttl if self.winner_name else self.retry):
+            return self.candidates.get(self.winner_name)
+        return self.discover()
+
+    def send(self, params=None, timeout=None):
+        """Send to the winner; if the winner stopped working, probe again and retry once on the new winner
+
+        Only a transport error or a reply rejecting the format counts as the winner
+        no longer working; any other reply (e.g. an ErrorReply about the criteria)
+        is returned as it is, so bad input does not set off a re-probe.
+        Returns (candidate, reply). Raises NoWorkingFormat when no candidate works.
+        """
+        params = self.params if params is None else params
+        candidate = self.winner()
+        if candidate is None:
+            raise NoWorkingFormat(f"No working {self.name} format ({self.summary()})")
+        failed = candidate.name
+        try:
+            reply = candidate.send(self.client, params, timeout)
+        except requests.exceptions.RequestException:
+            pass
+        else:
+            if not rejects_format(reply):
+                return candidate, reply
+
+        with self._lock:
+            # Someone else may have re-probed while we were waiting
+            stale = self.winner_name == failed
+        candidate = self.discover(refresh=True) if stale else self.winner()
+        if candidate is None:
+            raise NoWorkingFormat(f"No working {self.name} format ({self.summary()})")
+        return candidate, candidate.send(self.client, params, timeout)
+
+    def endpoints_for(self, format_name):
+        """{endpoint: url} of the endpoints a format worked at in the last probe (for EndpointRouter)"""
+        return {self.candidates[result.name].endpoint: self.candidates[result.name].url
+                for result in self.results
+                if result.ok and self.candidates[result.name].format.name == format_name}
+
+    def summary(self):
+        """One line for reports"""
+        source = f"checked {time.time() - self.checked_at:.0f}s ago" if self.checked_at else "not checked"
+        if self.from_cache:
+            source = f"remembered, {source}"
+        working = sum(result.ok for result in self.results)
+        winner = self.winner_name or "none"
+        return f"{self.name}: winner {winner} ({working}/{len(self.candidates)} candidates work, {source})"
+
+    def table(self):
+        """Text table of every candidate's probe result"""
+        lines = [self.summary()]
+        for result in self.results:
+            marker = "✅" if result.ok else "❌"
+            latency = f"{result.latency_ms:.0f}ms" if result.latency_ms is not None else "-"
+            outcome = result.reply_type or (f"HTTP {result.status_code}" if result.status_code else "")
+            detail = f" - {result.error}" if result.error else ""
+            star = " *" if result.name == self.winner_name else ""
+            lines.append(f"  {marker} {result.name:<32}{latency:>9}  {outcome}{detail}{star}")
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the working HostConnect search endpoint and format")
+    parser.add_argument("--refresh", action="store_true", help="ignore the remembered winner and probe again")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    discovery = FormatDiscovery()
+    discovery.discover(refresh=args.refresh)
+    if args.json:
+        print(json.dumps({'winner': discovery.winner_name, 'checked_at': discovery.checked_at,
+                          'from_cache': discovery.from_cache,
+                          'results': [result.as_dict() for result in discovery.results]}, indent=2))
+    else:
+        print(discovery.table())
+    raise SystemExit(0 if discovery.winner_name else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+HostConnect Disk Cache
+Persistent reply cache shared by every Python process on the machine.
+
+Test runs, cron jobs and debugging scripts are separate processes, so the
+in-memory ReplyCache starts cold in each of them. DiskReplyCache keeps
+replies in a SQLite database in WAL mode (concurrent readers, one writer,
+no reader/writer blocking) with compressed bodies - zstd when the zstandard
+package is installed, gzip otherwise - and an index on the expiry time. A
+background thread deletes rows past their stale grace window and returns
+their pages to the file.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from hostconnect.client import HostConnectReply
+from hostconnect.compression import compress, decompress
+from hostconnect.config import DISK_CACHE_COMPACT_INTERVAL, DISK_CACHE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replies (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    url TEXT,
+    encoding TEXT,
+    elapsed_ms INTEGER,
+    codec TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS replies_stale_until ON replies (stale_until);
+"""
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+INCREMENTAL_VACUUM = 2
+
+# Expired rows deleted per statement, so compaction never holds the write lock for long
+COMPACT_BATCH = 500
+
+
+class DiskReplyCache:
+    """Cross-process reply cache in a SQLite WAL database
+
+    Each thread gets its own connection. Expiry uses wall-clock time, since
+    the entries outlive the process that wrote them.
+    """
+
+    def __init__(self, path=DISK_CACHE_PATH, compact_interval=DISK_CACHE_COMPACT_INTERVAL):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expirations': 0, 'writes': 0, 'compacted': 0}
+        self._stop = threading.Event()
+
+        connection = self._connection()
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL_VACUUM:
+            # A cache created before auto_vacuum was set first: VACUUM once to apply it
+            try:
+                connection.execute("VACUUM")
+            except sqlite3.Error:
+                # Another process is using it; compaction still deletes rows meanwhile
+                pass
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(replies)")}
+        if columns and "stale_until" not in columns:
+            # Caches written before stale-while-revalidate: rows have no grace window
+            connection.execute("ALTER TABLE replies ADD COLUMN stale_until REAL NOT NULL DEFAULT 0")
+            connection.execute("UPDATE replies SET stale_until = expires_at")
+            connection.execute("DROP INDEX IF EXISTS replies_expires_at")
+        connection.executescript(SCHEMA)
+
+        self._compactor = None
+        if compact_interval:
+            self._compactor = threading.Thread(
+                target=self._compact_loop,
+                args=(compact_interval,),
+                name="hostconnect-cache-compactor",
+                daemon=True,
+            )
+            self._compactor.start()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            # auto_vacuum only takes effect on a new database before WAL mode and the first table
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get_entry(self, key):
+        """(expires_at, stale_until, HostConnectReply), or None on a miss
+
+        Entries past expires_at but within their grace window are returned
+        too; the caller decides whether to serve them stale.
+        """
+        row = self._connection().execute(
+            "SELECT expires_at, stale_until, status_code, headers, url, encoding, elapsed_ms, codec, body "
+            "FROM replies WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+
+        expires_at, stale_until, status_code, headers, url, encoding, elapsed_ms, codec, body = row
+        if stale_until <= time.time():
+            self._count('expirations')
+            self._count('misses')
+            return None
+
+        content = decompress(codec, body)
+        if content is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        reply = HostConnectReply(status_code, json.loads(headers), content, elapsed_ms, url, encoding=encoding)
+        return expires_at, stale_until, reply
+
+    def get(self, key):
+        """Fresh cached HostConnectReply, or None"""
+        entry = self.get_entry(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[2]
+
+    def put(self, key, reply, ttl, grace=0):
+        """Store a reply for ttl seconds, then stale for grace (replacing any previous entry)"""
+        if ttl + grace <= 0:
+            return
+        now = time.time()
+        codec, body = compress(reply.content)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO replies "
+            "(key, expires_at, stale_until, stored_at, status_code, headers, url, encoding, elapsed_ms, codec, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, now + ttl, now + ttl + grace, now, reply.status_code, json.dumps(dict(reply.headers)), reply.url,
+             reply.encoding, reply.elapsed_ms, codec, body),
+        )
+        self._count('writes')
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None"""
+        if key is None:
+            self._connection().execute("DELETE FROM replies")
+        else:
+            self._connection().execute("DELETE FROM replies WHERE key = ?", (key,))
+
+    def compact(self):
+        """Delete rows past their grace window in small batches and release the freed pages"""
+        connection = self._connection()
+        removed = 0
+        while True:
+            cursor = connection.execute(
+                "DELETE FROM replies WHERE rowid IN "
+                "(SELECT rowid FROM replies WHERE stale_until <= ? LIMIT ?)",
+                (time.time(), COMPACT_BATCH),
+            )
+            removed += cursor.rowcount
+            if cursor.rowcount < COMPACT_BATCH:
+                break
+        if removed:
+            # execute() stops after freeing the first page; executescript() runs it to completion
+            connection.executescript("PRAGMA incremental_vacuum;")
+            self._count('compacted', removed)
+        return removed
+
+    def _compact_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except sqlite3.Error:
+                # Another process holds the write lock; try again next round
+                pass
+
+    def stats(self):
+        """Hit/miss counters of this process plus the shared row count"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['entries'] = self._connection().execute("SELECT COUNT(*) FROM replies").fetchone()[0]
+        return stats
+
+    def close(self):
+        """Stop the compactor and close this thread's connection"""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
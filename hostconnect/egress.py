@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+HostConnect Egress IP Check
+Which address Tourplan sees us coming from, agreed by several echo services.
+
+HostConnect only answers whitelisted IPs, so every VPN script starts by asking
+an IP echo service who we are. They used to ask httpbin, ipify,
+whatismyipaddress and ipinfo one after another with 10 s timeouts, and each
+script paid for it again. check_egress_ip() asks all of them at once and
+returns as soon as EGRESS_QUORUM of them agree (a single answer can be a
+transparent proxy or a stale service). A result that reached quorum is kept
+in a small JSON file for EGRESS_CACHE_TTL seconds, so scripts run back to
+back, in separate processes, share one check.
+
+With HOSTCONNECT_STANDIN set, the stand-in's echo endpoints are asked instead
+(python -m hostconnect.standin --egress-ip 84.46.231.251).
+
+Usage:
+    python -m hostconnect.egress            # cached result if fresh
+    python -m hostconnect.egress --refresh  # always ask the services
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+import requests
+
+from hostconnect.config import (
+    EGRESS_CACHE_PATH,
+    EGRESS_CACHE_TTL,
+    EGRESS_QUORUM,
+    EGRESS_TIMEOUT,
+    EXPECTED_EGRESS_IP,
+    STANDIN_URL,
+)
+from hostconnect.standin import IP_ECHO_FIELDS, IP_ECHO_PATH
+
+
+class IpService:
+    """One IP echo service: where to ask and which JSON field holds the address"""
+
+    def __init__(self, name, url, field=None):
+        self.name = name
+        self.url = url
+        self.field = field
+
+    def fetch(self, timeout):
+        """(ip, reply details) from the service; raises on any failure"""
+        response = requests.get(self.url, timeout=timeout)
+        response.raise_for_status()
+        if self.field is None:
+            return response.text.strip(), {}
+        data = response.json()
+        # httpbin lists every hop ("client, proxy"); the first is ours
+        return str(data[self.field]).split(",")[0].strip(), data
+
+
+IP_SERVICES = [
+    IpService("httpbin.org", "https://httpbin.org/ip", "origin"),
+    IpService("ipify.org", "https://api.ipify.org?format=json", "ip"),
+    IpService("whatismyipaddress.com", "https://ipv4bot.whatismyipaddress.com/"),
+    IpService("ipinfo.io", "https://ipinfo.io/json", "ip"),
+]
+
+
+def standin_services(base_url):
+    """The stand-in's local echo of every service"""
+    return [IpService(f"standin/{name}", f"{base_url}{IP_ECHO_PATH}{name}", field)
+            for name, field in IP_ECHO_FIELDS.items()]
+
+
+def default_services():
+    return standin_services(STANDIN_URL) if STANDIN_URL else IP_SERVICES
+
+
+class EgressResult:
+    """Outcome of one egress check
+
+    ip is the address at least quorum services agreed on, else the most
+    common answer (or None). answers maps each service to its address, or
+    None if it failed (see errors) or had not answered when the check ended.
+    """
+
+    def __init__(self, ip, agreed, quorum, answers, elapsed_ms, errors=None, details=None, checked_at=None,
+                 from_cache=False):
+        self.ip = ip
+        self.agreed = agreed
+        self.quorum = quorum
+        self.answers = answers
+        self.errors = errors or {}
+        self.elapsed_ms = elapsed_ms
+        self.details = details or {}
+        self.checked_at = checked_at or time.time()
+        self.from_cache = from_cache
+
+    @property
+    def quorum_met(self):
+        return self.ip is not None and self.agreed >= self.quorum
+
+    def matches(self, expected=EXPECTED_EGRESS_IP):
+        return self.quorum_met and self.ip == expected
+
+    def as_dict(self):
+        return {
+            'ip': self.ip,
+            'agreed': self.agreed,
+            'quorum': self.quorum,
+            'answers': self.answers,
+            'errors': self.errors,
+            'elapsed_ms': self.elapsed_ms,
+            'details': self.details,
+            'checked_at': self.checked_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data, from_cache=False):
+        return cls(data['ip'], data['agreed'], data['quorum'], data['answers'], data['elapsed_ms'],
+                   data.get('errors'), data.get('details'), data['checked_at'], from_cache)
+
+    def summary(self):
+        """One line for reports"""
+        source = f"cached {time.time() - self.checked_at:.0f}s ago" if self.from_cache else f"{self.elapsed_ms}ms"
+        if self.quorum_met:
+            return f"Egress IP: {self.ip} ({self.agreed}/{len(self.answers)} services agree, {source})"
+        return f"Egress IP: no quorum ({self.agreed}/{self.quorum} agree on {self.ip}, {source})"
+
+
+def _load_cached(path, ttl, services):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A stand-in answer must never stand in for the real services (or vice versa)
+    if data.get('services') != [service.url for service in services]:
+        return None
+    if time.time() - data.get('checked_at', 0) > ttl:
+        return None
+    try:
+        return EgressResult.from_dict(data, from_cache=True)
+    except (KeyError, TypeError):
+        return None
+
+
+def _store(path, result, services):
+    """Write atomically, so a concurrent reader never sees half a file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(result.as_dict(), services=[service.url for service in services]), f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def query_services(services, quorum=EGRESS_QUORUM, timeout=EGRESS_TIMEOUT):
+    """Ask every service concurrently; return once quorum agree or it can no longer happen"""
+    start_time = time.perf_counter()
+    answers = {service.name: None for service in services}
+    errors = {}
+    details = {}
+    replies = queue.Queue()
+
+    def ask(service):
+        try:
+            replies.put((service, *service.fetch(timeout), None))
+        except Exception as e:
+            replies.put((service, None, None, f"{type(e).__name__}: {e}"))
+
+    # Daemon threads: a service that hangs until its timeout never holds up the caller or exit
+    for service in services:
+        threading.Thread(target=ask, args=(service,), name=f"egress-{service.name}", daemon=True).start()
+
+    votes = Counter()
+    pending = len(services)
+    deadline = time.monotonic() + timeout + 1
+    while pending:
+        try:
+            service, ip, data, error = replies.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            break
+        pending -= 1
+        if error is not None:
+            errors[service.name] = error
+        else:
+            answers[service.name] = ip
+            votes[ip] += 1
+            if data and set(data) - {service.field}:
+                details[service.name] = {key: value for key, value in data.items() if key != service.field}
+        count = votes.most_common(1)[0][1] if votes else 0
+        if count >= quorum or count + pending < quorum:
+            break
+
+    ip, agreed = votes.most_common(1)[0] if votes else (None, 0)
+    elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+    return EgressResult(ip, agreed, quorum, answers, elapsed_ms, errors, details)
+
+
+def check_egress_ip(services=None, quorum=EGRESS_QUORUM, timeout=EGRESS_TIMEOUT, ttl=EGRESS_CACHE_TTL,
+                    cache_path=EGRESS_CACHE_PATH, refresh=False):
+    """Egress IP agreed by quorum services, from the shared cache when it is fresh
+
+    Only results that reached quorum are cached; a failed check is retried by
+    the next caller. Pass cache_path="" (or ttl=0) to skip the cache.
+    """
+    services = services or default_services()
+    if cache_path and ttl and not refresh:
+        cached = _load_cached(cache_path, ttl, services)
+        if cached is not None and cached.agreed >= quorum:
+            return cached
+
+    result = query_services(services, quorum, timeout)
+    if cache_path and ttl and result.quorum_met:
+        _store(cache_path, result, services)
+    return result
+
+
+def print_result(result, expected=EXPECTED_EGRESS_IP):
+    """Per-service answers and the verdict, as the VPN scripts show it"""
+    for name, answer in result.answers.items():
+        if name in result.errors:
+            print(f"{name}: Error - {result.errors[name]}")
+        elif answer is None:
+            print(f"{name}: (not needed, quorum reached)" if result.quorum_met else f"{name}: no answer")
+        else:
+            extra = result.details.get(name, {})
+            location = f" (Location: {extra['city']}, ISP: {extra.get('org', 'Unknown')})" if 'city' in extra else ""
+            print(f"{name}: {answer}{location} {'✅' if answer == expected else '❌'}")
+    print(result.summary())
+    print(f"Expected IP: {expected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the egress IP seen by public echo services")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached result")
+    parser.add_argument("--quorum", type=int, default=EGRESS_QUORUM)
+    parser.add_argument("--timeout", type=float, default=EGRESS_TIMEOUT)
+    parser.add_argument("--expected", default=EXPECTED_EGRESS_IP)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    result = check_egress_ip(quorum=args.quorum, timeout=args.timeout, refresh=args.refresh)
+    if args.json:
+        print(json.dumps(dict(result.as_dict(), from_cache=result.from_cache), indent=2))
+    else:
+        print_result(result, args.expected)
+    raise SystemExit(0 if result.matches(args.expected) else 1)
+
+
+if __name__ == "__main__":
+    main()
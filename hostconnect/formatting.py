@@ -0,0 +1,234 @@
+"""
+HostConnect Body Formatting
+Streaming XML pretty-printer and bounded request/response body logging.
+
+The test scripts used to run every reply through minidom and print it, on
+success too: a full DOM of a multi-megabyte search reply per request, most of
+it scrolled past unread. iter_xml_lines() indents a reply as it is parsed
+(XMLPullParser, elements dropped once written), so formatting only the first
+few KB of a body costs only those few KB. BodyLogger decides whether a body is
+worth showing at all:
+
+    never     no bodies
+    failures  bodies of failed checks only (default)
+    always    every body
+
+Shown bodies are capped at LOG_BODY_MAX_CHARS; when LOG_BODY_SPILL_DIR is set
+the complete formatted body of a capped one is written there instead of being
+lost. Set HOSTCONNECT_LOG_BODIES / HOSTCONNECT_LOG_BODY_MAX_CHARS /
+HOSTCONNECT_LOG_BODY_DIR to change the defaults.
+
+Format a saved reply:
+    python -m hostconnect.formatting reply.xml
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from hostconnect.config import LOG_BODIES, LOG_BODY_MAX_CHARS, LOG_BODY_SPILL_DIR
+
+LOG_BODY_LEVELS = ("never", "failures", "always")
+
+CHUNK_SIZE = 64 * 1024
+
+# XML declaration, DOCTYPE and comments ahead of the root element
+PROLOG_RE = re.compile(r"\s*((?:<\?.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->)\s*)*", re.S)
+DECLARATION_RE = re.compile(r"<\?.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->", re.S)
+
+SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _as_text(body):
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body).decode("utf-8", "replace")
+    return body
+
+
+def looks_like_xml(body):
+    """True if the body starts with markup (JSON and plain-text bodies are printed as they are)"""
+    head = body[:64].lstrip()
+    return head[:1] in ("<", b"<")
+
+
+def iter_xml_lines(source, indent="  ", chunk_size=CHUNK_SIZE):
+    """Yield the lines of an indented rendering of an XML document
+
+    source is str or bytes. Leaf elements go on one line with their (stripped)
+    text, containers open and close on lines of their own; the prolog
+    (declaration, DOCTYPE) is kept, namespace prefixes are restored, and mixed
+    content tails are dropped, which HostConnect replies never use. Elements
+    are released once written, so memory stays bounded by the open-element
+    depth. If the document turns out not to be well-formed, a marker line and
+    the raw body follow whatever was already formatted.
+    """
+    if isinstance(source, bytearray):
+        source = bytes(source)
+    if not source:
+        return
+
+    prolog = PROLOG_RE.match(_as_text(source[:4096])).group(0)
+    yield from DECLARATION_RE.findall(prolog)
+
+    parser = ET.XMLPullParser(events=("start", "end", "comment", "start-ns"))
+    prefixes = {}
+    declarations = []
+    stack = []  # [element, opened, start tag contents] of every open element
+
+    def name(tag):
+        if tag[:1] != "{":
+            return tag
+        uri, local = tag[1:].split("}", 1)
+        prefix = prefixes.get(uri)
+        return f"{prefix}:{local}" if prefix else local
+
+    def lines():
+        for event, item in parser.read_events():
+            if event == "start-ns":
+                prefix, uri = item
+                prefixes.setdefault(uri, prefix)
+                declarations.append((f"xmlns:{prefix}" if prefix else "xmlns", uri))
+                continue
+
+            if event != "end" and stack and not stack[-1][1]:
+                # First child of the innermost open element: its start tag gets a line of its own
+                stack[-1][1] = True
+                yield f"{indent * (len(stack) - 1)}<{stack[-1][2]}>"
+
+            if event == "comment":
+                yield f"{indent * len(stack)}<!--{item.text}-->"
+            elif event == "start":
+                attributes = declarations + [(name(key), value) for key, value in item.attrib.items()]
+                declarations.clear()
+                contents = name(item.tag) + "".join(f" {key}={quoteattr(value)}" for key, value in attributes)
+                stack.append([item, False, contents])
+            else:
+                _, opened, contents = stack.pop()
+                padding = indent * len(stack)
+                if opened:
+                    yield f"{padding}</{name(item.tag)}>"
+                else:
+                    text = (item.text or "").strip()
+                    yield f"{padding}<{contents}>{escape(text)}</{name(item.tag)}>" if text else f"{padding}<{contents}/>"
+                item.clear()
+                if stack:
+                    try:
+                        stack[-1][0].remove(item)
+                    except ValueError:
+                        pass
+
+    try:
+        for offset in range(0, len(source), chunk_size):
+            parser.feed(source[offset:offset + chunk_size])
+            yield from lines()
+        parser.close()
+        yield from lines()
+    except ET.ParseError as e:
+        yield f"<!-- not well-formed XML ({e}); raw body follows -->"
+        yield from _as_text(source).splitlines()
+
+
+def format_xml(source, indent="  ", max_chars=None):
+    """Indented XML as one string, cut off after max_chars characters if given"""
+    lines = []
+    size = 0
+    for line in iter_xml_lines(source, indent):
+        size += len(line) + 1
+        if max_chars and size > max_chars:
+            lines.append(f"... (truncated at {max_chars} characters of a {len(source)}-byte body)")
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class BodyLogger:
+    """Prints request/response bodies according to a verbosity level
+
+    Nothing is decoded or formatted unless the body is going to be shown, so
+    at the default level a passing request costs nothing here.
+    """
+
+    def __init__(self, level=LOG_BODIES, max_chars=LOG_BODY_MAX_CHARS, spill_dir=LOG_BODY_SPILL_DIR,
+                 stream=None):
+        if level not in LOG_BODY_LEVELS:
+            raise ValueError(f"Unknown body log level {level!r} (expected one of {', '.join(LOG_BODY_LEVELS)})")
+        self.level = level
+        self.max_chars = max_chars
+        self.spill_dir = spill_dir
+        self.stream = stream
+        self.spilled = 0
+        self._lock = threading.Lock()
+
+    def wants(self, failed=False):
+        """Whether a body of a passing (or failed) check would be shown"""
+        return self.level == "always" or (failed and self.level == "failures")
+
+    def _lines(self, body):
+        if looks_like_xml(body):
+            return iter_xml_lines(body)
+        return iter(_as_text(body).splitlines())
+
+    def _spill(self, label, body):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        slug = SLUG_RE.sub("_", label).strip("_").lower() or "body"
+        path = os.path.join(self.spill_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self.spilled}_{slug}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self._lines(body):
+                f.write(line + "\n")
+        self.spilled += 1
+        return path
+
+    def log(self, label, body, failed=False, file=None):
+        """Print body under label if the level wants it; returns whether it was printed
+
+        file overrides the logger's stream for this body (e.g. a suite step's output).
+        """
+        if not self.wants(failed):
+            return False
+
+        out = [f"{label}:"]
+        if not body:
+            out.append("(empty)")
+        else:
+            size = 0
+            for line in self._lines(body):
+                size += len(line) + 1
+                if self.max_chars and size > self.max_chars:
+                    if self.spill_dir:
+                        with self._lock:
+                            path = self._spill(label, body)
+                        out.append(f"... (truncated at {self.max_chars} characters; full body in {path})")
+                    else:
+                        out.append(f"... (truncated at {self.max_chars} characters of a {len(body)}-byte body)")
+                    break
+                out.append(line)
+
+        with self._lock:
+            print("\n".join(out), file=file or self.stream or sys.stdout)
+        return True
+
+    def log_exchange(self, label, reply, failed=False, file=None):
+        """Request and response body of a HostConnectReply"""
+        if not self.wants(failed):
+            return False
+        self.log(f"{label} - request", reply.request_body, failed, file)
+        self.log(f"{label} - response", reply.content, failed, file)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pretty-print an XML file without building a DOM")
+    parser.add_argument("path")
+    parser.add_argument("--max-chars", type=int, default=None, help="stop after this many characters")
+    args = parser.parse_args()
+    with open(args.path, "rb") as f:
+        print(format_xml(f.read(), max_chars=args.max_chars))
+
+
+if __name__ == "__main__":
+    main()
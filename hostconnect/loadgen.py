@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Local API Load Generator
+Drives the Next.js API endpoints under sustained load.
+
+Two modes:
+- closed loop: N virtual users, each sending its next request as soon as the
+  previous one completes (throughput follows the server's latency)
+- open loop: requests arrive at a fixed rate whatever the server does, and
+  latency is measured from each request's scheduled start, so queueing
+  behind a slow server shows up in the percentiles instead of being hidden
+
+Passing a Cassette records the run's traffic, or replays it without a server.
+The booking and payment targets create records on the server, so they only
+run when named with --targets. Samples taken during the warm-up are discarded. Latencies go into HDR-style
+histograms (p50/p90/p99/p99.9) per endpoint, with a per-status-code breakdown.
+
+Usage:
+    python -m hostconnect.loadgen --mode closed --users 10 --duration 60
+    python -m hostconnect.loadgen --mode open --rate 50 --duration 60 --targets search availability
+    python -m hostconnect.loadgen --mode closed --users 2 --duration 10 --targets search booking payment
+    python -m hostconnect.loadgen --mode closed --users 5 --duration 30 --record local_api.cassette
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hostconnect.cassette import Cassette, CassetteAdapter
+from hostconnect.config import LOCAL_API_URL
+from hostconnect.metrics import PERCENTILES, LatencyHistogram
+
+
+class Target:
+    """One endpoint to drive: method, path and JSON payload"""
+
+    def __init__(self, name, method, path, payload=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.payload = payload
+
+
+# The local API endpoints exercised by TourplanTester
+TARGETS = {
+    'search': Target("Tour Search", "POST", "/api/tours/search", {
+        "destination": "Cape Town",
+        "country": "South Africa",
+        "adults": 2,
+        "children": 0
+    }),
+    'availability': Target("Tour Availability", "POST", "/api/tours/availability", {
+        "tourId": "tour-001",
+        "date": "2024-07-01"
+    }),
+    'booking': Target("Create Booking", "POST", "/api/bookings/create", {
+        "tourId": "tour-001",
+        "startDate": "2024-07-01",
+        "endDate": "2024-07-03",
+        "adults": 2,
+        "children": 0,
+        "customerDetails": {
+            "firstName": "Test",
+            "lastName": "User",
+            "email": "test@example.com",
+            "phone": "+27123456789",
+            "address": "Test Address"
+        }
+    }),
+    'payment': Target("Process Payment", "POST", "/api/payments/process", {
+        "amount": 150000,
+        "currency": "ZAR",
+        "bookingId": "test-booking-001"
+    }),
+}
+
+# Targets that create bookings or process payments: opt-in only
+WRITE_TARGETS = ('booking', 'payment')
+READ_TARGETS = tuple(name for name in TARGETS if name not in WRITE_TARGETS)
+
+
+class EndpointStats:
+    """Latency histogram and status breakdown for one endpoint"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.statuses.update(other.statuses)
+
+
+class Recorder:
+    """Per-endpoint stats; one per worker, merged at the end (no locking on the hot path)"""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def record(self, name, status, latency_s):
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        stats.histogram.record_seconds(latency_s)
+        stats.statuses[status] += 1
+
+    def merge(self, other):
+        for name, stats in other.endpoints.items():
+            self.endpoints.setdefault(name, EndpointStats()).merge(stats)
+
+
+class LoadGenerator:
+    """Closed- or open-loop load against a set of Targets"""
+
+    def __init__(self, targets, base_url=LOCAL_API_URL, timeout=30, max_workers=64, cassette=None):
+        self.targets = list(targets)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        pool_settings = dict(pool_connections=len(self.targets), pool_maxsize=max_workers, max_retries=0)
+        if cassette is not None:
+            adapter = CassetteAdapter(cassette, **pool_settings)
+        else:
+            adapter = HTTPAdapter(**pool_settings)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _send(self, target):
+        """Send one request; status is the HTTP code or the exception class name"""
+        try:
+            response = self.session.request(
+                target.method,
+                f"{self.base_url}{target.path}",
+                json=target.payload,
+                timeout=self.timeout,
+            )
+            response.content  # read the whole body, so latency includes the transfer
+            return str(response.status_code)
+        except requests.exceptions.RequestException as e:
+            return type(e).__name__
+
+    def run_closed(self, users, duration, warmup=0):
+        """N virtual users back to back for warmup + duration seconds"""
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+        recorders = [Recorder() for _ in range(users)]
+
+        def user(index):
+            recorder = recorders[index]
+            targets = itertools.islice(itertools.cycle(self.targets), index % len(self.targets), None)
+            for target in targets:
+                sent = time.perf_counter()
+                if sent >= stop_at:
+                    return
+                status = self._send(target)
+                if sent >= measure_from:
+                    recorder.record(target.name, status, time.perf_counter() - sent)
+
+        threads = [threading.Thread(target=user, args=(i,), name=f"loadgen-user-{i}") for i in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result = Recorder()
+        for recorder in recorders:
+            result.merge(recorder)
+        return self._report("closed", result, duration, time.perf_counter() - start, users=users)
+
+    def run_open(self, rate, duration, warmup=0):
+        """Fixed arrival rate (requests/sec) for warmup + duration seconds"""
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+        result = Recorder()
+        lock = threading.Lock()
+        late = 0
+
+        def fire(target, scheduled):
+            status = self._send(target)
+            if scheduled >= measure_from:
+                latency = time.perf_counter() - scheduled
+                with lock:
+                    result.record(target.name, status, latency)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="loadgen") as pool:
+            for n, target in enumerate(itertools.cycle(self.targets)):
+                scheduled = start + n * interval
+                if scheduled >= stop_at:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -interval:
+                    late += 1
+                pool.submit(fire, target, scheduled)
+
+        report = self._report("open", result, duration, time.perf_counter() - start, rate=rate)
+        report['late_dispatches'] = late
+        return report
+
+    def _report(self, mode, recorder, duration, wall, **settings):
+        overall = EndpointStats()
+        endpoints = {}
+        for name, stats in recorder.endpoints.items():
+            overall.merge(stats)
+            endpoints[name] = {
+                'latency': stats.histogram.summary_ms(),
+                'throughput_rps': round(stats.histogram.count / duration, 2) if duration else None,
+                'status_codes': dict(stats.statuses),
+            }
+        return {
+            'mode': mode,
+            'settings': dict(settings, duration=duration, base_url=self.base_url),
+            'wall_time_s': round(wall, 2),
+            'requests': overall.histogram.count,
+            'throughput_rps': round(overall.histogram.count / duration, 2) if duration else None,
+            'latency': overall.histogram.summary_ms(),
+            'status_codes': dict(overall.statuses),
+            'endpoints': endpoints,
+        }
+
+
+def print_report(report, file=None):
+    """Human-readable summary of a run (to file, default stdout)"""
+    columns = [f"p{p:g}" for p in PERCENTILES]
+    print("=" * 80, file=file)
+    print(f"LOAD TEST REPORT ({report['mode']} loop, {report['settings']})", file=file)
+    print("=" * 80, file=file)
+    print(f"{'Endpoint':<20}{'count':>8}{'rps':>9}" + "".join(f"{c + ' ms':>11}" for c in columns) + f"{'max ms':>11}", file=file)
+    print("-" * 80, file=file)
+    rows = list(report['endpoints'].items()) + [("ALL", report)]
+    for name, data in rows:
+        latency = data['latency']
+        print(
+            f"{name:<20}{latency['count']:>8}{data['throughput_rps'] or 0:>9.1f}"
+            + "".join(f"{latency[c + '_ms'] or 0:>11.1f}" for c in columns)
+            + f"{latency['max_ms'] or 0:>11.1f}",
+            file=file,
+        )
+    print("-" * 80, file=file)
+    print("Status codes:", file=file)
+    for name, data in rows:
+        breakdown = ", ".join(f"{code}: {count}" for code, count in sorted(data['status_codes'].items()))
+        print(f"  {name:<18} {breakdown}", file=file)
+    if report.get('late_dispatches'):
+        print(f"⚠️  {report['late_dispatches']} arrivals dispatched late (load generator saturated)", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the local API endpoints")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--users", type=int, default=10, help="virtual users (closed loop)")
+    parser.add_argument("--rate", type=float, default=20, help="arrivals per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds discarded before measuring")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(READ_TARGETS),
+                        help="endpoints to drive (default: the read-only ones; booking and payment "
+                             "create records and must be named)")
+    parser.add_argument("--base-url", default=LOCAL_API_URL)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--max-workers", type=int, default=64, help="concurrency cap (open loop)")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    parser.add_argument("--record", metavar="CASSETTE", help="record the traffic to this cassette")
+    parser.add_argument("--replay", metavar="CASSETTE", help="answer from this cassette instead of the server")
+    args = parser.parse_args()
+
+    cassette = None
+    if args.record or args.replay:
+        cassette = Cassette(args.record or args.replay, mode="record" if args.record else "replay")
+
+    generator = LoadGenerator(
+        [TARGETS[name] for name in args.targets],
+        base_url=args.base_url,
+        timeout=args.timeout,
+        max_workers=args.max_workers,
+        cassette=cassette,
+    )
+    if args.mode == "closed":
+        report = generator.run_closed(args.users, args.duration, args.warmup)
+    else:
+        report = generator.run_open(args.rate, args.duration, args.warmup)
+
+    print_report(report)
+    if cassette is not None:
+        print(cassette.summary())
+
+    report_filename = args.report or f"load_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_filename, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nDetailed report saved to: {report_filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+HostConnect Metrics
+HDR-style latency histograms.
+
+Latencies are recorded in microseconds into log-linear buckets: values below
+2**sub_bits are exact, larger values keep sub_bits of precision, so every
+recorded value is reported to within about 1% at 2 significant digits,
+whatever its magnitude. Memory is bounded by the number of distinct buckets
+(a few thousand at most), not by the number of samples.
+"""
+
+import math
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram (values in microseconds)"""
+
+    def __init__(self, significant_digits=2):
+        self.significant_digits = significant_digits
+        self.sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._exact_limit = 1 << self.sub_bits
+        self._half = 1 << (self.sub_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self._exact_limit:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self._exact_limit + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _value(self, index):
+        """Midpoint of a bucket (the value reported for it)"""
+        if index < self._exact_limit:
+            return index
+        shift, offset = divmod(index - self._exact_limit, self._half)
+        shift += 1
+        low = (self._half + offset) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value_us, count=1):
+        """Add a latency sample (microseconds)"""
+        value_us = max(int(value_us), 0)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value_us * count
+        self.min = value_us if self.min is None else min(self.min, value_us)
+        self.max = value_us if self.max is None else max(self.max, value_us)
+
+    def record_seconds(self, seconds):
+        self.record(seconds * 1e6)
+
+    def merge(self, other):
+        """Fold another histogram (same precision) into this one"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """Latency (microseconds) at or below which percent% of samples fall"""
+        if not self.count:
+            return None
+        target = max(math.ceil(self.count * percent / 100), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return (self.total / self.count) if self.count else None
+
+    def summary_ms(self, percentiles=PERCENTILES):
+        """count/min/mean/max and percentiles in milliseconds"""
+        def ms(value):
+            return round(value / 1000, 2) if value is not None else None
+
+        summary = {
+            'count': self.count,
+            'min_ms': ms(self.min),
+            'mean_ms': ms(self.mean),
+            'max_ms': ms(self.max),
+        }
+        for percent in percentiles:
+            summary[f'p{percent:g}_ms'] = ms(self.percentile(percent))
+        return summary
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+VPN and Whitelist Health Monitor
+Long-running probes of the egress IP, PingRequest and AgentInfoRequest.
+
+test_vpn_consistency.py checks the three five times, ten seconds apart, and
+prints what it saw; when the booking engine slows down there is nothing to
+line it up against. The monitor repeats each probe on its own jittered
+interval (so probes never settle into lock-step with each other or with
+anything periodic upstream) and records every outcome in a ring buffer file
+(hostconnect.timeseries), where it can be summarized at any time, also while
+the monitor is running:
+
+    uptime      share of probes that passed
+    2050 rate   share of HostConnect replies refusing our IP
+    flaps       pass -> fail transitions, and the longest failing stretch
+    latency     p50/p90/p99/p99.9 of the probes that got a reply
+
+over the last hour and the last 24 hours. State changes are printed as they
+happen, so the monitor's own output is a log of VPN flaps.
+
+Usage:
+    python -m hostconnect.monitor run --interval 60
+    python -m hostconnect.monitor report [--json]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from hostconnect.aio import AsyncHostConnectClient
+from hostconnect.config import (
+    EXPECTED_EGRESS_IP,
+    MONITOR_CAPACITY,
+    MONITOR_INTERVAL,
+    MONITOR_JITTER,
+    MONITOR_PATH,
+    PROBE_TIMEOUT,
+)
+from hostconnect.egress import check_egress_ip
+from hostconnect.metrics import LatencyHistogram
+from hostconnect.timeseries import TimeSeriesRing
+
+# Series and status ids as stored in the ring file; append only, never renumber
+PROBES = ("ip", "ping", "agent_info")
+STATUSES = ("ok", "failed", "error", "2050")
+
+WINDOWS = {'1h': 3600, '24h': 24 * 3600}
+
+
+def probe_ip(timeout=PROBE_TIMEOUT, expected=EXPECTED_EGRESS_IP):
+    """Egress IP check; failed = agreed on the wrong address, error = no quorum"""
+    result = check_egress_ip(timeout=timeout, refresh=True)
+    if not result.quorum_met:
+        return "error", result.elapsed_ms, result.summary()
+    if result.ip != expected:
+        return "failed", result.elapsed_ms, f"egress IP {result.ip}, expected {expected}"
+    return "ok", result.elapsed_ms, result.ip
+
+
+def _reply_outcome(reply, reply_type):
+    latency = reply.phases.total_ms if reply.phases else reply.elapsed_ms
+    if reply.reply_type == reply_type:
+        return "ok", latency, reply_type
+    if reply.error_code == "2050":
+        return "2050", latency, reply.error
+    return "failed", latency, reply.error or f"HTTP {reply.status_code} {reply.reply_type}"
+
+
+class HealthMonitor:
+    """Runs the probes on jittered intervals and records them in a TimeSeriesRing"""
+
+    def __init__(self, client=None, path=MONITOR_PATH, interval=MONITOR_INTERVAL, jitter=MONITOR_JITTER,
+                 timeout=PROBE_TIMEOUT, expected_ip=EXPECTED_EGRESS_IP, capacity=MONITOR_CAPACITY,
+                 probes=PROBES, stream=None):
+        self.aio = AsyncHostConnectClient(client, concurrency=len(probes))
+        self.ring = TimeSeriesRing(path, capacity)
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.expected_ip = expected_ip
+        self.probes = probes
+        self.stream = stream
+        self.states = {}
+
+    async def _probe(self, name):
+        if name == "ip":
+            loop = asyncio.get_running_loop()
+            call = functools.partial(probe_ip, self.timeout, self.expected_ip)
+            return await loop.run_in_executor(None, call)
+        if name == "ping":
+            return _reply_outcome(await self.aio.ping(deadline=self.timeout), "PingReply")
+        reply = await self.aio.agent_info(return_account_info=False, deadline=self.timeout)
+        return _reply_outcome(reply, "AgentInfoReply")
+
+    def _delay(self):
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def record(self, name, status, latency_ms, detail, timestamp=None):
+        timestamp = timestamp or time.time()
+        self.ring.append(timestamp, PROBES.index(name), STATUSES.index(status), latency_ms)
+        previous = self.states.get(name)
+        self.states[name] = status
+        if status != previous:
+            when = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            marker = "✅" if status == "ok" else "❌"
+            print(f"{when} {marker} {name}: {status} ({detail})", file=self.stream, flush=True)
+
+    async def _loop(self, name):
+        # Start staggered, so the probes do not all fire together on startup either
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        while True:
+            start_time = time.time()
+            try:
+                status, latency_ms, detail = await self._probe(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status, latency_ms, detail = "error", None, f"{type(e).__name__}: {e}"
+            self.record(name, status, latency_ms, detail, start_time)
+            await asyncio.sleep(self._delay())
+
+    async def run(self, duration=None):
+        """Probe until cancelled, or for duration seconds"""
+        tasks = [asyncio.ensure_future(self._loop(name)) for name in self.probes]
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        self.aio.close()
+        self.ring.close()
+
+
+def summarize(records, now=None, windows=WINDOWS):
+    """Per window and probe: uptime, 2050 rate, flaps and latency percentiles"""
+    now = now or time.time()
+    records = list(records)
+    summary = {}
+    for label, seconds in windows.items():
+        since = now - seconds
+        probes = {}
+        for name in PROBES:
+            probes[name] = {'probes': 0, 'ok': 0, 'failed': 0, 'error': 0, '2050': 0, 'flaps': 0,
+                            'longest_outage_s': 0.0, 'histogram': LatencyHistogram(),
+                            'down_since': None, 'last_ok': None}
+        for timestamp, series, status, value in records:
+            if timestamp < since or series >= len(PROBES) or status >= len(STATUSES):
+                continue
+            probe = probes[PROBES[series]]
+            status = STATUSES[status]
+            probe['probes'] += 1
+            probe[status] += 1
+            if value is not None and status != "error":
+                probe['histogram'].record(value * 1000)
+            if status == "ok":
+                if probe['down_since'] is not None:
+                    outage = timestamp - probe['down_since']
+                    probe['longest_outage_s'] = max(probe['longest_outage_s'], outage)
+                    probe['down_since'] = None
+                probe['last_ok'] = timestamp
+            elif probe['down_since'] is None:
+                probe['down_since'] = timestamp
+                if probe['last_ok'] is not None:
+                    probe['flaps'] += 1
+        for probe in probes.values():
+            if probe['down_since'] is not None:
+                probe['longest_outage_s'] = max(probe['longest_outage_s'], now - probe['down_since'])
+            count = probe['probes']
+            probe['uptime_pct'] = round(100 * probe['ok'] / count, 2) if count else None
+            # Only replies can carry a 2050; transport errors say nothing about the whitelist
+            replies = count - probe['error']
+            probe['rate_2050_pct'] = round(100 * probe['2050'] / replies, 2) if replies else None
+            probe['longest_outage_s'] = round(probe['longest_outage_s'], 1)
+            probe['down'] = probe.pop('down_since') is not None
+            probe.pop('last_ok')
+            probe['latency'] = probe.pop('histogram').summary_ms()
+        summary[label] = probes
+    return summary
+
+
+def print_summary(summary):
+    for label, probes in summary.items():
+        print(f"\nLast {label}")
+        print(f"  {'probe':<12}{'probes':>8}{'uptime':>9}{'2050':>8}{'flaps':>7}{'outage':>9}"
+              f"{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}")
+        for name, probe in probes.items():
+            if not probe['probes']:
+                print(f"  {name:<12}{0:>8}")
+                continue
+
+            def pct(value):
+                return f"{value:.1f}%" if value is not None else "-"
+
+            def ms(key):
+                value = probe['latency'].get(key)
+                return f"{value:.0f}ms" if value is not None else "-"
+
+            state = " (down)" if probe['down'] else ""
+            print(f"  {name:<12}{probe['probes']:>8}{pct(probe['uptime_pct']):>9}{pct(probe['rate_2050_pct']):>8}"
+                  f"{probe['flaps']:>7}{probe['longest_outage_s']:>8.0f}s"
+                  f"{ms('p50_ms'):>9}{ms('p90_ms'):>9}{ms('p99_ms'):>9}{ms('p99.9_ms'):>9}{state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VPN and whitelist health monitor")
+    parser.add_argument("--file", default=MONITOR_PATH, help="ring buffer file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="probe until interrupted")
+    run.add_argument("--interval", type=float, default=MONITOR_INTERVAL, help="seconds between probes")
+    run.add_argument("--jitter", type=float, default=MONITOR_JITTER, help="interval spread, e.g. 0.2 = +/-20%%")
+    run.add_argument("--timeout", type=float, default=PROBE_TIMEOUT)
+    run.add_argument("--duration", type=float, help="stop after this many seconds")
+    run.add_argument("--probe", action="append", choices=PROBES, help="probe to run (default: all)")
+
+    report = commands.add_parser("report", help="uptime, 2050 rate and latency over 1h and 24h")
+    report.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        monitor = HealthMonitor(path=args.file, interval=args.interval, jitter=args.jitter, timeout=args.timeout,
+                                probes=tuple(args.probe or PROBES))
+        print(f"Monitoring {', '.join(monitor.probes)} every {args.interval:g}s "
+              f"(+/-{args.jitter:.0%}) into {args.file}")
+        try:
+            asyncio.run(monitor.run(args.duration))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            monitor.close()
+        print_summary(summarize(monitor.ring.records()))
+    elif not os.path.exists(args.file):
+        print(f"No monitor data in {args.file} (start one with: python -m hostconnect.monitor run)")
+    else:
+        summary = summarize(TimeSeriesRing(args.file).records())
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Next.js Route Overhead Benchmark
+What /api/tourplan/option-info costs on top of calling HostConnect directly.
+
+Direct and proxied OptionInfo calls with identical parameters are sent in
+pairs, alternating which goes first so drift (VPN, Tourplan load) hits both
+sides equally. The direct side sends the exact body the route builds
+(lib/tourplan-api.ts getOptionInfo), so both sides of a pair ask Tourplan
+the same question. The route reports its own phases in a Server-Timing
+header:
+
+    parse      request JSON
+    upstream   its HostConnect call
+    serialize  response JSON
+
+and whatever the client saw beyond the route's own total is the framework
+and local network ("framework"). Overhead is the proxied time minus the
+route's upstream time; the paired difference is proxied minus direct. Both
+are reported at p50/p90/p99/p99.9.
+
+Usage:
+    python -m hostconnect.overhead --pairs 200 --opt CPTDTJOHCPTCITY
+"""
+
+import argparse
+import json
+import re
+import time
+
+import requests
+
+from hostconnect.config import LOCAL_API_URL
+from hostconnect.metrics import PERCENTILES
+
+OPTION_INFO_ROUTE = "/api/tourplan/option-info"
+
+# name;dur=1.23;desc="..." entries of a Server-Timing header
+SERVER_TIMING_RE = re.compile(r'\s*([^;,\s]+)((?:\s*;\s*[^;,=\s]+\s*=\s*(?:"[^"]*"|[^;,\s]*))*)')
+SERVER_TIMING_PARAM_RE = re.compile(r'\s*;\s*([^;,=\s]+)\s*=\s*("[^"]*"|[^;,\s]*)')
+
+COMPONENTS = ("parse", "upstream", "serialize", "framework")
+
+# Body of tourplanAPI.getOptionInfo(optionId, info) and its createTourplanUserXml(), whitespace included
+ROUTE_TOURPLAN_USER = """
+    <TourplanUser>
+      <AgentID>{agent_id}</AgentID>
+      <Password>{password}</Password>
+    </TourplanUser>"""
+ROUTE_OPTION_INFO_BODY = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
+<Request>
+  {tourplan_user}
+  <OptionInfoRequest>
+    <OptionID>{opt}</OptionID>{info}
+  </OptionInfoRequest>
+</Request>"""
+
+
+def parse_server_timing(value):
+    """{name: {'dur': ms or None, 'desc': str or None}} from a Server-Timing header"""
+    metrics = {}
+    for match in SERVER_TIMING_RE.finditer(value or ""):
+        params = dict(SERVER_TIMING_PARAM_RE.findall(match.group(2)))
+        try:
+            duration = float(params['dur']) if 'dur' in params else None
+        except ValueError:
+            duration = None
+        desc = params.get('desc')
+        metrics[match.group(1)] = {
+            'dur': duration,
+            'desc': desc.strip('"') if desc is not None else None,
+        }
+    return metrics
+
+
+def route_option_info_body(agent_id, password, opt, info=None):
+    """The OptionInfoRequest the option-info route sends for these parameters"""
+    info = f"\n    <Info>{info}</Info>" if info else ""
+    tourplan_user = ROUTE_TOURPLAN_USER.format(agent_id=agent_id, password=password)
+    return ROUTE_OPTION_INFO_BODY.format(tourplan_user=tourplan_user, opt=opt, info=info)
+
+
+def percentiles(values, percents=PERCENTILES):
+    """Nearest-rank percentiles of a list (differences can be negative, so no histogram)"""
+    ordered = sorted(values)
+    summary = {'count': len(ordered)}
+    for percent in percents:
+        if ordered:
+            rank = max(int(-(-percent * len(ordered) // 100)) - 1, 0)
+            summary[f"p{percent:g}_ms"] = round(ordered[min(rank, len(ordered) - 1)], 2)
+        else:
+            summary[f"p{percent:g}_ms"] = None
+    return summary
+
+
+class PairedOverhead:
+    """Interleaved direct/proxied OptionInfo calls and the route's overhead split"""
+
+    def __init__(self, client, local_url=LOCAL_API_URL, timeout=30):
+        self.client = client
+        self.url = local_url.rstrip("/") + OPTION_INFO_ROUTE
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.pairs = []
+        self.errors = 0
+
+    def _direct(self, opt, info):
+        body = route_option_info_body(self.client.agent_id, self.client.password, opt, info)
+        # Sent raw, so the client's reply cache does not answer for Tourplan
+        reply = self.client.post(body, request_name="OptionInfoRequest", info=info)
+        return {
+            'direct_ms': reply.phases.total_ms if reply.phases else reply.elapsed_ms,
+            'direct_ok': reply.status_code < 500 and reply.reply_type != "ErrorReply",
+        }
+
+    def _proxied(self, opt, info):
+        start_time = time.perf_counter()
+        response = self.session.post(self.url, json={"opt": opt, "info": info}, timeout=self.timeout)
+        proxied_ms = (time.perf_counter() - start_time) * 1000
+        timing = parse_server_timing(response.headers.get("Server-Timing"))
+
+        def dur(name):
+            return timing[name]['dur'] if name in timing else None
+
+        sample = {
+            'proxied_ms': proxied_ms,
+            'status': response.status_code,
+            'parse_ms': dur("parse"),
+            'upstream_ms': dur("upstream"),
+            'serialize_ms': dur("serialize"),
+            'server_ms': dur("total"),
+        }
+        sample['framework_ms'] = proxied_ms - sample['server_ms'] if sample['server_ms'] is not None else None
+        return sample
+
+    def run(self, opts, pairs=50, info="G"):
+        """Send pairs direct/proxied pairs, cycling through the option codes in opts"""
+        for n in range(pairs):
+            opt = opts[n % len(opts)]
+            calls = (self._direct, self._proxied) if n % 2 == 0 else (self._proxied, self._direct)
+            sample = {'opt': opt, 'direct_first': n % 2 == 0}
+            try:
+                for call in calls:
+                    sample.update(call(opt, info))
+            except requests.exceptions.RequestException:
+                self.errors += 1
+                continue
+            if not sample.pop('direct_ok'):
+                # A 5xx or ErrorReply is not the reply the route would have waited for
+                self.errors += 1
+                continue
+            self.pairs.append(sample)
+        return self.summary()
+
+    def summary(self):
+        """Percentile summaries of all pairs"""
+        def column(key):
+            return [sample[key] for sample in self.pairs if sample.get(key) is not None]
+
+        summary = {
+            'route': self.url,
+            'errors': self.errors,
+            'server_timing': any(sample.get('server_ms') is not None for sample in self.pairs),
+            'pairs': len(self.pairs),
+            'direct': percentiles(column('direct_ms')),
+            'proxied': percentiles(column('proxied_ms')),
+            'paired_difference': percentiles([s['proxied_ms'] - s['direct_ms'] for s in self.pairs]),
+            'overhead': percentiles([s['proxied_ms'] - s['upstream_ms'] for s in self.pairs
+                                     if s.get('upstream_ms') is not None]),
+        }
+        for name in COMPONENTS:
+            summary[name] = percentiles(column(f"{name}_ms"))
+        return summary
+
+    def table(self, percents=(50, 99)):
+        """Text table of the overhead split at the given percentiles"""
+        summary = self.summary()
+        keys = [f"p{percent:g}_ms" for percent in percents]
+        rows = ("direct", "proxied", "paired_difference", "overhead") + COMPONENTS
+        lines = [f"Route overhead: {summary['route']} ({summary['errors']} errors)"]
+        if not summary['server_timing']:
+            lines.append("  (no Server-Timing header: only the totals and paired difference are available)")
+        lines.append(f"{str(summary['pairs']) + ' pairs':<28}" + "".join(f"{key:>10}" for key in keys))
+        for row in rows:
+            if summary[row]['count']:
+                lines.append(f"  {row:<26}" + "".join(f"{summary[row][key]:>10}" for key in keys))
+        return "\n".join(lines)
+
+
+def main():
+    from hostconnect import get_default_client
+
+    parser = argparse.ArgumentParser(description="Direct vs /api/tourplan/option-info overhead benchmark")
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--opt", nargs="+", default=["option_identifier"], help="option codes to cycle through")
+    parser.add_argument("--info", default="G")
+    parser.add_argument("--local-url", default=LOCAL_API_URL)
+    parser.add_argument("--report", help="write the summary and samples as JSON to this file")
+    args = parser.parse_args()
+
+    benchmark = PairedOverhead(get_default_client(), local_url=args.local_url)
+    benchmark.run(args.opt, pairs=args.pairs, info=args.info)
+    print(benchmark.table())
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({'summary': benchmark.summary(), 'pairs': benchmark.pairs}, f, indent=2)
+        print(f"\nDetailed results saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
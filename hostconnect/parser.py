@@ -0,0 +1,158 @@
+"""
+HostConnect Reply Parser
+Incremental (iterparse) parsing of HostConnect replies.
+
+The reply type is classified from the first element inside the <Reply> (or
+SOAP Envelope/Body) wrapper, so callers never need to decode or scan the whole
+body. Option records are yielded one at a time and their elements are dropped
+from the tree as soon as they are converted, so peak memory is bounded by one
+<Option> rather than the whole reply.
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+
+# Wrapper elements that never carry the reply type themselves
+WRAPPER_TAGS = {"Reply", "Envelope", "Body", "Header"}
+
+ERROR_CODE_RE = re.compile(r"^\s*(\d+)")
+
+
+def local_name(tag):
+    """Strip any {namespace} prefix from an element tag"""
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+
+
+def element_to_dict(elem):
+    """Convert an element to plain Python values
+
+    Leaf elements become their stripped text, containers become dicts keyed by
+    child tag, and repeated child tags become lists.
+    """
+    children = list(elem)
+    if not children:
+        return (elem.text or "").strip()
+
+    record = {}
+    for child in children:
+        name = local_name(child.tag)
+        value = element_to_dict(child)
+        if name in record:
+            if not isinstance(record[name], list):
+                record[name] = [record[name]]
+            record[name].append(value)
+        else:
+            record[name] = value
+    return record
+
+
+def error_code(message):
+    """Leading numeric HostConnect error code of an <Error> message, if any"""
+    if not message:
+        return None
+    match = ERROR_CODE_RE.match(message)
+    return match.group(1) if match else None
+
+
+class ReplyReader:
+    """Incremental reader over a HostConnect reply stream
+
+    source is a binary file-like object (e.g. a urllib3 raw response) or bytes.
+    Reading is single pass: reply_type is available immediately, then either
+    options() or errors() consumes the rest of the stream.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        self._events = ET.iterparse(source, events=("start", "end"))
+        self._stack = []
+        self.reply_type = None
+        self.parse_error = None
+        self._classify()
+
+    def _next_events(self):
+        """Yield (event, elem) pairs, keeping the open-element stack current"""
+        try:
+            for event, elem in self._events:
+                if event == "start":
+                    self._stack.append(elem)
+                else:
+                    self._stack.pop()
+                yield event, elem
+        except ET.ParseError as e:
+            self.parse_error = str(e)
+
+    def _classify(self):
+        """Read just far enough to find the reply type"""
+        for event, elem in self._next_events():
+            name = local_name(elem.tag)
+            if event == "start" and name not in WRAPPER_TAGS:
+                self.reply_type = name
+                return
+            if event == "end":
+                # Wrapper closed with nothing inside (e.g. <Reply/>)
+                self.reply_type = name
+                return
+
+    def _release(self, elem):
+        """Drop a processed element from its parent so it can be collected"""
+        elem.clear()
+        if self._stack:
+            parent = self._stack[-1]
+            try:
+                parent.remove(elem)
+            except ValueError:
+                pass
+
+    def options(self):
+        """Yield each <Option> as a dict, releasing it once converted
+
+        This is the hot loop for large searches, so it walks the events
+        itself instead of going through _next_events() and only strips
+        namespaces from tags that have one.
+        """
+        stack = self._stack
+        try:
+            for event, elem in self._events:
+                if event == "start":
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                tag = elem.tag
+                if tag == "Option" or tag.endswith("}Option"):
+                    record = element_to_dict(elem)
+                    self._release(elem)
+                    yield record
+        except ET.ParseError as e:
+            self.parse_error = str(e)
+
+    def find_text(self, name):
+        """Text of the next element called name, or None"""
+        for event, elem in self._next_events():
+            if event == "end" and local_name(elem.tag) == name:
+                return (elem.text or "").strip()
+        return None
+
+    def errors(self):
+        """All <Error> messages from the rest of the reply"""
+        messages = []
+        for event, elem in self._next_events():
+            if event == "end" and local_name(elem.tag) in ("Error", "faultstring"):
+                messages.append((elem.text or "").strip())
+                self._release(elem)
+        return messages
+
+
+def classify_reply(source):
+    """Reply type (e.g. AgentInfoReply, OptionInfoReply, ErrorReply) or None"""
+    return ReplyReader(source).reply_type
+
+
+def iter_options(source):
+    """Yield Option records from an OptionInfoReply stream"""
+    reader = ReplyReader(source)
+    if reader.reply_type != "OptionInfoReply":
+        return
+    yield from reader.options()
@@ -0,0 +1,214 @@
+"""
+HostConnect Resilience
+Latency-derived timeouts and a circuit breaker per upstream URL.
+
+Every call site used to pick its own fixed timeout (10 s for a GET, 30 s
+for a POST, 60 s for a search), so when Tourplan stopped answering every
+caller sat out the full timeout and request threads piled up behind each
+other. Two pieces replace that in HostConnectClient:
+
+AdaptiveTimeouts keeps the latest ADAPTIVE_TIMEOUT_WINDOW latencies per
+request type and sets the timeout to ADAPTIVE_TIMEOUT_MULTIPLIER times their
+ADAPTIVE_TIMEOUT_PERCENTILE, never below ADAPTIVE_TIMEOUT_MIN and never
+above the caller's fixed timeout, which stays the ceiling. A request that
+times out is recorded at its timeout, so a genuinely slower Tourplan raises
+the timeout instead of timing out ever more often.
+
+CircuitBreaker tracks the outcome of the latest BREAKER_WINDOW calls to one
+URL. Network errors and HTTP 5xx count as failures (an ErrorReply is an
+answer). Once at least BREAKER_MIN_CALLS calls are in the window and
+BREAKER_FAILURE_RATE of them failed, the breaker opens and calls fail at
+once with CircuitOpenError, a requests ConnectionError, so existing error
+handling applies. After BREAKER_OPEN_SECONDS it is half-open: one trial call
+at a time is let through, a success closes it, a failure opens it again.
+Every state change is counted and kept in a short event log (stats()), and
+listeners are called with (breaker, old state, new state).
+"""
+
+import threading
+import time
+from collections import deque
+
+import requests
+
+from hostconnect.config import (
+    ADAPTIVE_TIMEOUT_MIN,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ADAPTIVE_TIMEOUT_MULTIPLIER,
+    ADAPTIVE_TIMEOUT_PERCENTILE,
+    ADAPTIVE_TIMEOUT_WINDOW,
+    BREAKER_FAILURE_RATE,
+    BREAKER_MIN_CALLS,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_WINDOW,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+BREAKER_EVENTS_KEPT = 50
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit for its URL is open"""
+
+
+class AdaptiveTimeouts:
+    """Per request type timeouts from a sliding window of observed latencies (seconds)"""
+
+    def __init__(self, percentile=ADAPTIVE_TIMEOUT_PERCENTILE, multiplier=ADAPTIVE_TIMEOUT_MULTIPLIER,
+                 minimum=ADAPTIVE_TIMEOUT_MIN, window=ADAPTIVE_TIMEOUT_WINDOW,
+                 min_samples=ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.minimum = minimum
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._timeouts = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+            # Recomputed on record, so timeout_for() is a dict lookup
+            if len(samples) >= self.min_samples:
+                ordered = sorted(samples)
+                rank = max(int(-(-self.percentile * len(ordered) // 100)) - 1, 0)
+                self._timeouts[key] = max(ordered[min(rank, len(ordered) - 1)] * self.multiplier, self.minimum)
+
+    def timeout_for(self, key, ceiling):
+        """Timeout for the next request of this type; the caller's fixed timeout until enough samples"""
+        adaptive = self._timeouts.get(key)
+        return ceiling if adaptive is None else min(adaptive, ceiling)
+
+    def stats(self):
+        with self._lock:
+            return {
+                str(key): {
+                    'samples': len(self._samples[key]),
+                    'timeout_s': round(self._timeouts[key], 3) if key in self._timeouts else None,
+                }
+                for key in self._samples
+            }
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of call outcomes"""
+
+    def __init__(self, name, failure_rate=BREAKER_FAILURE_RATE, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                 open_seconds=BREAKER_OPEN_SECONDS, listeners=()):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.listeners = list(listeners)
+        self.state = CLOSED
+        self.changed_at = time.time()
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.transitions = {}
+        self.events = deque(maxlen=BREAKER_EVENTS_KEPT)
+
+    def _change(self, state, reason):
+        old, self.state = self.state, state
+        self.changed_at = time.time()
+        transition = f"{old}->{state}"
+        self.transitions[transition] = self.transitions.get(transition, 0) + 1
+        self.events.append({'time': self.changed_at, 'from': old, 'to': state, 'reason': reason})
+        return old
+
+    def _notify(self, old, new):
+        for listener in self.listeners:
+            listener(self, old, new)
+
+    def before(self):
+        """Reserve a call, or raise CircuitOpenError while the circuit is open"""
+        changed = None
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                changed = (self._change(HALF_OPEN, f"{self.open_seconds:g}s open"), HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self._trial_in_flight):
+                self.rejected += 1
+                retry_in = max(self.open_seconds - (time.monotonic() - self._opened_at), 0)
+                raise CircuitOpenError(f"Circuit open for {self.name} ({self.state}, retry in {retry_in:.0f}s)")
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = True
+        if changed:
+            self._notify(*changed)
+
+    def record(self, failed):
+        """Outcome of a call reserved with before()"""
+        changed = None
+        with self._lock:
+            self.calls += 1
+            self.failures += bool(failed)
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+                if failed:
+                    self._opened_at = time.monotonic()
+                    changed = (self._change(OPEN, "trial call failed"), OPEN)
+                else:
+                    self._outcomes.clear()
+                    changed = (self._change(CLOSED, "trial call succeeded"), CLOSED)
+            elif self.state == CLOSED:
+                self._outcomes.append(bool(failed))
+                failed_calls = sum(self._outcomes)
+                if (failed and len(self._outcomes) >= self.min_calls
+                        and failed_calls >= self.failure_rate * len(self._outcomes)):
+                    self._opened_at = time.monotonic()
+                    changed = (self._change(OPEN, f"{failed_calls}/{len(self._outcomes)} calls failed"), OPEN)
+        if changed:
+            self._notify(*changed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'since': self.changed_at,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'transitions': dict(self.transitions),
+                'events': list(self.events),
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per key (the request URL), created on first use"""
+
+    def __init__(self, listeners=(), **settings):
+        self.listeners = list(listeners)
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker(key, listeners=self.listeners, **self.settings)
+        return breaker
+
+    def stats(self):
+        return {key: breaker.stats() for key, breaker in list(self._breakers.items())}
+
+    def table(self):
+        """Text table of every breaker's state and counters"""
+        lines = ["Circuit breakers"]
+        for key, stats in self.stats().items():
+            changes = ", ".join(f"{transition} x{count}" for transition, count in stats['transitions'].items())
+            lines.append(f"  {stats['state']:<10}{stats['calls']:>7} calls{stats['failures']:>6} failed"
+                         f"{stats['rejected']:>6} rejected  {key}" + (f"  ({changes})" if changes else ""))
+        return "\n".join(lines)
@@ -0,0 +1,173 @@
+"""
+HostConnect Test Result Sink
+Streams tester results to a JSONL file as they happen.
+
+The testers used to keep every result in a list and dump it at the end, so a
+soak run grew without bound and a crash lost everything. ResultSink appends
+one JSON line per result through a small buffer that is written out every
+RESULTS_FLUSH_INTERVAL seconds (or every RESULTS_BUFFER_SIZE lines, and at
+exit), and keeps a ResultSummary whose memory does not grow with the number
+of results: counters, a latency histogram, per-test counts and the most
+recent failures only.
+
+Summarize a results file (including one left behind by a crashed run):
+    python -m hostconnect.results tourplan_test_results_20250625_120000.jsonl
+"""
+
+import argparse
+import atexit
+import json
+import threading
+import time
+from collections import deque
+
+from hostconnect.config import RESULTS_BUFFER_SIZE, RESULTS_FLUSH_INTERVAL, RESULTS_MAX_FAILURES
+from hostconnect.metrics import LatencyHistogram
+
+
+class ResultSummary:
+    """Incremental pass/fail and response-time summary of a result stream"""
+
+    def __init__(self, max_failures=RESULTS_MAX_FAILURES):
+        self.total = 0
+        self.passed = 0
+        self.response_times = LatencyHistogram()
+        self.by_test = {}
+        self.recent_failures = deque(maxlen=max_failures)
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    @property
+    def failed(self):
+        return self.total - self.passed
+
+    @property
+    def success_rate(self):
+        return (self.passed / self.total) * 100 if self.total else 0
+
+    def add(self, result):
+        self.total += 1
+        counts = self.by_test.setdefault(result['test'], [0, 0])
+        if result['success']:
+            self.passed += 1
+            counts[0] += 1
+        else:
+            counts[1] += 1
+            self.recent_failures.append({'test': result['test'], 'message': result['message']})
+        if result.get('response_time'):
+            self.response_times.record(result['response_time'] * 1000)
+        timestamp = result.get('timestamp')
+        if timestamp:
+            self.first_timestamp = self.first_timestamp or timestamp
+            self.last_timestamp = timestamp
+
+    def as_dict(self):
+        return {
+            'total_tests': self.total,
+            'passed': self.passed,
+            'failed': self.failed,
+            'success_rate': self.success_rate,
+            'first_result': self.first_timestamp,
+            'last_result': self.last_timestamp,
+            'response_time': self.response_times.summary_ms(),
+            'by_test': {name: {'passed': p, 'failed': f} for name, (p, f) in self.by_test.items()},
+            'recent_failures': list(self.recent_failures),
+        }
+
+
+class ResultSink:
+    """Buffered JSONL writer with a running ResultSummary
+
+    Safe to write from several threads. Results already on disk survive a
+    crash; at most the last flush interval's worth is lost.
+    """
+
+    def __init__(self, path, flush_interval=RESULTS_FLUSH_INTERVAL, buffer_size=RESULTS_BUFFER_SIZE,
+                 max_failures=RESULTS_MAX_FAILURES):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.summary = ResultSummary(max_failures)
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            args=(flush_interval,),
+            name="hostconnect-result-flusher",
+            daemon=True,
+        )
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, result):
+        """Record one result (a JSON-serializable dict with 'test', 'success' and 'message')"""
+        line = json.dumps(result, default=str)
+        with self._lock:
+            self.summary.add(result)
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    def _write_buffer(self):
+        if self._buffer and not self._file.closed:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self._buffer.clear()
+
+    def flush(self):
+        """Write out everything buffered so far"""
+        with self._lock:
+            self._write_buffer()
+
+    def _flush_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def close(self):
+        """Flush and close the file (the summary stays readable)"""
+        self._stop.set()
+        with self._lock:
+            self._write_buffer()
+            self._file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_results(path):
+    """Yield the results of a JSONL file one at a time (a torn last line is skipped)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def summarize_file(path, max_failures=RESULTS_MAX_FAILURES):
+    """Rebuild the ResultSummary of a results file, e.g. after a crashed run"""
+    summary = ResultSummary(max_failures)
+    for result in read_results(path):
+        summary.add(result)
+    return summary
+
+
+def results_path(prefix):
+    """Timestamped results file name, next to the tester's JSON report"""
+    return f"{prefix}_results_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a tester results file (JSONL)")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    print(json.dumps(summarize_file(args.path).as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+HostConnect Endpoint Routing
+Latency- and error-aware choice between upstream URLs, with failover.
+
+Tourplan serves us from more than one URL (hostconnect_test/api/hostConnectApi
+and soap/search), and every script hard-codes one of them, so when that one
+is slow or refusing our IP everything waits on it. EndpointRouter keeps an
+exponentially weighted moving average (EWMA) of latency and error rate per
+endpoint and sends each call to the one with the lowest expected time to a
+good reply (latency / (1 - error rate)). A call that fails there is retried
+on the next best endpoint.
+
+An endpoint that fails ROUTER_EJECT_AFTER times in a row is taken out of
+rotation for a cooldown. It is probed passively: once the cooldown is over,
+the next live call goes to it (one at a time), and a good reply brings it
+back into rotation; another failure doubles the cooldown, up to
+ROUTER_MAX_COOLDOWN. A small share of calls (ROUTER_EXPLORE) also goes to a
+slower healthy endpoint, so its averages do not go stale.
+
+Failures are what say something about the endpoint: network errors, HTTP
+5xx/403/404 and 2050 (IP not whitelisted there). An ErrorReply for a bad
+option code is a good reply as far as routing is concerned.
+
+Only send a request to endpoints that understand its dialect: for search
+formats, FormatDiscovery.endpoints_for() lists the endpoints a format worked
+at. HOSTCONNECT_ENDPOINTS="name=url,name=url" routes the default client.
+"""
+
+import random
+import threading
+import time
+
+import requests
+
+from hostconnect.config import (
+    ROUTER_COOLDOWN,
+    ROUTER_EJECT_AFTER,
+    ROUTER_EWMA_ALPHA,
+    ROUTER_EXPLORE,
+    ROUTER_MAX_COOLDOWN,
+)
+from hostconnect.parser import error_code
+
+ENDPOINT_FAILURE_STATUS = {403, 404}
+ENDPOINT_FAILURE_CODES = {"2050"}
+
+# Floor for the success rate in the score, so a failing endpoint's score stays finite
+MIN_SUCCESS_RATE = 0.05
+
+
+def endpoint_failed(reply):
+    """Whether a reply says the endpoint (rather than the request) is the problem"""
+    if reply.status_code >= 500 or reply.status_code in ENDPOINT_FAILURE_STATUS:
+        return True
+    return reply.reply_type in ("ErrorReply", "Fault") and error_code(reply.error) in ENDPOINT_FAILURE_CODES
+
+
+class EndpointHealth:
+    """EWMA latency and error rate of one endpoint, and its rotation state"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = None
+        self.cooldown = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.probing:
+            return "probing"
+        return "ejected" if self.ejected_until is not None else "active"
+
+    def score(self):
+        """Expected milliseconds to a good reply; unmeasured endpoints go first"""
+        if self.latency_ms is None:
+            return 0.0
+        return self.latency_ms / max(1.0 - self.error_rate, MIN_SUCCESS_RATE)
+
+    def as_dict(self):
+        return {
+            'url': self.url,
+            'state': self.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'latency_ewma_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'error_rate_ewma': round(self.error_rate, 3),
+            'ejections': self.ejections,
+        }
+
+
+class EndpointRouter:
+    """Routes calls to the healthiest of several endpoint URLs, failing over on errors
+
+    endpoints maps a name to a URL, e.g. {"hostconnect": API_BASE_URL, "soap": SOAP_SEARCH_URL}.
+    """
+
+    def __init__(self, endpoints, alpha=ROUTER_EWMA_ALPHA, eject_after=ROUTER_EJECT_AFTER,
+                 cooldown=ROUTER_COOLDOWN, max_cooldown=ROUTER_MAX_COOLDOWN, explore=ROUTER_EXPLORE):
+        if not endpoints:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self.endpoints = {name: EndpointHealth(name, url) for name, url in endpoints.items()}
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.explore = explore
+        self.failovers = 0
+        self._lock = threading.Lock()
+
+    def choose(self, exclude=()):
+        """Pick the endpoint for the next attempt (marks a passive probe as in flight)"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [health for health in self.endpoints.values() if health.name not in exclude]
+            if not candidates:
+                return None
+            # A cooled-down ejected endpoint gets the next live call, one at a time
+            for health in candidates:
+                if health.ejected_until is not None and not health.probing and now >= health.ejected_until:
+                    health.probing = True
+                    return health
+            active = sorted((health for health in candidates if health.ejected_until is None), key=EndpointHealth.score)
+            if not active:
+                # Everything is out of rotation: the one due back first is the best bet
+                return min(candidates, key=lambda health: health.ejected_until)
+            if len(active) > 1 and random.random() < self.explore:
+                return random.choice(active[1:])
+            return active[0]
+
+    def record(self, health, latency_ms, failed):
+        """Fold one attempt into the endpoint's averages and rotation state"""
+        with self._lock:
+            health.requests += 1
+            if failed and health.latency_ms is not None:
+                # A refused connection fails fast; that must not make the endpoint look quick
+                latency_ms = max(latency_ms, health.latency_ms)
+            health.latency_ms = latency_ms if health.latency_ms is None else (
+                self.alpha * latency_ms + (1 - self.alpha) * health.latency_ms)
+            health.error_rate = self.alpha * failed + (1 - self.alpha) * health.error_rate
+            was_probe = health.probing
+            health.probing = False
+            if not failed:
+                health.consecutive_failures = 0
+                health.ejected_until = None
+                health.cooldown = None
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if was_probe or health.consecutive_failures >= self.eject_after:
+                if was_probe:
+                    health.cooldown = min((health.cooldown or self.base_cooldown) * 2, self.max_cooldown)
+                else:
+                    health.cooldown = health.cooldown or self.base_cooldown
+                    health.ejections += 1 if health.ejected_until is None else 0
+                health.ejected_until = time.monotonic() + health.cooldown
+
+    def send(self, call):
+        """Run call(url) on the best endpoint, failing over to the others
+
+        call returns a HostConnectReply. The last failed reply is returned (or
+        the last network error raised) when every endpoint failed.
+        """
+        tried = []
+        for attempt in range(len(self.endpoints)):
+            last = attempt == len(self.endpoints) - 1
+            health = self.choose(exclude=tried)
+            if tried:
+                with self._lock:
+                    self.failovers += 1
+            tried.append(health.name)
+            start_time = time.perf_counter()
+            failed = None
+            try:
+                reply = call(health.url)
+                failed = endpoint_failed(reply)
+            except requests.exceptions.RequestException:
+                failed = True
+                if last:
+                    raise
+                continue
+            finally:
+                if failed is None:
+                    # call() raised something else: no verdict on the endpoint,
+                    # but a passive probe must not stay in flight forever
+                    self.release(health)
+                else:
+                    self.record(health, (time.perf_counter() - start_time) * 1000, failed)
+            if not failed or last:
+                return reply
+
+    def release(self, health):
+        """End an attempt without recording an outcome (clears the probe flag)"""
+        with self._lock:
+            health.probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'failovers': self.failovers,
+                'endpoints': {name: health.as_dict() for name, health in self.endpoints.items()},
+            }
+
+    def table(self):
+        """Text table of every endpoint's averages and state"""
+        stats = self.stats()
+        lines = [f"Endpoint routing ({stats['failovers']} failovers)"]
+        for name, endpoint in stats['endpoints'].items():
+            latency = f"{endpoint['latency_ewma_ms']:.0f}ms" if endpoint['latency_ewma_ms'] is not None else "-"
+            lines.append(f"  {name:<14}{endpoint['state']:<9}{latency:>9}{endpoint['error_rate_ewma'] * 100:>7.1f}% errors"
+                         f"{endpoint['requests']:>7} requests{endpoint['ejections']:>4} ejections  {endpoint['url']}")
+        return "\n".join(lines)
@@ -0,0 +1,186 @@
+"""
+HostConnect Suite Runner
+Runs a tester's test methods concurrently, in dependency order.
+
+The tester suites used to call their test methods one after another, although
+most of them are independent network-bound checks that spend their time
+waiting on Tourplan or the local API. SuiteRunner takes the methods as a
+dependency graph (authentication after connectivity, ...) and runs every step
+whose dependencies are done on a thread pool, so a suite takes about as long
+as its slowest chain instead of the sum of its steps.
+
+Each step function is called with a StepOutput: a text stream for what the
+step prints, and note_result(success) for each result it logs. A step fails
+if it raises, returns False or noted a failed result (the tester methods
+return None, so their results are what say whether they passed); steps that
+depend on a failed step are skipped. A step can also just wait for others to
+finish, whatever their outcome (e.g. a load test that must not compete with
+functional checks for the server). A step's output is buffered and written
+out as one block when it finishes, so the output of concurrent steps does
+not interleave; nothing else's output (sys.stdout included) is touched.
+"""
+
+import io
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from hostconnect.config import RUNNER_MAX_WORKERS
+
+FINISHED = ("passed", "failed", "skipped")
+
+
+class StepOutput(io.StringIO):
+    """Passed to a step function: buffers what it prints (print(..., file=out))
+    and counts the results it logs through note_result(), from any thread"""
+
+    def __init__(self, results):
+        super().__init__()
+        self._results = results
+        self._lock = threading.Lock()
+
+    def note_result(self, success):
+        with self._lock:
+            self._results['passed' if success else 'failed'] += 1
+
+
+class SuiteStep:
+    """One test method in a suite and the outcome of running it"""
+
+    def __init__(self, name, func, after=(), wait_for=()):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.wait_for = tuple(wait_for)
+        self.status = "pending"
+        self.elapsed = None
+        self.error = None
+        self.results = {'passed': 0, 'failed': 0}
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'after': list(self.after),
+            'wait_for': list(self.wait_for),
+            'status': self.status,
+            'elapsed_s': round(self.elapsed, 3) if self.elapsed is not None else None,
+            'results': dict(self.results),
+            'error': self.error,
+        }
+
+
+class SuiteRunner:
+    """Dependency-ordered, concurrent runner for a tester's test methods"""
+
+    def __init__(self, max_workers=RUNNER_MAX_WORKERS, stream=None):
+        self.max_workers = max_workers
+        self.stream = stream  # where finished steps' output goes; None is sys.stdout at run time
+        self.steps = {}
+        self.elapsed = None
+        self._output_lock = threading.Lock()
+
+    def add(self, name, func, after=(), wait_for=()):
+        """Add a step that runs func(out) once every step named in after has passed
+        and every step named in wait_for has finished (passed, failed or skipped);
+        out is the step's StepOutput"""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step {name!r}")
+        self.steps[name] = SuiteStep(name, func, after, wait_for)
+        return self.steps[name]
+
+    def _check_graph(self):
+        for step in self.steps.values():
+            unknown = [name for name in step.after + step.wait_for if name not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {step.name!r} depends on unknown step(s): {', '.join(unknown)}")
+        # Kahn's algorithm: anything left over is on a cycle
+        remaining = {name: set(step.after + step.wait_for) for name, step in self.steps.items()}
+        while True:
+            ready = [name for name, after in remaining.items() if not after]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for after in remaining.values():
+                after.difference_update(ready)
+        if remaining:
+            raise ValueError(f"Dependency cycle between steps: {', '.join(sorted(remaining))}")
+
+    def _run_step(self, step, stream):
+        out = StepOutput(step.results)
+        start_time = time.perf_counter()
+        try:
+            passed = step.func(out) is not False
+            if passed and step.results['failed']:
+                passed = False
+                step.error = f"{step.results['failed']} failed result(s)"
+            step.status = "passed" if passed else "failed"
+        except Exception as e:
+            step.status = "failed"
+            step.error = f"{type(e).__name__}: {e}"
+            out.write(traceback.format_exc())
+        finally:
+            step.elapsed = time.perf_counter() - start_time
+        with self._output_lock:
+            stream.write(out.getvalue())
+            if step.status == "failed":
+                reason = f": {step.error}" if step.error else ""
+                stream.write(f"⚠️  Step {step.name} failed after {step.elapsed:.1f}s{reason}\n")
+            stream.flush()
+
+    def _skip_dependents(self, failed, stream):
+        for step in self.steps.values():
+            if step.status == "pending" and failed in step.after:
+                step.status = "skipped"
+                step.error = f"dependency {failed} did not pass"
+                with self._output_lock:
+                    stream.write(f"⏭️  Skipping {step.name}: {step.error}\n")
+                self._skip_dependents(step.name, stream)
+
+    def run(self):
+        """Run every step; returns the steps in the order they were added"""
+        self._check_graph()
+        stream = self.stream if self.stream is not None else sys.stdout
+        start_time = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hostconnect-suite") as pool:
+                running = {}
+                while True:
+                    for step in self.steps.values():
+                        if (step.status == "pending"
+                                and all(self.steps[name].status == "passed" for name in step.after)
+                                and all(self.steps[name].status in FINISHED for name in step.wait_for)):
+                            step.status = "running"
+                            running[pool.submit(self._run_step, step, stream)] = step
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = running.pop(future)
+                        if step.status == "failed":
+                            self._skip_dependents(step.name, stream)
+        finally:
+            self.elapsed = time.perf_counter() - start_time
+        return list(self.steps.values())
+
+    def summary(self):
+        """Suite wall time against the sum of its step times, and every step's outcome"""
+        busy = sum(step.elapsed or 0 for step in self.steps.values())
+        return {
+            'elapsed_s': round(self.elapsed, 3) if self.elapsed is not None else None,
+            'sequential_s': round(busy, 3),
+            'steps': [step.as_dict() for step in self.steps.values()],
+        }
+
+    def table(self):
+        """Text table of the step timings"""
+        summary = self.summary()
+        lines = [f"Suite steps ({summary['elapsed_s']}s wall, {summary['sequential_s']}s if run one after another)"]
+        for step in summary['steps']:
+            elapsed = f"{step['elapsed_s']:.2f}s" if step['elapsed_s'] is not None else "-"
+            waits = step['after'] + step['wait_for']
+            after = f" (after {', '.join(waits)})" if waits else ""
+            lines.append(f"  {step['name']:<28}{step['status']:<9}{elapsed:>9}{after}")
+        return "\n".join(lines)
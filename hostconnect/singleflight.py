@@ -0,0 +1,67 @@
+"""
+HostConnect Request Coalescing
+Single-flight execution of identical in-flight requests.
+
+When several workers ask for the same canonical request at once (typically a
+cache-cold burst right after a deploy), only the first one - the leader -
+goes upstream. The others wait for it and share its reply, or its exception.
+"""
+
+import threading
+
+
+class _Flight:
+    """One upstream call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-safe coalescing of calls by key"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0}
+
+    def do(self, key, func):
+        """Run func() once for all concurrent callers of the same key"""
+        with self._lock:
+            self._stats['calls'] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats['executions'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def in_flight(self):
+        """Number of distinct calls currently upstream"""
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self):
+        """Calls seen, upstream executions and calls served by another caller's flight"""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+HostConnect Stand-in Server
+A local HTTP server that speaks the hostConnect_5_05_000 request dialect.
+
+Direct-API tests need the South Africa VPN and a whitelisted IP, so the
+client cannot be benchmarked in CI or on a laptop. The stand-in answers
+PingRequest, AgentInfoRequest, OptionInfoRequest (Info codes G, S, R and A,
+one or several <Opt> codes, or a ButtonName/DestinationName search) and the
+SOAP SearchTours envelope from the fixtures in hostconnect/fixtures/, with a
+configurable latency distribution and payload size.
+
+Point every script at it with a single setting:
+    python -m hostconnect.standin --port 8900 --latency lognormal:120:0.5
+    export HOSTCONNECT_STANDIN=http://127.0.0.1:8900
+
+Latency specs (milliseconds): fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD,
+lognormal:MEDIAN:SIGMA, exp:MEAN. Prefix with a request name to override one
+request type, e.g. --latency OptionInfoRequest=lognormal:300:0.6
+
+Fault injection (--chaos KIND:RATE[:ARGS], same request-name prefix, or a
+named --chaos-profile) reproduces what goes wrong over the VPN, each at its
+own rate (0-1):
+    spike:RATE:LATENCYSPEC      extra delay before replying, e.g. spike:0.05:fixed:3000
+    trickle:RATE:BYTES:MS       body sent BYTES at a time every MS milliseconds
+    disconnect:RATE[:FRACTION]  connection reset after FRACTION of the body (default 0.5)
+    reset:RATE                  connection reset before any reply
+    status:RATE:CODE            bare HTTP error, e.g. status:0.02:503 or status:0.1:403
+    error:RATE:CODE             ErrorReply (SOAP Fault) with a HostConnect code, e.g. error:0.2:2050
+GET /_standin/stats returns the request and injected-fault counters.
+
+It is also a local egress-IP echo for hostconnect.egress: GET /_standin/ip/
+httpbin, ipify, ipinfo or text answers like the public service of that name
+with the caller's address, or the one given by --egress-ip [SERVICE=]IP (set
+a different IP for one service to test quorum disagreement). Latency and
+chaos apply to these as request type IpEcho.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import socket
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from hostconnect.config import STANDIN_PORT
+from hostconnect.parser import local_name
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "standin.json")
+
+HOSTCONNECT_VERSION = "5.05.000"
+
+# Local egress-IP echo: service name -> JSON field holding the address (None = plain text)
+IP_ECHO_PATH = "/_standin/ip/"
+IP_ECHO_FIELDS = {'httpbin': 'origin', 'ipify': 'ip', 'ipinfo': 'ip', 'text': None}
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+class LatencyModel:
+    """A latency distribution parsed from a spec such as lognormal:120:0.5"""
+
+    def __init__(self, kind="fixed", params=(0,), rng=None):
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def parse(cls, spec, rng=None):
+        kind, *params = spec.split(":")
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exp': 1}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind, params, rng)
+
+    def sample(self):
+        """One delay in seconds"""
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            ms = self.rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            ms = self.rng.lognormvariate(math.log(p[0]), p[1])
+        else:
+            ms = self.rng.expovariate(1 / p[0]) if p[0] > 0 else 0
+        return max(ms, 0) / 1000
+
+    def __repr__(self):
+        return ":".join([self.kind] + [f"{p:g}" for p in self.params])
+
+
+# Failures that replace the reply (at most one per request, first listed wins)
+FAILURE_KINDS = ("reset", "disconnect", "status", "error")
+# Arguments after the rate for each fault kind (None: a latency spec)
+FAULT_ARGS = {'spike': None, 'trickle': 2, 'disconnect': (0, 1), 'reset': 0, 'status': 1, 'error': 1}
+
+# Messages of injected ErrorReply codes, in Tourplan's "CODE SCN text" form
+INJECTED_ERRORS = {
+    "2050": "2050 SCN Request denied: access is not permitted from this IP address",
+    "1000": "1000 SCN System.InvalidOperationException: There is an error in XML document",
+}
+
+# Named --chaos-profile presets
+CHAOS_PROFILES = {
+    'vpn-flap': ["error:0.2:2050", "reset:0.02"],
+    'slow': ["spike:0.05:lognormal:3000:0.4", "trickle:0.1:512:20"],
+    'flaky': ["status:0.03:503", "status:0.01:500", "disconnect:0.02", "reset:0.01"],
+    'forbidden': ["status:0.5:403"],
+}
+
+
+class Fault:
+    """One injected failure mode, fired with probability rate per request"""
+
+    def __init__(self, kind, rate, args=(), latency=None):
+        self.kind = kind
+        self.rate = rate
+        self.args = args
+        self.latency = latency
+
+    @classmethod
+    def parse(cls, spec, rng=None):
+        kind, _, rest = spec.partition(":")
+        rate, _, rest = rest.partition(":")
+        args = rest.split(":") if rest else []
+        expected = FAULT_ARGS.get(kind, -1)
+        try:
+            rate = float(rate)
+            if not 0 <= rate <= 1:
+                raise ValueError
+            if expected is None:
+                return cls(kind, rate, latency=LatencyModel.parse(rest, rng))
+            if expected == -1 or len(args) not in (expected if isinstance(expected, tuple) else (expected,)):
+                raise ValueError
+            if kind == "status":
+                HTTPStatus(int(args[0]))
+            return cls(kind, rate, tuple(float(a) if kind != "error" else a for a in args))
+        except ValueError:
+            raise ValueError(f"Invalid chaos spec: {spec!r}") from None
+
+    def __repr__(self):
+        args = [repr(self.latency)] if self.latency else [f"{a:g}" if isinstance(a, float) else a for a in self.args]
+        return ":".join([self.kind, f"{self.rate:g}"] + args)
+
+
+class Disruption:
+    """What the chaos profile decided for one request"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.failure = None
+        self.trickle = None
+        self.fired = []
+
+
+class ChaosProfile:
+    """Faults applied to every request, plus per-request-name additions"""
+
+    def __init__(self, faults=(), overrides=None, rng=None):
+        self.faults = list(faults)
+        self.overrides = overrides or {}
+        self.rng = rng or random.Random()
+
+    def __bool__(self):
+        return bool(self.faults or self.overrides)
+
+    def decide(self, request_name):
+        disruption = Disruption()
+        for fault in self.faults + self.overrides.get(request_name, []):
+            if self.rng.random() >= fault.rate:
+                continue
+            if fault.kind == "spike":
+                disruption.delay += fault.latency.sample()
+            elif fault.kind == "trickle":
+                if disruption.trickle is not None:
+                    continue
+                disruption.trickle = fault
+            elif disruption.failure is not None:
+                continue
+            else:
+                disruption.failure = fault
+            disruption.fired.append(fault)
+        return disruption
+
+    def __repr__(self):
+        faults = [repr(f) for f in self.faults]
+        faults += [f"{name}={f!r}" for name, group in self.overrides.items() for f in group]
+        return ", ".join(faults) or "none"
+
+
+def parse_chaos(specs=None, profiles=None, rng=None):
+    """ChaosProfile from --chaos specs and --chaos-profile names"""
+    faults = []
+    overrides = {}
+    for name in profiles or []:
+        if name not in CHAOS_PROFILES:
+            raise ValueError(f"Unknown chaos profile: {name!r} (known: {', '.join(sorted(CHAOS_PROFILES))})")
+        faults.extend(Fault.parse(spec, rng) for spec in CHAOS_PROFILES[name])
+    for spec in specs or []:
+        if "=" in spec:
+            name, fault = spec.split("=", 1)
+            overrides.setdefault(name, []).append(Fault.parse(fault, rng))
+        else:
+            faults.append(Fault.parse(spec, rng))
+    return ChaosProfile(faults, overrides, rng)
+
+
+def element(name, text):
+    return f"<{name}>{escape(str(text))}</{name}>"
+
+
+def hostconnect_reply(inner):
+    return f'<?xml version="1.0"?>\n<Reply>{inner}</Reply>'.encode("utf-8")
+
+
+def error_reply(*messages):
+    return hostconnect_reply("<ErrorReply>" + "".join(element("Error", m) for m in messages) + "</ErrorReply>")
+
+
+class StandinResponder:
+    """Builds replies for parsed requests from the fixtures
+
+    search_options is the number of <Option> records returned for a
+    ButtonName/DestinationName search (fixtures are repeated with numbered
+    codes to reach it) and pad_bytes adds that much comment text to every
+    option, so reply sizes can be dialled from a few KB to many MB.
+    """
+
+    def __init__(self, fixtures=None, search_options=20, pad_bytes=0, check_credentials=True):
+        self.fixtures = fixtures or load_fixtures()
+        self.options = {option['Opt']: option for option in self.fixtures['options']}
+        self.search_options = search_options
+        self.pad_bytes = pad_bytes
+        self.check_credentials = check_credentials
+
+    def authenticate(self, request):
+        agent = self.fixtures['agent']
+        if not self.check_credentials:
+            return None
+        if request.findtext("AgentID") != agent['AgentID'] or request.findtext("Password") != agent['Password']:
+            return error_reply("Authentication failed: invalid AgentID or Password")
+        return None
+
+    def ping(self, request):
+        return hostconnect_reply(f"<PingReply>{element('Version', HOSTCONNECT_VERSION)}</PingReply>")
+
+    def agent_info(self, request):
+        agent = self.fixtures['agent']
+        fields = [element("AgentID", agent['AgentID']), element("AgentName", agent['Name']),
+                  element("Email", agent['Email']), element("Currency", agent['Currency'])]
+        if request.findtext("ReturnAccountInfo") == "Y":
+            fields.append("<AccountInfo>" + element("CreditLimit", agent['CreditLimit'])
+                          + element("Balance", agent['Balance']) + "</AccountInfo>")
+        return hostconnect_reply("<AgentInfoReply>" + "".join(fields) + "</AgentInfoReply>")
+
+    def _search(self, button_name, destination_name):
+        """Fixture options matching a search, repeated up to search_options records"""
+        matches = [
+            option for option in self.fixtures['options']
+            if not destination_name or destination_name.lower() in option['Locality'].lower()
+        ] or self.fixtures['options']
+        results = []
+        for n in range(self.search_options):
+            option = dict(matches[n % len(matches)])
+            if n >= len(matches):
+                option['Opt'] = f"{option['Opt'][:11]}{n:04d}"
+            results.append(option)
+        return results
+
+    def _option(self, number, option, info, date_from, date_to):
+        parts = [element("Opt", option['Opt']), element("OptionNumber", number)]
+        if "G" in info:
+            comment = option['Comment'] + (" " + "x" * self.pad_bytes if self.pad_bytes else "")
+            parts.append(
+                "<OptGeneral>"
+                + element("SupplierName", option['SupplierName'])
+                + element("Description", option['Description'])
+                + element("Comment", comment)
+                + element("Locality", option['Locality'])
+                + element("Periods", option['Periods'])
+                + "</OptGeneral>"
+            )
+        if "S" in info:
+            parts.append(
+                "<OptStayResults>"
+                + element("Availability", "OK")
+                + element("Currency", option['Currency'])
+                + element("TotalPrice", option['Price'])
+                + element("AgentPrice", int(int(option['Price']) * 0.85))
+                + element("RateName", option['RateName'])
+                + "</OptStayResults>"
+            )
+        if "R" in info:
+            parts.append(
+                "<OptRates><OptRate>"
+                + element("RateName", option['RateName'])
+                + element("Currency", option['Currency'])
+                + element("Price", option['Price'])
+                + "</OptRate></OptRates>"
+            )
+        if "A" in info:
+            parts.append(element("OptAvail", " ".join("8" for _ in self._days(date_from, date_to))))
+        return "<Option>" + "".join(parts) + "</Option>"
+
+    @staticmethod
+    def _days(date_from, date_to):
+        try:
+            start = datetime.date.fromisoformat(date_from)
+            end = datetime.date.fromisoformat(date_to or date_from)
+        except (TypeError, ValueError):
+            return [None]
+        return [start + datetime.timedelta(days=n) for n in range(max((end - start).days, 0) + 1)]
+
+    def option_info(self, request):
+        info = (request.findtext("Info") or "G").upper()
+        date_from = request.findtext("DateFrom")
+        date_to = request.findtext("DateTo")
+        codes = [(elem.text or "").strip() for elem in request.findall("Opt")]
+
+        if codes:
+            found = [self.options[code] for code in codes if code in self.options]
+            if not found:
+                return error_reply(*(f"Option not found: {code}" for code in codes))
+        else:
+            found = self._search(request.findtext("ButtonName"), request.findtext("DestinationName"))
+
+        options = "".join(
+            self._option(number, option, info, date_from, date_to)
+            for number, option in enumerate(found, 1)
+        )
+        return hostconnect_reply(f"<OptionInfoReply>{options}</OptionInfoReply>")
+
+    def search_tours(self, request):
+        country = (request.findtext(".//Country") or "").lower()
+        destination = (request.findtext(".//Destination") or "").lower()
+        level = (request.findtext(".//TourLevel") or "").lower()
+        tours = [
+            tour for tour in self.fixtures['tours']
+            if (not country or country == tour['Country'].lower())
+            and (not destination or destination == tour['Destination'].lower())
+            and (not level or level == tour['TourLevel'].lower())
+        ]
+        body = "".join(
+            "<Tour>" + "".join(element(key, value) for key, value in tour.items()) + "</Tour>"
+            for tour in tours
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            f"<SearchToursResponse><SearchToursResult><Tours>{body}</Tours></SearchToursResult>"
+            "</SearchToursResponse></soap:Body></soap:Envelope>"
+        ).encode("utf-8")
+
+    def soap_fault(self, message):
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            f"<soap:Fault>{element('faultcode', 'soap:Client')}{element('faultstring', message)}</soap:Fault>"
+            "</soap:Body></soap:Envelope>"
+        ).encode("utf-8")
+
+    def injected_error(self, request_name, code):
+        """An ErrorReply (SOAP Fault for SOAP requests) carrying a HostConnect error code"""
+        message = INJECTED_ERRORS.get(code, f"{code} SCN Injected error")
+        if request_name in ("SearchTours", "SOAP"):
+            return self.soap_fault(message), "text/xml; charset=utf-8"
+        return error_reply(message), "application/xml"
+
+    def respond(self, body):
+        """(request name, status, reply bytes, content type) for a raw request body"""
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError as e:
+            return "Invalid", 200, error_reply(f"Invalid request XML: {e}"), "application/xml"
+
+        if local_name(root.tag) == "Envelope":
+            search = next((e for e in root.iter() if local_name(e.tag) == "SearchTours"), None)
+            if search is None:
+                return "SOAP", 500, self.soap_fault("Unsupported SOAP operation"), "text/xml; charset=utf-8"
+            for elem in root.iter():
+                elem.tag = local_name(elem.tag)
+            return "SearchTours", 200, self.search_tours(root), "text/xml; charset=utf-8"
+
+        request = root[0] if len(root) else None
+        name = local_name(request.tag) if request is not None else "Empty"
+        handlers = {
+            'PingRequest': self.ping,
+            'AgentInfoRequest': self.agent_info,
+            'OptionInfoRequest': self.option_info,
+        }
+        handler = handlers.get(name)
+        if handler is None:
+            return name, 200, error_reply(f"Unsupported request: {name}"), "application/xml"
+        if name != "PingRequest":
+            denied = self.authenticate(request)
+            if denied is not None:
+                return name, 200, denied, "application/xml"
+        return name, 200, handler(request), "application/xml"
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded stand-in server; latency and faults are drawn per request before replying"""
+
+    daemon_threads = True
+
+    def __init__(self, address, responder, latency=None, latencies=None, chaos=None, egress_ips=None):
+        self.responder = responder
+        self.egress_ips = egress_ips or {}
+        self.latency = latency or LatencyModel()
+        self.latencies = latencies or {}
+        self.chaos = chaos or ChaosProfile()
+        self.request_counts = {}
+        self.fault_counts = {}
+        self.verbose = False
+        self._counts_lock = threading.Lock()
+        super().__init__(address, StandinHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay_for(self, request_name):
+        return self.latencies.get(request_name, self.latency).sample()
+
+    def count(self, request_name):
+        with self._counts_lock:
+            self.request_counts[request_name] = self.request_counts.get(request_name, 0) + 1
+
+    def count_fault(self, fault):
+        with self._counts_lock:
+            self.fault_counts[repr(fault)] = self.fault_counts.get(repr(fault), 0) + 1
+
+    def stats(self):
+        """Requests served and faults injected so far, by name"""
+        with self._counts_lock:
+            return {'requests': dict(self.request_counts), 'faults': dict(self.fault_counts)}
+
+    def start(self):
+        """Serve on a daemon thread (for use from benchmarks and tests)"""
+        thread = threading.Thread(target=self.serve_forever, name="hostconnect-standin", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "HostConnectStandin/" + HOSTCONNECT_VERSION
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; without this, Nagle plus the
+        # client's delayed ACK adds ~40ms to every reply's body phase
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        if self.path == "/_standin/stats":
+            self.send_reply(200, json.dumps(self.server.stats()).encode("utf-8"), "application/json")
+        elif self.path.startswith(IP_ECHO_PATH):
+            self.echo_ip(self.path[len(IP_ECHO_PATH):])
+        else:
+            self.send_reply(200, b"HostConnect stand-in\n", "text/plain")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        server = self.server
+        name, status, reply, content_type = server.responder.respond(body)
+        server.count(name)
+        disruption = server.chaos.decide(name)
+        for fault in disruption.fired:
+            server.count_fault(fault)
+        time.sleep(server.delay_for(name) + disruption.delay)
+
+        failure = disruption.failure
+        cut_at = None
+        if failure is not None:
+            if failure.kind == "reset":
+                self.reset_connection()
+                return
+            if failure.kind == "disconnect":
+                cut_at = int(len(reply) * (failure.args[0] if failure.args else 0.5))
+            elif failure.kind == "status":
+                status = int(failure.args[0])
+                reply = f"{status} {HTTPStatus(status).phrase}\n".encode("utf-8")
+                content_type = "text/plain"
+            else:
+                status = 200
+                reply, content_type = server.responder.injected_error(name, failure.args[0])
+
+        self.send_reply(status, reply, content_type, trickle=disruption.trickle, cut_at=cut_at)
+
+    def echo_ip(self, service):
+        """Answer like the public IP echo service of that name"""
+        server = self.server
+        if service not in IP_ECHO_FIELDS:
+            self.send_reply(404, f"Unknown IP echo service {service!r}\n".encode("utf-8"), "text/plain")
+            return
+        ip = server.egress_ips.get(service) or server.egress_ips.get("") or self.client_address[0]
+        server.count("IpEcho")
+        disruption = server.chaos.decide("IpEcho")
+        for fault in disruption.fired:
+            server.count_fault(fault)
+        time.sleep(server.delay_for("IpEcho") + disruption.delay)
+
+        failure = disruption.failure
+        if failure is not None and failure.kind in ("reset", "disconnect"):
+            self.reset_connection()
+            return
+        if failure is not None and failure.kind == "status":
+            status = int(failure.args[0])
+            self.send_reply(status, f"{status} {HTTPStatus(status).phrase}\n".encode("utf-8"), "text/plain")
+            return
+
+        field = IP_ECHO_FIELDS[service]
+        if field is None:
+            self.send_reply(200, f"{ip}\n".encode("utf-8"), "text/plain")
+            return
+        reply = {field: ip}
+        if service == "ipinfo":
+            reply.update(city="Johannesburg", country="ZA", org="HostConnect stand-in")
+        self.send_reply(200, json.dumps(reply).encode("utf-8"), "application/json", trickle=disruption.trickle)
+
+    def send_reply(self, status, body, content_type, trickle=None, cut_at=None):
+        """Send a reply, optionally trickled out in small chunks or cut off after cut_at bytes"""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        data = body[:cut_at] if cut_at is not None else body
+        if trickle is None:
+            self.wfile.write(data)
+        else:
+            chunk, interval = int(trickle.args[0]) or 1, trickle.args[1] / 1000
+            for offset in range(0, len(data), chunk):
+                self.wfile.write(data[offset:offset + chunk])
+                self.wfile.flush()
+                time.sleep(interval)
+        if cut_at is not None:
+            self.reset_connection()
+
+    def reset_connection(self):
+        """Abort the connection with a TCP RST, as a dropped VPN tunnel does"""
+        self.wfile.flush()
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def parse_latencies(specs, rng=None):
+    """Default LatencyModel and per-request overrides from --latency arguments"""
+    default = LatencyModel(rng=rng)
+    overrides = {}
+    for spec in specs or []:
+        if "=" in spec:
+            name, model = spec.split("=", 1)
+            overrides[name] = LatencyModel.parse(model, rng)
+        else:
+            default = LatencyModel.parse(spec, rng)
+    return default, overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HostConnect stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STANDIN_PORT)
+    parser.add_argument("--latency", action="append", metavar="[REQUEST=]SPEC",
+                        help="latency distribution in ms, e.g. lognormal:120:0.5 (repeatable)")
+    parser.add_argument("--search-options", type=int, default=20, help="options per search reply")
+    parser.add_argument("--pad-bytes", type=int, default=0, help="extra comment bytes per option")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--no-auth", action="store_true", help="accept any AgentID/Password")
+    parser.add_argument("--chaos", action="append", metavar="[REQUEST=]KIND:RATE[:ARGS]",
+                        help="inject a fault at a rate, e.g. error:0.2:2050 or status:0.05:503 (repeatable)")
+    parser.add_argument("--chaos-profile", action="append", choices=sorted(CHAOS_PROFILES),
+                        help="named set of faults (repeatable)")
+    parser.add_argument("--egress-ip", action="append", metavar="[SERVICE=]IP",
+                        help="address the IP echo services report (default: the caller's; repeatable)")
+    parser.add_argument("--seed", type=int, help="seed the latency and fault samplers")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    default, overrides = parse_latencies(args.latency, rng)
+    chaos = parse_chaos(args.chaos, args.chaos_profile, rng)
+    responder = StandinResponder(
+        load_fixtures(args.fixtures),
+        search_options=args.search_options,
+        pad_bytes=args.pad_bytes,
+        check_credentials=not args.no_auth,
+    )
+    egress_ips = dict(spec.split("=", 1) if "=" in spec else ("", spec) for spec in args.egress_ip or [])
+    server = StandinServer((args.host, args.port), responder, default, overrides, chaos, egress_ips)
+    server.verbose = args.verbose
+
+    print(f"HostConnect stand-in listening on {server.url}")
+    print(f"Latency: {default}" + "".join(f", {name}={model}" for name, model in overrides.items()))
+    if chaos:
+        print(f"Chaos: {chaos}")
+    print(f"Point the scripts at it with: export HOSTCONNECT_STANDIN={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if chaos:
+            print(f"Injected faults: {server.stats()['faults']}")
+
+
+if __name__ == "__main__":
+    main()
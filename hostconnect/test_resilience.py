@@ -0,0 +1,224 @@
+"""
+Tests for hostconnect.resilience: CircuitBreaker state changes and the
+AdaptiveTimeouts derivation. Run with `python -m pytest hostconnect`.
+"""
+
+import pytest
+
+from hostconnect import resilience
+from hostconnect.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveTimeouts,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the breaker's open period"""
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_breaker(**settings):
+    changes = []
+    settings.setdefault('failure_rate', 0.5)
+    settings.setdefault('window', 10)
+    settings.setdefault('min_calls', 4)
+    settings.setdefault('open_seconds', 30)
+    breaker = CircuitBreaker("http://upstream/", listeners=[lambda b, old, new: changes.append((old, new))],
+                             **settings)
+    return breaker, changes
+
+
+def call(breaker, failed):
+    breaker.before()
+    breaker.record(failed)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        call(breaker, True)
+
+
+# CircuitBreaker
+
+def test_stays_closed_below_min_calls(clock):
+    breaker, changes = make_breaker()
+    for _ in range(3):
+        call(breaker, True)
+    assert breaker.state == CLOSED
+    assert changes == []
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker, _ = make_breaker()
+    for failed in (False, False, False, True, False, True):
+        call(breaker, failed)
+    assert breaker.state == CLOSED
+
+
+def test_opens_at_failure_rate(clock):
+    breaker, changes = make_breaker()
+    for failed in (False, True, False, True):
+        call(breaker, failed)
+    assert breaker.state == OPEN
+    assert changes == [(CLOSED, OPEN)]
+    assert breaker.stats()['events'][-1]['reason'] == "2/4 calls failed"
+
+
+def test_success_never_opens(clock):
+    # The rate is only checked when the call that just finished failed
+    breaker, _ = make_breaker(failure_rate=0.5, min_calls=2)
+    call(breaker, True)
+    call(breaker, False)
+    assert breaker.state == CLOSED
+
+
+def test_open_rejects_without_calling(clock):
+    breaker, _ = make_breaker()
+    trip(breaker)
+    clock[0] += 29
+    with pytest.raises(CircuitOpenError, match=r"open, retry in 1s"):
+        breaker.before()
+    assert breaker.rejected == 1
+    assert breaker.calls == 4
+
+
+def test_circuit_open_error_is_a_connection_error():
+    import requests
+    assert issubclass(CircuitOpenError, requests.exceptions.ConnectionError)
+
+
+def test_half_open_after_open_seconds(clock):
+    breaker, changes = make_breaker()
+    trip(breaker)
+    clock[0] += 30
+    breaker.before()
+    assert breaker.state == HALF_OPEN
+    assert changes == [(CLOSED, OPEN), (OPEN, HALF_OPEN)]
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker, _ = make_breaker()
+    trip(breaker)
+    clock[0] += 30
+    breaker.before()
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError, match=HALF_OPEN):
+            breaker.before()
+    assert breaker.rejected == 3
+    assert breaker.state == HALF_OPEN
+
+
+def test_trial_success_closes_with_empty_window(clock):
+    breaker, changes = make_breaker()
+    trip(breaker)
+    clock[0] += 30
+    call(breaker, False)
+    assert breaker.state == CLOSED
+    assert changes[-1] == (HALF_OPEN, CLOSED)
+    # The failures from before the open period are forgotten
+    for _ in range(3):
+        call(breaker, True)
+    assert breaker.state == CLOSED
+
+
+def test_trial_failure_reopens_for_a_full_period(clock):
+    breaker, changes = make_breaker()
+    trip(breaker)
+    clock[0] += 30
+    call(breaker, True)
+    assert breaker.state == OPEN
+    assert changes[-1] == (HALF_OPEN, OPEN)
+    clock[0] += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    clock[0] += 1
+    breaker.before()
+    assert breaker.state == HALF_OPEN
+
+
+def test_transitions_are_counted(clock):
+    breaker, _ = make_breaker()
+    trip(breaker)
+    clock[0] += 30
+    call(breaker, True)
+    clock[0] += 30
+    call(breaker, False)
+    assert breaker.stats()['transitions'] == {
+        'closed->open': 1,
+        'open->half-open': 2,
+        'half-open->open': 1,
+        'half-open->closed': 1,
+    }
+
+
+# AdaptiveTimeouts
+
+def test_ceiling_until_min_samples():
+    timeouts = AdaptiveTimeouts(min_samples=5)
+    for _ in range(4):
+        timeouts.record('search', 1.0)
+    assert timeouts.timeout_for('search', 30) == 30
+    timeouts.record('search', 1.0)
+    assert timeouts.timeout_for('search', 30) == 3.0
+
+
+def test_three_times_p99():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    # 100 samples: p99 is the 99th smallest (nearest rank), the slowest one is ignored
+    for ms in range(1, 101):
+        timeouts.record('search', ms / 10)
+    assert timeouts.timeout_for('search', 60) == pytest.approx(3 * 9.9)
+
+
+def test_p99_of_a_small_window_is_its_maximum():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    for seconds in (1.0, 4.0, 2.0):
+        timeouts.record('search', seconds)
+    assert timeouts.timeout_for('search', 60) == 12.0
+
+
+def test_minimum_two_seconds():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    timeouts.record('info', 0.05)
+    assert timeouts.timeout_for('info', 30) == 2.0
+
+
+def test_capped_at_call_site_timeout():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    timeouts.record('search', 25.0)
+    assert timeouts.timeout_for('search', 60) == 60
+    assert timeouts.timeout_for('search', 10) == 10
+
+
+def test_minimum_does_not_raise_the_ceiling():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    timeouts.record('info', 0.05)
+    assert timeouts.timeout_for('info', 1) == 1
+
+
+def test_window_drops_old_samples():
+    timeouts = AdaptiveTimeouts(window=3, min_samples=1)
+    timeouts.record('search', 10.0)
+    for _ in range(3):
+        timeouts.record('search', 1.0)
+    assert timeouts.timeout_for('search', 60) == 3.0
+
+
+def test_keys_are_independent():
+    timeouts = AdaptiveTimeouts(min_samples=1)
+    timeouts.record('search', 5.0)
+    assert timeouts.timeout_for('search', 60) == 15.0
+    assert timeouts.timeout_for('info', 60) == 60
+    assert timeouts.stats() == {'search': {'samples': 1, 'timeout_s': 15.0}}
+
+
+def test_defaults_from_config():
+    timeouts = AdaptiveTimeouts()
+    assert (timeouts.percentile, timeouts.multiplier, timeouts.minimum) == (99, 3, 2.0)
@@ -0,0 +1,135 @@
+"""
+Tests for the statistics in hostconnect.trends: Mann-Whitney U p-values
+(exact and normal approximation) and the Theil-Sen slope. The expected
+p-values were worked out by hand and, for the exact ones, by enumerating
+every rank arrangement. Run with `python -m pytest hostconnect`.
+"""
+
+import math
+
+import pytest
+
+from hostconnect.trends import EXACT_MAX_PAIRS, mann_whitney_greater, theil_sen_slope
+
+
+def normal_sf(z):
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# mann_whitney_greater: empty and single samples
+
+@pytest.mark.parametrize("recent, baseline", [
+    ([], []),
+    ([], [1.0, 2.0]),
+    ([1.0, 2.0], []),
+])
+def test_empty_sample_is_never_significant(recent, baseline):
+    assert mann_whitney_greater(recent, baseline) == (None, 1.0)
+
+
+def test_one_against_one():
+    assert mann_whitney_greater([2.0], [1.0]) == (1.0, 0.5)
+    assert mann_whitney_greater([1.0], [2.0]) == (0.0, 1.0)
+
+
+def test_one_against_three():
+    # 1 of the 4 equally likely positions of the single recent value is the top one
+    assert mann_whitney_greater([9.0], [1.0, 2.0, 3.0]) == (3.0, 0.25)
+    assert mann_whitney_greater([2.5], [1.0, 2.0, 3.0]) == (2.0, 0.5)
+
+
+def test_one_tied_pair_uses_normal_approximation():
+    # n = 2, one tie of 2: variance 1/12 * (3 - 6/2) = 0
+    assert mann_whitney_greater([1.0], [1.0]) == (0.5, 1.0)
+
+
+# mann_whitney_greater: exact distribution (no ties)
+
+@pytest.mark.parametrize("recent, baseline, u, p", [
+    ([3, 4], [1, 2], 4.0, 1 / 6),
+    ([2, 4], [1, 3], 3.0, 2 / 6),
+    ([5, 6, 7], [1, 2, 3], 9.0, 1 / 20),
+    ([1, 5, 9], [2, 3, 4, 7], 7.0, 3 / 7),
+    ([3, 5, 7, 9, 11], [1, 2, 4, 6, 8], 19.0, 28 / 252),
+    ([1, 2], [3, 4], 0.0, 1.0),
+])
+def test_exact_p_values(recent, baseline, u, p):
+    result_u, result_p = mann_whitney_greater(recent, baseline)
+    assert result_u == u
+    assert result_p == pytest.approx(p, rel=1e-12)
+
+
+def test_exact_up_to_max_pairs():
+    # 20 x 20 = EXACT_MAX_PAIRS pairs, completely separated: 1 / C(40, 20)
+    assert 20 * 20 == EXACT_MAX_PAIRS
+    u, p = mann_whitney_greater(range(21, 41), range(1, 21))
+    assert u == 400.0
+    assert p == pytest.approx(1 / math.comb(40, 20), rel=1e-12)
+
+
+def test_argument_order_matters():
+    assert mann_whitney_greater([1, 2, 3], [4, 5, 6])[1] == 1.0
+    assert mann_whitney_greater([4, 5, 6], [1, 2, 3])[1] == pytest.approx(1 / 20)
+
+
+# mann_whitney_greater: normal approximation
+
+def test_normal_approximation_with_one_tie():
+    # Ranks 1, 2.5, 2.5, 4: U = 6.5 - 3 = 3.5, mean 2,
+    # variance 4/12 * (5 - 6/12) = 1.5, z = (3.5 - 2 - 0.5) / sqrt(1.5)
+    u, p = mann_whitney_greater([2.0, 3.0], [1.0, 2.0])
+    assert u == 3.5
+    assert p == pytest.approx(normal_sf(1 / math.sqrt(1.5)), rel=1e-12)
+    assert p == pytest.approx(0.2071081, abs=1e-7)
+
+
+def test_normal_approximation_with_several_ties():
+    # Tie groups of 4, 2 and 2 among 11 values: U = 24.5 - 15 = 9.5, mean 15,
+    # variance 30/12 * (12 - 72/110), z = (9.5 - 15 - 0.5) / sqrt(variance)
+    u, p = mann_whitney_greater([1, 2, 2, 3, 5], [2, 2, 3, 4, 4, 6])
+    assert u == 9.5
+    variance = 30 / 12 * (12 - 72 / 110)
+    assert p == pytest.approx(normal_sf(-6 / math.sqrt(variance)), rel=1e-12)
+    assert p == pytest.approx(0.8700445, abs=1e-7)
+
+
+def test_all_values_tied():
+    assert mann_whitney_greater([5.0, 5.0], [5.0, 5.0, 5.0]) == (3.0, 1.0)
+
+
+def test_normal_approximation_above_max_pairs():
+    # 21 x 21 pairs, completely separated: mean 220.5, variance 441/12 * 43
+    u, p = mann_whitney_greater(range(22, 43), range(1, 22))
+    assert u == 441.0
+    assert p == pytest.approx(normal_sf(220 / math.sqrt(441 / 12 * 43)), rel=1e-12)
+    assert p == pytest.approx(1.5627e-8, rel=1e-4)
+
+
+# theil_sen_slope
+
+@pytest.mark.parametrize("points", [
+    [],
+    [(1.0, 5.0)],
+    [(1.0, 5.0), (1.0, 9.0)],
+])
+def test_slope_undefined(points):
+    assert theil_sen_slope(points) is None
+
+
+def test_slope_of_a_line():
+    assert theil_sen_slope([(0, 1), (1, 3), (2, 5), (3, 7)]) == 2.0
+
+
+def test_slope_ignores_an_outlier():
+    # Six pairwise slopes of 1 and four through the outlier: the median stays 1
+    assert theil_sen_slope([(0, 0), (1, 1), (2, 2), (3, 3), (4, 100)]) == 1.0
+
+
+def test_slope_skips_equal_x():
+    # (1, 1)-(2, 3) and (1, 5)-(2, 3) give 2 and -2
+    assert theil_sen_slope([(1, 1), (1, 5), (2, 3)]) == 0.0
+
+
+def test_slope_of_flat_and_falling_series():
+    assert theil_sen_slope([(0, 5), (1, 5), (2, 5)]) == 0.0
+    assert theil_sen_slope([(0, 9), (1, 6), (2, 3)]) == -3.0
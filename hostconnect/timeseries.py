@@ -0,0 +1,109 @@
+"""
+HostConnect Time Series
+Fixed-size ring buffer of timestamped samples in a small binary file.
+
+The VPN health monitor probes every minute or so for days; a growing JSON or
+JSONL file would need rotating, and SQLite is more than three numbers per
+sample need. A TimeSeriesRing file is a 32-byte header followed by capacity
+16-byte records (time, series, status, value); once full, the oldest record
+is overwritten, so the file never grows past 32 + 16 * capacity bytes
+(512 KB for the default 32768 records). A record is written before the header
+that counts it, and once the ring is full the header drops the oldest record
+before its slot is overwritten, so a reader never sees a half-written one as
+valid.
+
+One process writes a file; any number may read it.
+"""
+
+import math
+import os
+import struct
+import threading
+
+MAGIC = b"HCTS"
+VERSION = 1
+
+# magic, version, capacity, next slot, records written (capped at capacity)
+HEADER = struct.Struct("<4sHxxIII12x")
+# unix time, series id, status id, value (NaN = none)
+RECORD = struct.Struct("<dBBxxf")
+
+
+class TimeSeriesRing:
+    """Append-only ring of (time, series, status, value) records in a file
+
+    series and status are small integers (0-255) whose meaning is up to the
+    caller; value is stored as float32.
+    """
+
+    def __init__(self, path, capacity=32768):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with open(path, "rb") as f:
+                magic, version, capacity, self.head, self.count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} time series file")
+            # An existing file keeps the capacity it was created with
+            self.capacity = capacity
+        else:
+            if capacity < 1:
+                raise ValueError("capacity must be at least 1")
+            self.capacity = capacity
+            self.head = 0
+            self.count = 0
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(self._header())
+                f.truncate(HEADER.size + RECORD.size * capacity)
+        self._file = None
+
+    def _header(self):
+        return HEADER.pack(MAGIC, VERSION, self.capacity, self.head, self.count)
+
+    def append(self, timestamp, series, status, value=None):
+        """Write one record, overwriting the oldest once the ring is full"""
+        record = RECORD.pack(timestamp, series, status, math.nan if value is None else value)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "r+b")
+            if self.count == self.capacity:
+                # Stop counting the oldest record (the slot about to be overwritten) first
+                self.count -= 1
+                self._file.seek(0)
+                self._file.write(self._header())
+                self._file.flush()
+            self._file.seek(HEADER.size + RECORD.size * self.head)
+            self._file.write(record)
+            self._file.flush()
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self._file.seek(0)
+            self._file.write(self._header())
+            self._file.flush()
+
+    def records(self, since=None):
+        """(time, series, status, value) tuples, oldest first, optionally from a unix time on"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        _, _, capacity, head, count = HEADER.unpack_from(data)
+        start = head - count if count < capacity else head
+        for n in range(count):
+            slot = (start + n) % capacity
+            timestamp, series, status, value = RECORD.unpack_from(data, HEADER.size + RECORD.size * slot)
+            if since is not None and timestamp < since:
+                continue
+            yield timestamp, series, status, None if math.isnan(value) else value
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,241 @@
+"""
+HostConnect Request Timing
+Per-phase breakdown of every request: DNS, TCP connect, TLS, TTFB and body.
+
+A single wall-clock response time cannot tell a slow VPN tunnel (connect),
+a slow handshake (TLS) and a slow Tourplan server (TTFB) apart. The pooled
+client's connections are instrumented instead: name resolution is done (and
+timed) before the socket is opened and every resolved address is then tried
+in turn, as urllib3 does itself; the TLS handshake is the rest of
+connect(), TTFB runs from the request being sent to the reply headers, and
+body from the headers to the last byte. Requests that go out on a reused
+connection have no DNS/connect/TLS phases.
+
+Timings are collected per thread while a request is in flight (capture()),
+so they work under the async fan-out and the batcher's worker pools.
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+from hostconnect.metrics import PERCENTILES, LatencyHistogram
+
+PHASES = ("dns", "connect", "tls", "ttfb", "body", "total")
+
+_current = threading.local()
+
+
+class RequestPhases:
+    """Phase durations (milliseconds) of one request"""
+
+    def __init__(self):
+        self.dns_ms = 0.0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.ttfb_ms = None
+        self.body_ms = None
+        self.total_ms = None
+        self.reused = True
+        self._sent_at = None
+        self._headers_at = None
+
+    def as_dict(self):
+        return {
+            'dns_ms': round(self.dns_ms, 2),
+            'connect_ms': round(self.connect_ms, 2),
+            'tls_ms': round(self.tls_ms, 2),
+            'ttfb_ms': round(self.ttfb_ms, 2) if self.ttfb_ms is not None else None,
+            'body_ms': round(self.body_ms, 2) if self.body_ms is not None else None,
+            'total_ms': round(self.total_ms, 2) if self.total_ms is not None else None,
+            'reused': self.reused,
+        }
+
+    def __str__(self):
+        parts = [f"{name} {getattr(self, name + '_ms'):.1f}" for name in ("dns", "connect", "tls")
+                 if not self.reused]
+        parts += [f"{name} {getattr(self, name + '_ms'):.1f}" for name in ("ttfb", "body")
+                  if getattr(self, name + '_ms') is not None]
+        return ", ".join(parts) + " ms" + (" (reused)" if self.reused else "")
+
+
+@contextmanager
+def capture():
+    """Collect the phases of the request sent on this thread inside the block
+
+    Yields a RequestPhases; total and body are filled in on exit. Requests
+    that never reached a socket (cassette replay, connection errors) leave
+    ttfb_ms as None.
+    """
+    phases = RequestPhases()
+    previous = getattr(_current, "phases", None)
+    _current.phases = phases
+    start_time = time.perf_counter()
+    try:
+        yield phases
+    finally:
+        _current.phases = previous
+        end_time = time.perf_counter()
+        phases.total_ms = (end_time - start_time) * 1000
+        if phases._headers_at is not None:
+            phases.body_ms = (end_time - phases._headers_at) * 1000
+
+
+def _phases():
+    return getattr(_current, "phases", None)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """urllib3 connection that reports DNS, connect, TTFB timestamps to capture()"""
+
+    def _new_conn(self):
+        phases = _phases()
+        if phases is None:
+            return super()._new_conn()
+
+        phases.reused = False
+        start_time = time.perf_counter()
+        host = self._dns_host
+        try:
+            results = socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(result[4][0] for result in results)) or [host]
+        except socket.gaierror:
+            addresses = [host]  # let urllib3 raise its own NameResolutionError
+        resolved = time.perf_counter()
+        phases.dns_ms += (resolved - start_time) * 1000
+
+        try:
+            # Fall back to the next address on a refused or timed out connect, like create_connection()
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    pass
+            self._dns_host = addresses[-1]
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+            phases.connect_ms += (time.perf_counter() - resolved) * 1000
+
+    def request(self, *args, **kwargs):
+        result = super().request(*args, **kwargs)
+        phases = _phases()
+        if phases is not None:
+            phases._sent_at = time.perf_counter()
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        phases = _phases()
+        if phases is not None and phases._sent_at is not None:
+            phases._headers_at = time.perf_counter()
+            phases.ttfb_ms = (phases._headers_at - phases._sent_at) * 1000
+        return response
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """HTTPS variant: the TLS handshake is whatever connect() spends after the TCP connect"""
+
+    def connect(self):
+        phases = _phases()
+        if phases is None:
+            return super().connect()
+
+        start_time = time.perf_counter()
+        before = phases.dns_ms + phases.connect_ms
+        try:
+            return super().connect()
+        finally:
+            spent = (time.perf_counter() - start_time) * 1000
+            phases.tls_ms += max(spent - (phases.dns_ms + phases.connect_ms - before), 0)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def instrument(adapter):
+    """Make a requests HTTPAdapter open timed connections"""
+    adapter.poolmanager.pool_classes_by_scheme = {
+        "http": TimedHTTPConnectionPool,
+        "https": TimedHTTPSConnectionPool,
+    }
+    return adapter
+
+
+class PhaseStats:
+    """Phase histograms aggregated per endpoint and per OptionInfo Info code"""
+
+    def __init__(self):
+        self.by_endpoint = {}
+        self.by_info = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add(groups, label, phases):
+        histograms = groups.get(label)
+        if histograms is None:
+            histograms = groups[label] = {name: LatencyHistogram() for name in PHASES}
+            histograms['new_connections'] = 0
+        for name in PHASES:
+            value = getattr(phases, f"{name}_ms")
+            if value is not None and (name not in ("dns", "connect", "tls") or not phases.reused):
+                histograms[name].record(value * 1000)
+        if not phases.reused:
+            histograms['new_connections'] += 1
+
+    def record(self, endpoint, phases, info=None):
+        """Add one request's phases (only requests that reached the server)"""
+        if phases is None or phases.ttfb_ms is None:
+            return
+        with self._lock:
+            self._add(self.by_endpoint, endpoint, phases)
+            if info:
+                self._add(self.by_info, info, phases)
+
+    @staticmethod
+    def _summarize(groups):
+        return {
+            label: dict(
+                {name: histograms[name].summary_ms() for name in PHASES},
+                new_connections=histograms['new_connections'],
+            )
+            for label, histograms in groups.items()
+        }
+
+    def summary(self):
+        """{'endpoints': {...}, 'info_codes': {...}} of per-phase latency summaries"""
+        with self._lock:
+            return {
+                'endpoints': self._summarize(self.by_endpoint),
+                'info_codes': self._summarize(self.by_info),
+            }
+
+    def table(self, percentile=PERCENTILES[0]):
+        """Text table of one percentile of every phase, per endpoint and Info code"""
+        key = f"p{percentile:g}_ms"
+        summary = self.summary()
+        lines = [
+            f"Request phases (p{percentile:g} ms; DNS/connect/TLS over new connections only)",
+            f"{'':<28}{'count':>7}{'new':>6}" + "".join(f"{name:>9}" for name in PHASES),
+        ]
+        for title, groups in (("Endpoint", summary['endpoints']), ("Info code", summary['info_codes'])):
+            if groups:
+                lines.append(f"{title}:")
+            for label, phases in groups.items():
+                row = f"  {label:<26}"
+                row += f"{phases['total']['count']:>7}{phases['new_connections']:>6}"
+                row += "".join(f"{phases[name][key] if phases[name][key] is not None else '-':>9}" for name in PHASES)
+                lines.append(row)
+        return "\n".join(lines)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Performance Trend Store
+Loads every dated test report into SQLite and flags latency regressions.
+
+Reports (tourplan_test_report_*, option_info_test_report_*,
+user_option_info_test_report_*, tourplan_search_test_*, load_test_report_*)
+are ingested once each: every timed result becomes a sample of its test in
+that run, the streamed JSONL results of newer reports included, and load
+test endpoints contribute their p50/p99. Per test, the latest runs are then
+compared with the runs before them using a one-sided Mann-Whitney U test
+(are recent latencies stochastically larger?). A regression needs both
+statistical significance and a practical slowdown of the median, so noise
+in a large sample does not fail a deploy.
+
+Usage:
+    python -m hostconnect.trends ingest
+    python -m hostconnect.trends trends --test search
+    python -m hostconnect.trends gate --test "Tour Search"   # exit status 1 on regression
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from hostconnect.config import (
+    REPO_ROOT,
+    TRENDS_ALPHA,
+    TRENDS_BASELINE_RUNS,
+    TRENDS_DB_PATH,
+    TRENDS_MIN_SLOWDOWN,
+    TRENDS_RECENT_RUNS,
+)
+from hostconnect.results import read_results
+
+REPORT_PATTERNS = (
+    "tourplan_test_report_*.json",
+    "option_info_test_report_*.json",
+    "user_option_info_test_report_*.json",
+    "tourplan_search_test_*.json",
+    "load_test_report_*.json",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    latency_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_test_run ON samples (test, run_id);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+"""
+
+# Exact Mann-Whitney p-values are used up to this many (n1 * n2) pairs, without ties
+EXACT_MAX_PAIRS = 400
+
+_STAMP = re.compile(r"(\d{8})_(\d{6})")
+
+
+def _median(values):
+    ordered = sorted(values)
+    n = len(ordered)
+    if not n:
+        return None
+    mid = n // 2
+    return ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _normal_sf(z):
+    """P(Z >= z) for a standard normal Z"""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _rank(values):
+    """Average ranks (1-based) and the tie groups' sizes"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def _exact_sf(u, n1, n2):
+    """P(U >= u) under H0, counting rank arrangements (no ties)"""
+    # counts[i][s]: arrangements of i x-values among the smallest values with U = s
+    max_u = n1 * n2
+    counts = [[0] * (max_u + 1) for _ in range(n1 + 1)]
+    counts[0][0] = 1
+    for position in range(n1 + n2):
+        for i in range(min(n1, position + 1), 0, -1):
+            # placing an x-value here beats the (position - (i - 1)) y-values already placed
+            beaten = position - (i - 1)
+            if beaten > n2:
+                continue
+            previous = counts[i - 1]
+            current = counts[i]
+            for s in range(max_u - beaten, -1, -1):
+                if previous[s]:
+                    current[s + beaten] += previous[s]
+    total = math.comb(n1 + n2, n1)
+    return sum(counts[n1][math.ceil(u):]) / total
+
+
+def mann_whitney_greater(recent, baseline):
+    """One-sided Mann-Whitney U test that recent values tend to be larger than baseline ones
+
+    Returns (U, p_value). The exact null distribution is used for small
+    samples without ties, otherwise the normal approximation with tie and
+    continuity corrections.
+    """
+    n1, n2 = len(recent), len(baseline)
+    if not n1 or not n2:
+        return None, 1.0
+    ranks, ties = _rank(list(recent) + list(baseline))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    if not ties and n1 * n2 <= EXACT_MAX_PAIRS:
+        return u, _exact_sf(u, n1, n2)
+
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    tie_term = sum(t ** 3 - t for t in ties) / (n * (n - 1))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, _normal_sf(z)
+
+
+def theil_sen_slope(points):
+    """Median of pairwise slopes of (x, y) points: a trend robust to outliers"""
+    slopes = [
+        (y2 - y1) / (x2 - x1)
+        for i, (x1, y1) in enumerate(points)
+        for x2, y2 in points[i + 1:]
+        if x2 != x1
+    ]
+    return _median(slopes)
+
+
+class TrendStore:
+    """SQLite store of per-run latency samples"""
+
+    def __init__(self, path=TRENDS_DB_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+    def ingest(self, path):
+        """Load one report; returns the number of samples, or None if already ingested or unreadable"""
+        source = os.path.abspath(path)
+        if self._db.execute("SELECT 1 FROM runs WHERE source = ?", (source,)).fetchone():
+            return None
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        kind = _STAMP.split(os.path.basename(path))[0].rstrip("_")
+        samples = list(_samples(report, os.path.dirname(source)))
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO runs (source, kind, started_at, ingested_at) VALUES (?, ?, ?, ?)",
+                (source, kind, _started_at(report, path), time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO samples (run_id, test, success, latency_ms) VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, test, int(success), latency) for test, success, latency in samples],
+            )
+        return len(samples)
+
+    def ingest_all(self, paths=None, directory=REPO_ROOT):
+        """Ingest the given reports, or every known report pattern in directory"""
+        if not paths:
+            paths = sorted(p for pattern in REPORT_PATTERNS for p in glob.glob(os.path.join(directory, pattern)))
+        return {path: self.ingest(path) for path in paths}
+
+    def tests(self, pattern=None):
+        """Test names, optionally filtered by a case-insensitive substring"""
+        names = [row[0] for row in self._db.execute("SELECT DISTINCT test FROM samples ORDER BY test")]
+        if pattern:
+            names = [name for name in names if pattern.lower() in name.lower()]
+        return names
+
+    def runs(self, test, successful_only=True):
+        """[(started_at, [latency_ms, ...]), ...] of a test, oldest run first"""
+        rows = self._db.execute(
+            "SELECT runs.started_at, samples.latency_ms FROM samples JOIN runs ON runs.id = samples.run_id "
+            "WHERE samples.test = ? AND (samples.success = 1 OR ? = 0) ORDER BY runs.started_at, runs.id",
+            (test, int(successful_only)),
+        )
+        grouped = []
+        for started_at, latency in rows:
+            if not grouped or grouped[-1][0] != started_at:
+                grouped.append((started_at, []))
+            grouped[-1][1].append(latency)
+        return grouped
+
+    def analyze(self, test, recent=TRENDS_RECENT_RUNS, baseline=TRENDS_BASELINE_RUNS, alpha=TRENDS_ALPHA,
+                min_slowdown=TRENDS_MIN_SLOWDOWN):
+        """Trend and regression verdict of one test's latest runs against the runs before them"""
+        runs = self.runs(test)
+        medians = [(index, _median(latencies)) for index, (_, latencies) in enumerate(runs)]
+        result = {
+            'test': test,
+            'runs': len(runs),
+            'last_run': runs[-1][0] if runs else None,
+            'slope_ms_per_run': theil_sen_slope(medians) if len(medians) > 1 else None,
+            'baseline_median_ms': None,
+            'recent_median_ms': None,
+            'change': None,
+            'p_value': None,
+            'regressed': False,
+            'verdict': "insufficient data",
+        }
+        if len(runs) < recent + 1:
+            return result
+
+        recent_samples = [v for _, latencies in runs[-recent:] for v in latencies]
+        baseline_samples = [v for _, latencies in runs[-(recent + baseline):-recent] for v in latencies]
+        recent_median = _median(recent_samples)
+        baseline_median = _median(baseline_samples)
+        _, p_value = mann_whitney_greater(recent_samples, baseline_samples)
+        change = (recent_median - baseline_median) / baseline_median if baseline_median else None
+
+        regressed = p_value < alpha and change is not None and change >= min_slowdown
+        result.update(
+            baseline_median_ms=baseline_median,
+            recent_median_ms=recent_median,
+            change=change,
+            p_value=p_value,
+            regressed=regressed,
+            verdict="REGRESSED" if regressed else "ok",
+        )
+        return result
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _started_at(report, path):
+    """Run start time as an ISO string: from the report, else from the file name"""
+    summary = report.get('summary') or {}
+    for value in (summary.get('start_time'), report.get('timestamp'), summary.get('timestamp')):
+        if value:
+            return value
+    match = _STAMP.search(os.path.basename(path))
+    if match:
+        return datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S").isoformat()
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+
+
+def _samples(report, directory):
+    """(test, success, latency_ms) for every timed result of a report"""
+    results = report.get('results') or report.get('test_results') or []
+    results_file = report.get('results_file')
+    if results_file:
+        path = results_file if os.path.isabs(results_file) else os.path.join(directory, results_file)
+        if os.path.exists(path):
+            results = read_results(path)
+    for result in results:
+        latency = result.get('response_time')
+        if isinstance(result, dict) and isinstance(latency, (int, float)) and 'test' in result:
+            yield result['test'], bool(result.get('success', True)), float(latency)
+
+    # Load test reports, standalone or embedded in a TourplanTester report
+    load = report.get('performance') or (report if 'endpoints' in report and 'mode' in report else None)
+    for name, data in ((load or {}).get('endpoints') or {}).items():
+        latency = data.get('latency') or {}
+        for percentile in ("p50", "p99"):
+            if latency.get(f"{percentile}_ms") is not None:
+                yield f"{name} (load {percentile})", True, float(latency[f"{percentile}_ms"])
+
+
+def print_trends(analyses):
+    print(f"{'Test':<36}{'runs':>6}{'base ms':>10}{'recent ms':>11}{'change':>9}{'slope':>9}{'p':>8}  verdict")
+    print("-" * 100)
+    for a in analyses:
+        def num(value, fmt):
+            return format(value, fmt) if value is not None else "-"
+        print(
+            f"{a['test'][:35]:<36}{a['runs']:>6}{num(a['baseline_median_ms'], '.0f'):>10}"
+            f"{num(a['recent_median_ms'], '.0f'):>11}"
+            f"{(num(a['change'] * 100, '+.0f') + '%') if a['change'] is not None else '-':>9}"
+            f"{num(a['slope_ms_per_run'], '+.1f'):>9}{num(a['p_value'], '.3f'):>8}  {a['verdict']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency trend store and regression gate over test reports")
+    parser.add_argument("--db", default=TRENDS_DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="load new reports into the store")
+    ingest_parser.add_argument("paths", nargs="*", help="report files (default: every known report in the repo)")
+
+    for name, help_text in (("trends", "per-test trends and regressions"),
+                            ("gate", "deploy gate: exit status 1 if a matching test regressed")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--test", default=None if name == "trends" else "search",
+                         help="case-insensitive substring of the test names to check")
+        sub.add_argument("--recent", type=int, default=TRENDS_RECENT_RUNS, help="latest runs compared")
+        sub.add_argument("--baseline", type=int, default=TRENDS_BASELINE_RUNS, help="earlier runs compared against")
+        sub.add_argument("--alpha", type=float, default=TRENDS_ALPHA, help="significance level")
+        sub.add_argument("--min-slowdown", type=float, default=TRENDS_MIN_SLOWDOWN,
+                         help="smallest median slowdown that counts (0.1 = 10%%)")
+        sub.add_argument("--no-ingest", action="store_true", help="skip ingesting new reports first")
+    args = parser.parse_args()
+
+    with TrendStore(args.db) as store:
+        if args.command == "ingest":
+            for path, count in store.ingest_all(args.paths).items():
+                status = "already ingested" if count is None else f"{count} samples"
+                print(f"{os.path.basename(path)}: {status}")
+            return 0
+
+        if not args.no_ingest:
+            store.ingest_all()
+        analyses = [
+            store.analyze(test, args.recent, args.baseline, args.alpha, args.min_slowdown)
+            for test in store.tests(args.test)
+        ]
+        print_trends(analyses)
+
+        if args.command == "gate":
+            regressed = [a['test'] for a in analyses if a['regressed']]
+            if regressed:
+                print(f"\nREGRESSION: {', '.join(regressed)}")
+                return 1
+            checked = sum(1 for a in analyses if a['p_value'] is not None)
+            print(f"\nNO REGRESSION ({checked} of {len(analyses)} matching tests had enough runs)")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -241,13 +241,14 @@ export class TourplanAPI {
     return this.makeRequest("http://tempuri.org/GetTourDetails", detailsBody)
   }
 
-  async getOptionInfo(optionId: string): Promise<TourplanResponse> {
+  async getOptionInfo(optionId: string, info?: string): Promise<TourplanResponse> {
     const optionBody = `<?xml version="1.0" encoding="utf-8"?>
 <!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
 <Request>
   ${this.createTourplanUserXml()}
   <OptionInfoRequest>
-    <OptionID>${optionId}</OptionID>
+    <OptionID>${optionId}</OptionID>${info ? `
+    <Info>${info}</Info>` : ""}
   </OptionInfoRequest>
 </Request>`
 
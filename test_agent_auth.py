@@ -1,21 +1,12 @@
-import requests
-from xml.dom import minidom
-
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-AGENT_ID = "SAMAGT"  # Replace with your actual Agent ID
-PASSWORD = "S@MAgt01"  # Actual password from .env.local
+from hostconnect import get_default_client
+from hostconnect.builders import build_agent_info_request
+from hostconnect.config import LOG_BODY_MAX_CHARS
+from hostconnect.formatting import format_xml
 
 def test_agent_authentication():
     """Test full agent authentication"""
-    xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>Y</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
+    client = get_default_client()
+    xml_request = build_agent_info_request(client.agent_id, client.password, return_account_info=True)
     
     headers = {
         'Content-Type': 'text/xml',
@@ -23,18 +14,17 @@ def test_agent_authentication():
     }
     
     try:
-        response = requests.post(API_BASE_URL, data=xml_request, headers=headers)
+        response = client.post(xml_request, headers=headers, request_name="AgentInfoRequest")
         print(f"Status Code: {response.status_code}")
         print("Response:")
         
         # Pretty print the XML response
-        dom = minidom.parseString(response.text)
-        print(dom.toprettyxml(indent="  "))
+        print(format_xml(response.content, max_chars=LOG_BODY_MAX_CHARS))
         
-        if "AgentInfoReply" in response.text:
+        if response.reply_type == "AgentInfoReply":
             print("\n✅ AUTHENTICATION SUCCESSFUL!")
             print("🎉 You can now proceed with building your booking engine!")
-        elif "ErrorReply" in response.text:
+        elif response.reply_type == "ErrorReply":
             print("\n❌ Authentication failed - check your credentials")
         
     except Exception as e:
@@ -4,25 +4,9 @@ Complete Setup Testing Script
 This script tests both VPN connectivity and Tourplan API access.
 """
 
-import requests
-from xml.dom import minidom
-import re
-
-# VPN Configuration
-EXPECTED_VPN_IP = "84.46.231.251"
-
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
-
-def pretty_print_xml(xml_string):
-    """Pretty print XML for better readability"""
-    try:
-        dom = minidom.parseString(xml_string)
-        return dom.toprettyxml(indent="  ")
-    except:
-        return xml_string
+from hostconnect import get_default_client
+from hostconnect.config import AGENT_ID, EXPECTED_EGRESS_IP
+from hostconnect.egress import check_egress_ip
 
 def test_vpn_connection():
     """Test VPN connection by checking current IP"""
@@ -33,12 +17,11 @@ def test_vpn_connection():
     
     try:
         print("Checking current IP address...")
-        ip_check = requests.get('https://httpbin.org/ip', timeout=10)
-        current_ip = ip_check.json()['origin']
-        print(f"Current IP: {current_ip}")
-        print(f"Expected VPN IP: {EXPECTED_VPN_IP}")
+        result = check_egress_ip()
+        print(result.summary())
+        print(f"Expected VPN IP: {EXPECTED_EGRESS_IP}")
         
-        if current_ip == EXPECTED_VPN_IP:
+        if result.matches(EXPECTED_EGRESS_IP):
             print("✅ VPN is connected and working correctly!")
             return True
         else:
@@ -57,45 +40,31 @@ def test_tourplan_api():
     print("TOURPLAN API TEST")
     print("=" * 60)
     
+    client = get_default_client()
+    
     # Test basic connectivity
     try:
         print("Testing API endpoint connectivity...")
-        response = requests.get(API_BASE_URL, timeout=10)
+        response = client.get()
         print(f"✅ API endpoint reachable (Status: {response.status_code})")
     except Exception as e:
         print(f"❌ Cannot reach API endpoint: {e}")
         return False
     
     # Test authentication
-    xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>Y</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
-
-    headers = {
-        'Content-Type': 'application/xml',
-        'Accept': 'application/xml'
-    }
-
     print(f"\nTesting authentication for Agent: {AGENT_ID}")
     
     try:
-        response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
+        response = client.agent_info()
         
-        if "<ErrorReply>" in response.text:
+        if response.reply_type == "ErrorReply":
             print("❌ Authentication failed - API returned an error")
-            error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-            if error_match:
-                error_msg = error_match.group(1)
+            error_msg = response.error
+            if error_msg:
                 print(f"Error: {error_msg}")
                 
                 # Analyze the error
-                if "2050" in error_msg and "Request denied" in error_msg:
+                if response.error_code == "2050" and "Request denied" in error_msg:
                     print("\n📋 Analysis:")
                     print("   - Error 2050 indicates IP restriction or agent authorization issue")
                     print("   - Your VPN IP may not be whitelisted for this agent")
@@ -103,11 +72,11 @@ def test_tourplan_api():
                     
             return False
             
-        elif "<AgentInfoReply>" in response.text:
+        elif response.reply_type == "AgentInfoReply":
             print("✅ Authentication successful!")
-            agent_name_match = re.search(r'<AgentName>(.*?)</AgentName>', response.text)
-            if agent_name_match:
-                print(f"Agent Name: {agent_name_match.group(1)}")
+            agent_name = response.findtext("AgentName")
+            if agent_name:
+                print(f"Agent Name: {agent_name}")
             return True
             
         else:
@@ -145,7 +114,7 @@ def main():
         print("2. API endpoint is reachable")
         print("3. Authentication failed - likely IP authorization issue")
         print("4. Contact Tourplan support to whitelist your VPN IP")
-        print(f"   IP to whitelist: {EXPECTED_VPN_IP}")
+        print(f"   IP to whitelist: {EXPECTED_EGRESS_IP}")
         print(f"   Agent ID: {AGENT_ID}")
     
     print("=" * 60)
@@ -9,32 +9,26 @@ import requests
 import json
 from datetime import datetime
 
-# Correct SOAP Search API endpoint
-SOAP_SEARCH_URL = "https://pa-thisis.nx.tourplan.net/soap/search"
-HOSTCONNECT_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-USERNAME = "SAMAGT"
-PASSWORD = "S@MAgt01"
-AGENT_ID = "SAMAGT"
+from hostconnect import get_default_client
+from hostconnect.builders import build_soap_search_request
+from hostconnect.config import (
+    API_BASE_URL as HOSTCONNECT_URL,
+    AGENT_ID,
+    PASSWORD,
+    SOAP_HEADERS,
+    SOAP_SEARCH_URL,
+)
+from hostconnect.discovery import FormatDiscovery
+
+USERNAME = AGENT_ID
 
 def create_soap_search_request():
     """Create SOAP request for the correct search endpoint"""
-    return f"""<?xml version="1.0" encoding="utf-8"?>
-<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-  <soap:Header>
-    <Authentication>
-      <Username>{USERNAME}</Username>
-      <Password>{PASSWORD}</Password>
-      <AgentId>{AGENT_ID}</AgentId>
-    </Authentication>
-  </soap:Header>
-  <soap:Body>
-    <SearchTours>
-      <Country>South Africa</Country>
-      <Destination>Cape Town</Destination>
-      <IncludeCancellationDeadlines>true</IncludeCancellationDeadlines>
-    </SearchTours>
-  </soap:Body>
-</soap:Envelope>"""
+    return build_soap_search_request(
+        USERNAME, PASSWORD, AGENT_ID,
+        country="South Africa",
+        destination="Cape Town"
+    ).decode("utf-8")
 
 def test_soap_search_endpoint():
     """Test the correct SOAP Search API endpoint"""
@@ -53,10 +47,7 @@ def test_soap_search_endpoint():
     print("\n📤 SOAP REQUEST:")
     print(soap_request)
     
-    headers = {
-        'Content-Type': 'text/xml; charset=utf-8',
-        'SOAPAction': ''
-    }
+    headers = SOAP_HEADERS
     
     print(f"\n📋 REQUEST HEADERS:")
     for key, value in headers.items():
@@ -64,16 +55,8 @@ def test_soap_search_endpoint():
     
     try:
         print(f"\n🔄 Sending request to SOAP Search endpoint...")
-        start_time = time.time()
-        
-        response = requests.post(
-            SOAP_SEARCH_URL,
-            data=soap_request,
-            headers=headers,
-            timeout=30
-        )
-        
-        response_time = int((time.time() - start_time) * 1000)
+        response = get_default_client().post_soap(soap_request, url=SOAP_SEARCH_URL)
+        response_time = response.elapsed_ms
         
         print(f"\n📥 RESPONSE FROM SOAP SEARCH ENDPOINT:")
         print(f"Status Code: {response.status_code}")
@@ -97,7 +80,7 @@ def test_soap_search_endpoint():
             print("\n❓ ENDPOINT NOT FOUND (404) - SOAP Search endpoint may not exist")
             access_denied = False
         elif response.status_code == 200:
-            if "soap:Fault" in response.text:
+            if response.reply_type == "Fault":
                 print("\n⚠️  SOAP FAULT in response")
                 access_denied = False
             else:
@@ -177,19 +160,17 @@ def compare_endpoints():
     print("ENDPOINT COMPARISON SUMMARY")
     print("="*80)
     
-    print("✅ HostConnect XML API (Working):")
-    print(f"   URL: {HOSTCONNECT_URL}")
-    print("   Format: HostConnect XML (AgentInfoRequest, OptionInfoRequest)")
-    print("   Status: IP 84.46.231.251 is whitelisted and working")
+    print(f"HostConnect XML API: {HOSTCONNECT_URL}")
+    print(f"SOAP Search API:     {SOAP_SEARCH_URL}")
+    print("Probing every search format at both endpoints...\n")
     
-    print("\n❓ SOAP Search API (Testing):")
-    print(f"   URL: {SOAP_SEARCH_URL}")
-    print("   Format: SOAP envelope with SearchTours")
-    print("   Status: Testing for IP whitelisting...")
+    # Every endpoint x format combination at once; the winner is remembered for later calls
+    discovery = FormatDiscovery()
+    discovery.discover(refresh=True)
+    print(discovery.table())
+    return discovery
 
 if __name__ == "__main__":
-    import time
-    
     print("🔍 SOAP Search API Endpoint Tester")
     print("This will test the correct SOAP Search API endpoint to determine")
     print("if there's an IP whitelisting issue or other problem.")
@@ -9,31 +9,20 @@ import requests
 import json
 from datetime import datetime
 
+from hostconnect import get_default_client
+from hostconnect.builders import build_soap_search_request
+from hostconnect.config import API_BASE_URL as SOAP_API_URL, AGENT_ID, PASSWORD, SOAP_HEADERS
+
 # Configuration matching your TypeScript implementation
-SOAP_API_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-USERNAME = "SAMAGT"
-PASSWORD = "S@MAgt01"
-AGENT_ID = "SAMAGT"
+USERNAME = AGENT_ID
 
 def create_exact_soap_request():
     """Create the exact SOAP request that your TypeScript code generates"""
-    return f"""<?xml version="1.0" encoding="utf-8"?>
-<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-  <soap:Header>
-    <Authentication>
-      <Username>{USERNAME}</Username>
-      <Password>{PASSWORD}</Password>
-      <AgentId>{AGENT_ID}</AgentId>
-    </Authentication>
-  </soap:Header>
-  <soap:Body>
-    <SearchTours>
-      <Country>South Africa</Country>
-      <Destination>Cape Town</Destination>
-      <IncludeCancellationDeadlines>true</IncludeCancellationDeadlines>
-    </SearchTours>
-  </soap:Body>
-</soap:Envelope>"""
+    return build_soap_search_request(
+        USERNAME, PASSWORD, AGENT_ID,
+        country="South Africa",
+        destination="Cape Town"
+    ).decode("utf-8")
 
 def test_soap_search_error():
     """Test and capture the exact SOAP Search API error"""
@@ -54,10 +43,7 @@ def test_soap_search_error():
     print("-" * 40)
     
     # Headers matching your TypeScript implementation
-    headers = {
-        'Content-Type': 'text/xml; charset=utf-8',
-        'SOAPAction': ''
-    }
+    headers = SOAP_HEADERS
     
     print(f"\nREQUEST HEADERS:")
     for key, value in headers.items():
@@ -65,12 +51,7 @@ def test_soap_search_error():
     
     try:
         print(f"\nSending request to: {SOAP_API_URL}")
-        response = requests.post(
-            SOAP_API_URL,
-            data=soap_request,
-            headers=headers,
-            timeout=30
-        )
+        response = get_default_client().post_soap(soap_request, url=SOAP_API_URL)
         
         print(f"\nRESPONSE RECEIVED:")
         print(f"Status Code: {response.status_code}")
@@ -119,7 +100,7 @@ def test_soap_search_error():
         elif response.status_code == 500:
             print("❌ SERVER ERROR (500)")
         elif response.status_code == 200:
-            if "soap:Fault" in response.text:
+            if response.reply_type == "Fault":
                 print("❌ SOAP FAULT in response")
             else:
                 print("✅ SUCCESS - Request worked!")
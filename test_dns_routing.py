@@ -1,5 +1,6 @@
 import socket
-import requests
+
+from hostconnect import get_default_client
 
 def test_dns_and_routing():
     """Test DNS resolution and routing"""
@@ -14,8 +15,10 @@ def test_dns_and_routing():
     
     # Test if we can reach the server
     try:
-        response = requests.get('https://pa-thisis.nx.tourplan.net', timeout=10)
+        response = get_default_client().get('https://pa-thisis.nx.tourplan.net')
         print(f"Can reach Tourplan server: ✅ (Status: {response.status_code})")
+        if response.phases:
+            print(f"Request phases: {response.phases}")
     except Exception as e:
         print(f"Cannot reach Tourplan server: ❌ ({e})")
 
@@ -8,76 +8,24 @@ instead of SOAP, based on the working OptionInfoRequest pattern.
 import requests
 import json
 from datetime import datetime
-from xml.dom import minidom
 
-# Configuration
-API_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
+from hostconnect import get_default_client
+from hostconnect.config import API_BASE_URL as API_URL, AGENT_ID, LOG_BODY_MAX_CHARS, XML_HEADERS
+from hostconnect.discovery import SEARCH_FORMATS, FormatDiscovery, NoWorkingFormat, rejects_format
+from hostconnect.formatting import format_xml
 
-def build_hostconnect_search_xml(params=None):
-    """Build HostConnect XML search request (trying different possible formats)"""
-    if params is None:
-        params = {}
-    
-    # Try format similar to OptionInfoRequest
-    return f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <SearchRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        {f'<Country>{params.get("country")}</Country>' if params.get("country") else ""}
-        {f'<Destination>{params.get("destination")}</Destination>' if params.get("destination") else ""}
-        {f'<TourLevel>{params.get("tourLevel")}</TourLevel>' if params.get("tourLevel") else ""}
-        {f'<StartDate>{params.get("startDate")}</StartDate>' if params.get("startDate") else ""}
-        {f'<EndDate>{params.get("endDate")}</EndDate>' if params.get("endDate") else ""}
-    </SearchRequest>
-</Request>"""
-
-def build_alternative_search_xml(params=None):
-    """Try alternative HostConnect XML search format"""
-    if params is None:
-        params = {}
-    
-    return f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <TourSearchRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        {f'<Country>{params.get("country")}</Country>' if params.get("country") else ""}
-        {f'<Destination>{params.get("destination")}</Destination>' if params.get("destination") else ""}
-        {f'<TourLevel>{params.get("tourLevel")}</TourLevel>' if params.get("tourLevel") else ""}
-        {f'<DateFrom>{params.get("startDate")}</DateFrom>' if params.get("startDate") else ""}
-        {f'<DateTo>{params.get("endDate")}</DateTo>' if params.get("endDate") else ""}
-    </TourSearchRequest>
-</Request>"""
-
-def build_option_search_xml(params=None):
-    """Try using OptionInfoRequest with search parameters"""
-    if params is None:
-        params = {}
-    
-    return f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <OptionInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ButtonName>SEARCH</ButtonName>
-        <DestinationName>{params.get("destination", "Cape Town")}</DestinationName>
-        <Info>SEARCH</Info>
-    </OptionInfoRequest>
-</Request>"""
+# The HostConnect XML dialects among the discovery candidates (SearchTours is SOAP)
+XML_SEARCH_FORMATS = [request_format for request_format in SEARCH_FORMATS if request_format.headers is XML_HEADERS]
 
-def pretty_print_xml(xml_string):
-    """Pretty print XML for better readability"""
-    try:
-        dom = minidom.parseString(xml_string)
-        return dom.toprettyxml(indent="  ")
-    except:
-        return xml_string
+def _search_criteria(params):
+    """search_params names -> build_search_request keywords"""
+    return {
+        "country": params.get("country"),
+        "destination": params.get("destination"),
+        "tour_level": params.get("tourLevel"),
+        "start_date": params.get("startDate"),
+        "end_date": params.get("endDate"),
+    }
 
 def test_hostconnect_search():
     """Test HostConnect XML search formats"""
@@ -96,72 +44,47 @@ def test_hostconnect_search():
         "startDate": "2024-07-01",
         "endDate": "2024-07-31"
     }
-    
-    # Different XML formats to try
-    test_formats = [
-        ("SearchRequest Format", build_hostconnect_search_xml),
-        ("TourSearchRequest Format", build_alternative_search_xml),
-        ("OptionInfoRequest with Search", build_option_search_xml)
-    ]
+    criteria = _search_criteria(search_params)
     
     results = []
+    client = get_default_client()
     
-    for format_name, xml_builder in test_formats:
+    # Probe every format at once (the same candidates hostconnect.discovery uses);
+    # the replies are reported one by one below. Nothing is remembered on disk.
+    discovery = FormatDiscovery("xml-search", formats=XML_SEARCH_FORMATS, endpoints={'hostconnect': API_URL},
+                                params=criteria, client=client, path=None)
+    discovery.discover(refresh=True)
+    
+    for probe in discovery.results:
+        candidate = discovery.candidates[probe.name]
+        format_name = candidate.format.name
+        xml_request = candidate.format.build(client, criteria).decode("utf-8")
         print(f"\n🧪 Testing: {format_name}")
         print("-" * 60)
         
-        # Build XML request
-        xml_request = xml_builder(search_params)
-        
         print("📤 XML REQUEST:")
-        print(pretty_print_xml(xml_request))
+        print(format_xml(xml_request))
         
-        # Headers for HostConnect XML
-        headers = {
-            'Content-Type': 'application/xml',
-            'Accept': 'application/xml'
-        }
-        
-        try:
-            print("⏱️  Sending request...")
-            start_time = time.time()
-            
-            response = requests.post(
-                API_URL,
-                data=xml_request,
-                headers=headers,
-                timeout=30
-            )
-            
-            response_time = int((time.time() - start_time) * 1000)
+        response = probe.reply
+        if response is not None:
+            response_time = response.elapsed_ms
             
             print(f"📥 RESPONSE RECEIVED ({response_time}ms):")
             print(f"Status Code: {response.status_code}")
             print("Response Body:")
-            print(pretty_print_xml(response.text))
+            print(format_xml(response.content, max_chars=LOG_BODY_MAX_CHARS))
             
             # Analyze response
-            success = False
-            analysis = ""
-            
-            if response.status_code == 200:
-                if "<ErrorReply>" in response.text:
-                    if "was not expected" in response.text:
-                        analysis = "❌ XML Format not recognized"
-                    elif "Invalid" in response.text:
-                        analysis = "❌ Invalid request format"
-                    else:
-                        analysis = "❌ Other error in response"
-                elif "<SearchReply>" in response.text or "<TourSearchReply>" in response.text:
-                    analysis = "✅ SUCCESS - Search response received!"
-                    success = True
-                elif "<OptionInfoReply>" in response.text:
-                    analysis = "✅ OptionInfo response (may contain search data)"
-                    success = True
-                else:
-                    analysis = "⚠️  Unexpected response format"
-            else:
+            if probe.ok:
+                analysis = f"✅ SUCCESS - {response.reply_type} received!"
+            elif response.status_code != 200:
                 analysis = f"❌ HTTP Error: {response.status_code}"
+            elif rejects_format(response):
+                analysis = "❌ XML Format not recognized"
+            elif response.reply_type == "ErrorReply":
+                analysis = "❌ Invalid request format" if "Invalid" in (response.error or "") else "❌ Other error in response"
+            else:
+                analysis = "⚠️  Unexpected response format"
             
             print(f"Analysis: {analysis}")
             
@@ -172,18 +95,18 @@ def test_hostconnect_search():
                 "response_code": response.status_code,
                 "response_body": response.text,
                 "response_time_ms": response_time,
-                "success": success,
+                "success": probe.ok,
                 "analysis": analysis,
                 "timestamp": datetime.now().isoformat()
             }
             results.append(result)
             
-        except requests.exceptions.RequestException as e:
-            print(f"💥 REQUEST FAILED: {str(e)}")
+        else:
+            print(f"💥 REQUEST FAILED: {probe.error}")
             result = {
                 "format": format_name,
                 "request": xml_request,
-                "error": str(e),
+                "error": probe.error,
                 "success": False,
                 "timestamp": datetime.now().isoformat()
             }
@@ -191,6 +114,17 @@ def test_hostconnect_search():
         
         print("-" * 60)
     
+    # A real search goes through the winner; it is only re-probed if the winner stops working
+    print(f"\n{discovery.summary()}")
+    try:
+        candidate, response = discovery.send(criteria)
+        print(f"🔎 Search via {candidate.name}: HTTP {response.status_code}, {response.reply_type} "
+              f"({response.elapsed_ms}ms)")
+    except NoWorkingFormat as e:
+        print(f"🔎 {e}")
+    except requests.exceptions.RequestException as e:
+        print(f"🔎 Search failed: {e}")
+    
     # Generate summary
     print("\n" + "="*80)
     print("SUMMARY")
@@ -224,12 +158,11 @@ def test_hostconnect_search():
         }, f, indent=2)
     
     print(f"\n📄 Detailed report saved to: {report_filename}")
+    print(f"🔌 {client.connection_summary()}")
     
     return results
 
 if __name__ == "__main__":
-    import time
-    
     print("🔍 HostConnect XML Search Format Tester")
     print("This will test different HostConnect XML formats for search functionality")
     print("to find the correct format that Tourplan expects.")
@@ -5,13 +5,10 @@ This script tests if your current IP is whitelisted for Tourplan API access.
 """
 
 import requests
-import time
 from datetime import datetime
 
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
+from hostconnect import get_default_client
+from hostconnect.config import API_BASE_URL
 
 def check_ip_status():
     """Check current IP address"""
@@ -29,11 +26,9 @@ def test_tourplan_connectivity():
     """Test basic connectivity to Tourplan API"""
     print("\n🔗 Testing Tourplan API Connectivity...")
     try:
-        start_time = time.time()
-        response = requests.get(API_BASE_URL, timeout=10)
-        response_time = int((time.time() - start_time) * 1000)
+        response = get_default_client().get()
         
-        print(f"✅ API endpoint reachable (Status: {response.status_code}, {response_time}ms)")
+        print(f"✅ API endpoint reachable (Status: {response.status_code}, {response.elapsed_ms}ms)")
         return True
     except requests.exceptions.RequestException as e:
         print(f"❌ Cannot reach API: {str(e)}")
@@ -42,26 +37,10 @@ def test_tourplan_connectivity():
 def test_tourplan_authentication():
     """Test Tourplan authentication to check IP whitelist"""
     print("\n🔐 Testing Tourplan Authentication (IP Whitelist Check)...")
-    
-    xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>Y</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
-
-    headers = {
-        'Content-Type': 'application/xml',
-        'Accept': 'application/xml'
-    }
 
     try:
-        start_time = time.time()
-        response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-        response_time = int((time.time() - start_time) * 1000)
+        response = get_default_client().agent_info()
+        response_time = response.elapsed_ms
 
         print(f"📡 Response received ({response_time}ms)")
         print(f"📊 Status Code: {response.status_code}")
@@ -73,11 +52,9 @@ def test_tourplan_authentication():
         response_text = response.text
         print(f"📄 Response length: {len(response_text)} characters")
         
-        if "<ErrorReply>" in response_text:
+        if response.reply_type == "ErrorReply":
             # Extract error details
-            import re
-            error_match = re.search(r'<Error>(.*?)</Error>', response_text)
-            error_msg = error_match.group(1) if error_match else "Unknown error"
+            error_msg = response.error or "Unknown error"
             
             print(f"❌ Authentication Failed: {error_msg}")
             
@@ -88,11 +65,9 @@ def test_tourplan_authentication():
             
             return False
             
-        elif "<AgentInfoReply>" in response_text:
+        elif response.reply_type == "AgentInfoReply":
             # Extract agent details
-            import re
-            agent_name_match = re.search(r'<AgentName>(.*?)</AgentName>', response_text)
-            agent_name = agent_name_match.group(1) if agent_name_match else "Unknown"
+            agent_name = response.findtext("AgentName") or "Unknown"
             
             print(f"✅ Authentication Successful!")
             print(f"👤 Agent: {agent_name}")
@@ -118,38 +93,22 @@ def test_search_api():
     """Test a simple search request"""
     print("\n🔍 Testing Search API...")
     
-    # Simple OptionInfoRequest for search functionality
-    xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <OptionInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ButtonName>SEARCH</ButtonName>
-        <DestinationName>Cape Town</DestinationName>
-        <Info>AVAIL</Info>
-    </OptionInfoRequest>
-</Request>"""
-
-    headers = {
-        'Content-Type': 'application/xml',
-        'Accept': 'application/xml'
-    }
-
     try:
-        start_time = time.time()
-        response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-        response_time = int((time.time() - start_time) * 1000)
+        # Simple OptionInfoRequest for search functionality
+        response = get_default_client().option_info(
+            button_name="SEARCH",
+            destination_name="Cape Town",
+            info="AVAIL"
+        )
+        response_time = response.elapsed_ms
 
         print(f"📡 Search response received ({response_time}ms)")
         
-        if "<ErrorReply>" in response.text:
-            import re
-            error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-            error_msg = error_match.group(1) if error_match else "Unknown error"
+        if response.reply_type == "ErrorReply":
+            error_msg = response.error or "Unknown error"
             print(f"❌ Search failed: {error_msg}")
             return False
-        elif "<OptionInfoReply>" in response.text:
+        elif response.reply_type == "OptionInfoReply":
             print(f"✅ Search API working!")
             print(f"🎯 You can successfully use the Tourplan search API!")
             return True
@@ -199,6 +158,8 @@ def main():
         print("💡 Contact Tourplan to whitelist your IP:")
         print(f"   Current IP: {current_ip}")
         print("=" * 50)
+    
+    print(f"🔌 {get_default_client().connection_summary()}")
 
 if __name__ == "__main__":
     main()
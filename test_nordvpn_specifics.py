@@ -5,6 +5,9 @@ from datetime import datetime
 import subprocess
 import sys
 
+from hostconnect import get_default_client
+from hostconnect.builders import build_ping_request
+
 def test_connection_stability():
     """Test if IP changes during session"""
     print("=== Testing IP Stability Over Time ===")
@@ -33,33 +36,20 @@ def test_tourplan_with_detailed_logging():
         return
     
     # Test simple Ping request
-    ping_xml = """<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <PingRequest/>
-</Request>"""
-    
     headers = {
         'Content-Type': 'text/xml',
         'Accept': 'text/xml',
         'User-Agent': 'Python-Tourplan-Test/1.0'
     }
     
-    api_url = 'https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi'
+    client = get_default_client()
     
     try:
-        print(f"Attempting connection to: {api_url}")
+        print(f"Attempting connection to: {client.url}")
         
-        start_time = time.time()
-        response = requests.post(
-            api_url,
-            data=ping_xml,
-            headers=headers,
-            timeout=30
-        )
-        end_time = time.time()
+        response = client.post(build_ping_request(), headers=headers, timeout=30, request_name="PingRequest")
         
-        print(f"Response time: {end_time - start_time:.2f} seconds")
+        print(f"Response time: {response.elapsed_ms / 1000:.2f} seconds")
         print(f"Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
         
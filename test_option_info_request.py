@@ -5,52 +5,58 @@ This script tests the OptionInfoRequest functionality for the Tourplan API
 using the specific XML format provided by the user.
 """
 
+import asyncio
 import requests
 import json
 import time
 from xml.dom import minidom
-import re
 from datetime import datetime
 
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-LOCAL_API_URL = "http://localhost:3000"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
+from hostconnect import AsyncHostConnectClient, get_default_client
+from hostconnect.builders import build_option_info_request
+from hostconnect.config import API_BASE_URL, LOCAL_API_URL, AGENT_ID, PASSWORD
+from hostconnect.formatting import BodyLogger, format_xml
+from hostconnect.results import ResultSink, read_results, results_path
+from hostconnect.runner import SuiteRunner
 
 class OptionInfoTester:
     def __init__(self):
-        self.test_results = []
+        self.results = ResultSink(results_path("option_info_test"))
         self.start_time = datetime.now()
+        self.client = get_default_client()
+        self.async_client = AsyncHostConnectClient(self.client)
+        self.bodies = BodyLogger()
+        self.runner = None
         
-    def log_result(self, test_name, success, message, response_time=None):
-        """Log test result"""
+    def log_result(self, test_name, success, message, response_time=None, phases=None, out=None):
+        """Log test result (phases: the reply's DNS/connect/TLS/TTFB/body breakdown, if any)
+
+        out is the suite step's output (see hostconnect.runner.StepOutput), which
+        the result counts toward; None prints to stdout.
+        """
         result = {
             'test': test_name,
             'success': success,
             'message': message,
             'timestamp': datetime.now().isoformat(),
-            'response_time': response_time
+            'response_time': response_time,
+            'phases': phases.as_dict() if phases else None
         }
-        self.test_results.append(result)
+        self.results.write(result)
+        if out is not None:
+            out.note_result(success)
         
         status = "✅ PASS" if success else "❌ FAIL"
         time_info = f" ({response_time}ms)" if response_time else ""
-        print(f"{status} {test_name}{time_info}: {message}")
-    
-    def pretty_print_xml(self, xml_string):
-        """Pretty print XML for better readability"""
-        try:
-            dom = minidom.parseString(xml_string)
-            return dom.toprettyxml(indent="  ")
-        except:
-            return xml_string
+        if phases:
+            time_info = f" ({response_time}ms: {phases})"
+        print(f"{status} {test_name}{time_info}: {message}", file=out)
     
-    def test_option_info_request_direct(self):
+    def test_option_info_request_direct(self, out=None):
         """Test OptionInfoRequest directly against Tourplan API"""
-        print("\n" + "="*60)
-        print("DIRECT TOURPLAN API - OPTION INFO REQUEST TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("DIRECT TOURPLAN API - OPTION INFO REQUEST TESTS", file=out)
+        print("="*60, file=out)
         
         # Test different Info types: G=General, S=Stay Pricing, R=Rates, A=Availability
         test_cases = [
@@ -60,54 +66,39 @@ class OptionInfoTester:
             ("Availability Info", "A", "service_button", "Cape Town"),
         ]
         
-        for test_name, info_type, button_name, destination in test_cases:
-            xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-  <OptionInfoRequest>
-    <AgentID>{AGENT_ID}</AgentID>
-    <Password>{PASSWORD}</Password>
-    <ButtonName>{button_name}</ButtonName>
-    <DestinationName>{destination}</DestinationName>
-    <Info>{info_type}</Info>
-  </OptionInfoRequest>
-</Request>"""
-
-            headers = {
-                'Content-Type': 'application/xml',
-                'Accept': 'application/xml'
-            }
-
-            try:
-                print(f"\n--- Testing {test_name} ---")
-                print("Request XML:")
-                print(self.pretty_print_xml(xml_request))
-                
-                start_time = time.time()
-                response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-                response_time = int((time.time() - start_time) * 1000)
-
-                print(f"Response Status: {response.status_code}")
-                print("Response XML:")
-                print(self.pretty_print_xml(response.text))
-
-                if "<ErrorReply>" in response.text:
-                    error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-                    error_msg = error_match.group(1) if error_match else "Unknown error"
-                    self.log_result(f"{test_name} (Direct API)", False, f"API Error: {error_msg}", response_time)
-                elif "<OptionInfoReply>" in response.text:
-                    self.log_result(f"{test_name} (Direct API)", True, "OptionInfoRequest successful", response_time)
-                else:
-                    self.log_result(f"{test_name} (Direct API)", False, "Unexpected response format", response_time)
+        # Send every Info type at once; replies come back in test_cases order
+        responses = asyncio.run(self.async_client.option_info_many(
+            [
+                {"button_name": button_name, "destination_name": destination, "info": info_type}
+                for _, info_type, button_name, destination in test_cases
+            ],
+            fail_fast=False
+        ))
+        
+        for (test_name, info_type, button_name, destination), response in zip(test_cases, responses):
+            print(f"\n--- Testing {test_name} ---", file=out)
+            
+            if isinstance(response, Exception):
+                self.log_result(f"{test_name} (Direct API)", False, f"Request failed: {str(response)}", out=out)
+                continue
+            
+            response_time = response.elapsed_ms
+            print(f"Response Status: {response.status_code}", file=out)
 
-            except requests.exceptions.RequestException as e:
-                self.log_result(f"{test_name} (Direct API)", False, f"Request failed: {str(e)}")
+            if response.reply_type == "ErrorReply":
+                success, message = False, f"API Error: {response.error or 'Unknown error'}"
+            elif response.reply_type == "OptionInfoReply":
+                success, message = True, "OptionInfoRequest successful"
+            else:
+                success, message = False, "Unexpected response format"
+            self.log_result(f"{test_name} (Direct API)", success, message, response_time, response.phases, out=out)
+            self.bodies.log_exchange(test_name, response, failed=not success, file=out)
     
-    def test_option_info_via_local_api(self):
+    def test_option_info_via_local_api(self, out=None):
         """Test OptionInfoRequest via local Next.js API"""
-        print("\n" + "="*60)
-        print("LOCAL API - OPTION INFO REQUEST TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("LOCAL API - OPTION INFO REQUEST TESTS", file=out)
+        print("="*60, file=out)
         
         # Test the new OptionInfo endpoint
         test_cases = [
@@ -125,8 +116,8 @@ class OptionInfoTester:
             }
             
             try:
-                print(f"\n--- Testing {test_name} via Local API ---")
-                print(f"Request payload: {json.dumps(payload, indent=2)}")
+                print(f"\n--- Testing {test_name} via Local API ---", file=out)
+                print(f"Request payload: {json.dumps(payload, indent=2)}", file=out)
                 
                 start_time = time.time()
                 
@@ -140,29 +131,30 @@ class OptionInfoTester:
                 
                 response_time = int((time.time() - start_time) * 1000)
                 
-                print(f"Response Status: {response.status_code}")
-                print(f"Response Body: {response.text}")
+                print(f"Response Status: {response.status_code}", file=out)
                 
                 if response.status_code == 200:
                     try:
                         data = response.json()
                         if data.get('success'):
-                            self.log_result(f"{test_name} (Local API)", True, "OptionInfo request successful", response_time)
+                            success, message = True, "OptionInfo request successful"
                         else:
-                            self.log_result(f"{test_name} (Local API)", False, f"API returned error: {data.get('error', 'Unknown')}", response_time)
+                            success, message = False, f"API returned error: {data.get('error', 'Unknown')}"
                     except json.JSONDecodeError:
-                        self.log_result(f"{test_name} (Local API)", False, "Invalid JSON response", response_time)
+                        success, message = False, "Invalid JSON response"
                 else:
-                    self.log_result(f"{test_name} (Local API)", False, f"HTTP {response.status_code}", response_time)
+                    success, message = False, f"HTTP {response.status_code}"
+                self.log_result(f"{test_name} (Local API)", success, message, response_time, out=out)
+                self.bodies.log(f"{test_name} (Local API) - response", response.content, failed=not success)
                     
             except requests.exceptions.RequestException as e:
-                self.log_result(f"{test_name} (Local API)", False, f"Request failed: {str(e)}")
+                self.log_result(f"{test_name} (Local API)", False, f"Request failed: {str(e)}", out=out)
     
-    def test_xml_format_validation(self):
+    def test_xml_format_validation(self, out=None):
         """Test XML format validation"""
-        print("\n" + "="*60)
-        print("XML FORMAT VALIDATION TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("XML FORMAT VALIDATION TESTS", file=out)
+        print("="*60, file=out)
         
         # Test the exact format provided by the user
         user_provided_format = """<OptionInfoRequest>
@@ -174,30 +166,25 @@ class OptionInfoTester:
 </OptionInfoRequest>"""
         
         # Test with actual values
-        actual_format = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-  <OptionInfoRequest>
-    <AgentID>{AGENT_ID}</AgentID>
-    <Password>{PASSWORD}</Password>
-    <ButtonName>service_button</ButtonName>
-    <DestinationName>Cape Town</DestinationName>
-    <Info>G</Info>
-  </OptionInfoRequest>
-</Request>"""
+        actual_format = build_option_info_request(
+            AGENT_ID, PASSWORD,
+            button_name="service_button",
+            destination_name="Cape Town",
+            info="G"
+        )
         
         try:
             # Validate XML structure
             dom = minidom.parseString(actual_format)
-            self.log_result("XML Format Validation", True, "XML structure is valid")
+            self.log_result("XML Format Validation", True, "XML structure is valid", out=out)
             
-            print("User provided format (template):")
-            print(user_provided_format)
-            print("\nActual format with credentials:")
-            print(self.pretty_print_xml(actual_format))
+            print("User provided format (template):", file=out)
+            print(user_provided_format, file=out)
+            print("\nActual format with credentials:", file=out)
+            print(format_xml(actual_format), file=out)
             
         except Exception as e:
-            self.log_result("XML Format Validation", False, f"XML validation failed: {str(e)}")
+            self.log_result("XML Format Validation", False, f"XML validation failed: {str(e)}", out=out)
     
     def generate_report(self):
         """Generate test report"""
@@ -205,23 +192,39 @@ class OptionInfoTester:
         print("OPTION INFO REQUEST TEST REPORT")
         print("="*60)
         
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result['success'])
-        failed_tests = total_tests - passed_tests
+        summary = self.results.summary
+        total_tests = summary.total
+        passed_tests = summary.passed
+        failed_tests = summary.failed
         
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests}")
         print(f"Failed: {failed_tests}")
         print(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%" if total_tests > 0 else "No tests run")
         print(f"Test Duration: {datetime.now() - self.start_time}")
+        print(self.client.connection_summary())
+        if self.client.cache is not None:
+            print(self.client.cache_summary())
+        print(f"Coalesced calls: {self.client.coalescing_stats()['coalesced']}")
+        if self.client.cassette is not None:
+            print(self.client.cassette_summary())
+        if self.client.router is not None:
+            print(self.client.router_summary())
+        if self.client.breakers is not None:
+            print(self.client.breaker_summary())
+        print(self.client.phase_stats.table())
+        if self.runner is not None:
+            print(self.runner.table())
         
         if failed_tests > 0:
             print(f"\nFailed Tests:")
-            for result in self.test_results:
-                if not result['success']:
-                    print(f"  ❌ {result['test']}: {result['message']}")
+            for failure in summary.recent_failures:
+                print(f"  ❌ {failure['test']}: {failure['message']}")
+            if failed_tests > len(summary.recent_failures):
+                print(f"  ... {failed_tests - len(summary.recent_failures)} earlier failures in {self.results.path}")
         
-        # Save detailed report
+        # Save detailed report (the individual results are read back from the JSONL file)
+        self.results.flush()
         report_data = {
             'summary': {
                 'total_tests': total_tests,
@@ -229,9 +232,19 @@ class OptionInfoTester:
                 'failed': failed_tests,
                 'success_rate': (passed_tests/total_tests)*100 if total_tests > 0 else 0,
                 'start_time': self.start_time.isoformat(),
-                'end_time': datetime.now().isoformat()
+                'end_time': datetime.now().isoformat(),
+                'connection_stats': self.client.connection_stats(),
+                'cache_stats': self.client.cache.stats() if self.client.cache is not None else None,
+                'coalescing_stats': self.client.coalescing_stats(),
+                'routing_stats': self.client.router.stats() if self.client.router is not None else None,
+                'breaker_stats': self.client.breakers.stats() if self.client.breakers is not None else None,
+                'timeout_stats': self.client.timeouts.stats() if self.client.timeouts is not None else None,
+                'phase_stats': self.client.phase_summary(),
+                'suite': self.runner.summary() if self.runner is not None else None
             },
-            'results': self.test_results
+            'results_file': self.results.path,
+            'results': list(read_results(self.results.path)),
+            'result_summary': summary.as_dict()
         }
         
         report_filename = f"option_info_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -249,10 +262,12 @@ class OptionInfoTester:
         print(f"Local API: {LOCAL_API_URL}")
         print("="*60)
         
-        # Run all test categories
-        self.test_xml_format_validation()
-        self.test_option_info_request_direct()
-        self.test_option_info_via_local_api()
+        # Run all test categories concurrently
+        self.runner = SuiteRunner()
+        self.runner.add("xml_format_validation", self.test_xml_format_validation)
+        self.runner.add("option_info_direct", self.test_option_info_request_direct)
+        self.runner.add("option_info_local_api", self.test_option_info_via_local_api)
+        self.runner.run()
         
         # Generate final report
         self.generate_report()
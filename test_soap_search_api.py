@@ -7,40 +7,28 @@ It will capture the exact request and error response needed for Tourplan support
 
 import requests
 import json
-import time
 from datetime import datetime
 
+from hostconnect import get_default_client
+from hostconnect.builders import build_soap_search_request
+from hostconnect.config import API_BASE_URL as SOAP_API_URL, AGENT_ID, PASSWORD, SOAP_HEADERS
+
 # SOAP Search API Configuration
-SOAP_API_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-USERNAME = "SAMAGT"  # Your agent credentials
-PASSWORD = "S@MAgt01"
-AGENT_ID = "SAMAGT"
+USERNAME = AGENT_ID  # Your agent credentials
 
 def build_soap_search_xml(params=None):
     """Build SOAP XML request for SearchTours"""
     if params is None:
         params = {}
     
-    return f"""<?xml version="1.0" encoding="utf-8"?>
-<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-  <soap:Header>
-    <Authentication>
-      <Username>{USERNAME}</Username>
-      <Password>{PASSWORD}</Password>
-      <AgentId>{AGENT_ID}</AgentId>
-    </Authentication>
-  </soap:Header>
-  <soap:Body>
-    <SearchTours>
-      {f'<Country>{params.get("country")}</Country>' if params.get("country") else ""}
-      {f'<Destination>{params.get("destination")}</Destination>' if params.get("destination") else ""}
-      {f'<TourLevel>{params.get("tourLevel")}</TourLevel>' if params.get("tourLevel") else ""}
-      {f'<StartDate>{params.get("startDate")}</StartDate>' if params.get("startDate") else ""}
-      {f'<EndDate>{params.get("endDate")}</EndDate>' if params.get("endDate") else ""}
-      <IncludeCancellationDeadlines>true</IncludeCancellationDeadlines>
-    </SearchTours>
-  </soap:Body>
-</soap:Envelope>"""
+    return build_soap_search_request(
+        USERNAME, PASSWORD, AGENT_ID,
+        country=params.get("country"),
+        destination=params.get("destination"),
+        tour_level=params.get("tourLevel"),
+        start_date=params.get("startDate"),
+        end_date=params.get("endDate")
+    ).decode("utf-8")
 
 def test_soap_search_api():
     """Test SOAP Search API and capture exact error details"""
@@ -78,6 +66,7 @@ def test_soap_search_api():
     ]
     
     results = []
+    client = get_default_client()
     
     for scenario in test_scenarios:
         print(f"\n🧪 Testing: {scenario['name']}")
@@ -91,24 +80,12 @@ def test_soap_search_api():
         print()
         
         # Prepare headers
-        headers = {
-            'Content-Type': 'text/xml; charset=utf-8',
-            'SOAPAction': '',
-            'User-Agent': 'TourplanBookingEngine/1.0'
-        }
+        headers = dict(SOAP_HEADERS, **{'User-Agent': 'TourplanBookingEngine/1.0'})
         
         try:
             print("⏱️  Sending request...")
-            start_time = time.time()
-            
-            response = requests.post(
-                SOAP_API_URL,
-                data=soap_request,
-                headers=headers,
-                timeout=30
-            )
-            
-            response_time = int((time.time() - start_time) * 1000)
+            response = client.post_soap(soap_request, url=SOAP_API_URL, headers=headers)
+            response_time = response.elapsed_ms
             
             print(f"📥 RESPONSE RECEIVED ({response_time}ms):")
             print(f"Status Code: {response.status_code}")
@@ -126,16 +103,16 @@ def test_soap_search_api():
                 "response_body": response.text,
                 "response_time_ms": response_time,
                 "timestamp": datetime.now().isoformat(),
-                "success": response.status_code == 200 and "soap:Fault" not in response.text
+                "success": response.status_code == 200 and response.reply_type != "Fault"
             }
             
             results.append(result)
             
             # Analyze response
             if response.status_code == 200:
-                if "soap:Fault" in response.text:
+                if response.reply_type == "Fault":
                     print("❌ SOAP FAULT DETECTED")
-                elif "SearchToursResponse" in response.text:
+                elif response.reply_type == "SearchToursResponse":
                     print("✅ SUCCESS - SearchTours response received")
                 else:
                     print("⚠️  UNEXPECTED RESPONSE FORMAT")
@@ -223,6 +200,7 @@ def test_soap_search_api():
     print(f"API Endpoint: {SOAP_API_URL}")
     print("Issue: HostConnect XML API works, but SOAP Search API returns access denied")
     print(f"Error Report File: {report_filename}")
+    print(client.connection_summary())
     
     if access_denied_errors:
         print("\nSample failing request:")
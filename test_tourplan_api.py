@@ -5,21 +5,11 @@ This script tests authentication and basic API functionality with the Tourplan H
 """
 
 import requests
-from xml.dom import minidom
-import re
 
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
-
-def pretty_print_xml(xml_string):
-    """Pretty print XML for better readability"""
-    try:
-        dom = minidom.parseString(xml_string)
-        return dom.toprettyxml(indent="  ")
-    except:
-        return xml_string
+from hostconnect import get_default_client
+from hostconnect.builders import build_agent_info_request
+from hostconnect.config import API_BASE_URL, AGENT_ID, LOG_BODY_MAX_CHARS, PASSWORD
+from hostconnect.formatting import format_xml
 
 def test_tourplan_authentication():
     """Test Authentication & Agent Info (with version 5 DTD)"""
@@ -28,52 +18,39 @@ def test_tourplan_authentication():
     print("TOURPLAN API AUTHENTICATION TEST")
     print("=" * 60)
     
-    xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>Y</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
-
-    headers = {
-        'Content-Type': 'application/xml',
-        'Accept': 'application/xml'
-    }
+    client = get_default_client()
+    xml_request = build_agent_info_request(AGENT_ID, PASSWORD)
 
     print("=== TEST 1: AUTHENTICATION (VERSION 5 DTD) ===")
     print(f"\nAPI Endpoint: {API_BASE_URL}")
     print(f"Agent ID: {AGENT_ID}")
     print(f"Password: {'*' * len(PASSWORD)}")
     print("\nSending Request:")
-    print(pretty_print_xml(xml_request))
+    print(format_xml(xml_request))
     print("-" * 50)
 
     try:
-        response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
+        response = client.post(xml_request)
 
         print(f"Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
         print("\nResponse:")
-        print(pretty_print_xml(response.text))
+        print(format_xml(response.content, max_chars=LOG_BODY_MAX_CHARS))
 
         # Check if response contains ErrorReply
-        if "<ErrorReply>" in response.text:
+        if response.reply_type == "ErrorReply":
             print("\n❌ Authentication failed - API returned an error")
             # Extract the error message
-            error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-            if error_match:
-                print(f"Error: {error_match.group(1)}")
-        elif "<AgentInfoReply>" in response.text:
+            if response.error:
+                print(f"Error: {response.error}")
+        elif response.reply_type == "AgentInfoReply":
             print("\n✅ Authentication successful!")
             print("🎉 Agent info retrieved successfully!")
             
             # Extract agent info if available
-            agent_name_match = re.search(r'<AgentName>(.*?)</AgentName>', response.text)
-            if agent_name_match:
-                print(f"Agent Name: {agent_name_match.group(1)}")
+            agent_name = response.findtext("AgentName")
+            if agent_name:
+                print(f"Agent Name: {agent_name}")
                 
         elif response.status_code == 200:
             print("\n✅ Request successful - check response content")
@@ -98,7 +75,7 @@ def test_basic_connectivity():
     
     try:
         # Simple GET request to check if endpoint is reachable
-        response = requests.get(API_BASE_URL, timeout=10)
+        response = get_default_client().get()
         print(f"✅ API endpoint is reachable")
         print(f"Status Code: {response.status_code}")
         
@@ -116,4 +93,5 @@ if __name__ == "__main__":
     # Test authentication
     test_tourplan_authentication()
     
+    print(f"\n{get_default_client().connection_summary()}")
     print("\nTourplan API testing complete!")
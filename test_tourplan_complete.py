@@ -8,109 +8,94 @@ including authentication, search, booking, and error handling.
 import requests
 import json
 import time
-from xml.dom import minidom
-import re
 from datetime import datetime, timedelta
 
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-LOCAL_API_URL = "http://localhost:3000"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
+from hostconnect import get_default_client
+from hostconnect.config import API_BASE_URL, LOAD_TEST_WRITES, LOCAL_API_URL
+from hostconnect.loadgen import READ_TARGETS, TARGETS, WRITE_TARGETS, LoadGenerator, print_report
+from hostconnect.results import ResultSink, read_results, results_path
+from hostconnect.runner import SuiteRunner
 
 class TourplanTester:
     def __init__(self):
-        self.test_results = []
+        self.results = ResultSink(results_path("tourplan_test"))
         self.start_time = datetime.now()
+        self.client = get_default_client()
+        self.performance_report = None
+        self.runner = None
         
-    def log_result(self, test_name, success, message, response_time=None):
-        """Log test result"""
+    def log_result(self, test_name, success, message, response_time=None, phases=None, out=None):
+        """Log test result (phases: the reply's DNS/connect/TLS/TTFB/body breakdown, if any)
+
+        out is the suite step's output (see hostconnect.runner.StepOutput), which
+        the result counts toward; None prints to stdout.
+        """
         result = {
             'test': test_name,
             'success': success,
             'message': message,
             'timestamp': datetime.now().isoformat(),
-            'response_time': response_time
+            'response_time': response_time,
+            'phases': phases.as_dict() if phases else None
         }
-        self.test_results.append(result)
+        self.results.write(result)
+        if out is not None:
+            out.note_result(success)
         
         status = "✅ PASS" if success else "❌ FAIL"
         time_info = f" ({response_time}ms)" if response_time else ""
-        print(f"{status} {test_name}{time_info}: {message}")
-    
-    def pretty_print_xml(self, xml_string):
-        """Pretty print XML for better readability"""
-        try:
-            dom = minidom.parseString(xml_string)
-            return dom.toprettyxml(indent="  ")
-        except:
-            return xml_string
+        if phases:
+            time_info = f" ({response_time}ms: {phases})"
+        print(f"{status} {test_name}{time_info}: {message}", file=out)
     
-    def test_connectivity(self):
-        """Test basic connectivity to Tourplan API"""
-        print("\n" + "="*60)
-        print("CONNECTIVITY TESTS")
-        print("="*60)
+    def test_connectivity(self, out=None):
+        """Test basic connectivity to Tourplan API (returns whether it is reachable)"""
+        print("\n" + "="*60, file=out)
+        print("CONNECTIVITY TESTS", file=out)
+        print("="*60, file=out)
         
         try:
-            start_time = time.time()
-            response = requests.get(API_BASE_URL, timeout=10)
-            response_time = int((time.time() - start_time) * 1000)
+            response = self.client.get()
             
             self.log_result(
                 "Basic Connectivity", 
                 True, 
                 f"API endpoint reachable (Status: {response.status_code})",
-                response_time
+                response.elapsed_ms,
+                out=out
             )
+            return True
         except requests.exceptions.RequestException as e:
-            self.log_result("Basic Connectivity", False, f"Cannot reach API: {str(e)}")
+            self.log_result("Basic Connectivity", False, f"Cannot reach API: {str(e)}", out=out)
+            return False
     
-    def test_authentication(self):
+    def test_authentication(self, out=None):
         """Test Tourplan authentication"""
-        print("\n" + "="*60)
-        print("AUTHENTICATION TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("AUTHENTICATION TESTS", file=out)
+        print("="*60, file=out)
         
-        xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>Y</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
-
-        headers = {
-            'Content-Type': 'application/xml',
-            'Accept': 'application/xml'
-        }
-
         try:
-            start_time = time.time()
-            response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-            response_time = int((time.time() - start_time) * 1000)
+            response = self.client.agent_info()
+            response_time = response.elapsed_ms
 
-            if "<ErrorReply>" in response.text:
-                error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-                error_msg = error_match.group(1) if error_match else "Unknown error"
-                self.log_result("Authentication", False, f"Auth failed: {error_msg}", response_time)
-            elif "<AgentInfoReply>" in response.text:
-                agent_name_match = re.search(r'<AgentName>(.*?)</AgentName>', response.text)
-                agent_name = agent_name_match.group(1) if agent_name_match else "Unknown"
-                self.log_result("Authentication", True, f"Auth successful - Agent: {agent_name}", response_time)
+            if response.reply_type == "ErrorReply":
+                error_msg = response.error or "Unknown error"
+                self.log_result("Authentication", False, f"Auth failed: {error_msg}", response_time, response.phases, out=out)
+            elif response.reply_type == "AgentInfoReply":
+                agent_name = response.findtext("AgentName") or "Unknown"
+                self.log_result("Authentication", True, f"Auth successful - Agent: {agent_name}", response_time, response.phases, out=out)
             else:
-                self.log_result("Authentication", False, f"Unexpected response format", response_time)
+                self.log_result("Authentication", False, f"Unexpected response format", response_time, response.phases, out=out)
 
         except requests.exceptions.RequestException as e:
-            self.log_result("Authentication", False, f"Request failed: {str(e)}")
+            self.log_result("Authentication", False, f"Request failed: {str(e)}", out=out)
     
-    def test_local_api_endpoints(self):
+    def test_local_api_endpoints(self, out=None):
         """Test local Next.js API endpoints"""
-        print("\n" + "="*60)
-        print("LOCAL API ENDPOINT TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("LOCAL API ENDPOINT TESTS", file=out)
+        print("="*60, file=out)
         
         endpoints = [
             ("Database Connection", "GET", "/api/test-db", None),
@@ -164,20 +149,20 @@ class TourplanTester:
                 if response.status_code == 200:
                     try:
                         data = response.json()
-                        self.log_result(test_name, True, "Endpoint working correctly", response_time)
+                        self.log_result(test_name, True, "Endpoint working correctly", response_time, out=out)
                     except json.JSONDecodeError:
-                        self.log_result(test_name, True, "Endpoint responded (non-JSON)", response_time)
+                        self.log_result(test_name, True, "Endpoint responded (non-JSON)", response_time, out=out)
                 else:
-                    self.log_result(test_name, False, f"HTTP {response.status_code}", response_time)
+                    self.log_result(test_name, False, f"HTTP {response.status_code}", response_time, out=out)
                     
             except requests.exceptions.RequestException as e:
-                self.log_result(test_name, False, f"Request failed: {str(e)}")
+                self.log_result(test_name, False, f"Request failed: {str(e)}", out=out)
     
-    def test_error_scenarios(self):
+    def test_error_scenarios(self, out=None):
         """Test error handling scenarios"""
-        print("\n" + "="*60)
-        print("ERROR HANDLING TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("ERROR HANDLING TESTS", file=out)
+        print("="*60, file=out)
         
         error_tests = [
             ("Invalid Tour ID", "POST", "/api/tours/availability", {
@@ -220,63 +205,58 @@ class TourplanTester:
                 
                 # For error tests, we expect either 400-level errors or graceful handling
                 if response.status_code >= 400 and response.status_code < 500:
-                    self.log_result(test_name, True, f"Properly handled error (HTTP {response.status_code})", response_time)
+                    self.log_result(test_name, True, f"Properly handled error (HTTP {response.status_code})", response_time, out=out)
                 elif response.status_code == 200:
                     # Check if response indicates error was handled gracefully
                     try:
                         data = response.json()
                         if 'error' in data or 'message' in data:
-                            self.log_result(test_name, True, "Error handled gracefully", response_time)
+                            self.log_result(test_name, True, "Error handled gracefully", response_time, out=out)
                         else:
-                            self.log_result(test_name, False, "Error not properly handled", response_time)
+                            self.log_result(test_name, False, "Error not properly handled", response_time, out=out)
                     except:
-                        self.log_result(test_name, False, "Unexpected response format", response_time)
+                        self.log_result(test_name, False, "Unexpected response format", response_time, out=out)
                 else:
-                    self.log_result(test_name, False, f"Unexpected status: {response.status_code}", response_time)
+                    self.log_result(test_name, False, f"Unexpected status: {response.status_code}", response_time, out=out)
                     
             except requests.exceptions.RequestException as e:
-                self.log_result(test_name, False, f"Request failed: {str(e)}")
+                self.log_result(test_name, False, f"Request failed: {str(e)}", out=out)
     
-    def test_performance(self):
-        """Test API performance with multiple requests"""
-        print("\n" + "="*60)
-        print("PERFORMANCE TESTS")
-        print("="*60)
+    def test_performance(self, out=None, users=5, duration=20, warmup=5):
+        """Load test the local API endpoints (closed loop, N virtual users)
+
+        Only the read-only endpoints are driven unless HOSTCONNECT_LOAD_WRITES=1.
+        """
+        print("\n" + "="*60, file=out)
+        print("PERFORMANCE TESTS", file=out)
+        print("="*60, file=out)
         
-        # Test multiple search requests
-        search_times = []
-        for i in range(5):
-            try:
-                start_time = time.time()
-                response = requests.post(
-                    f"{LOCAL_API_URL}/api/tours/search",
-                    json={"destination": "Cape Town", "adults": 2},
-                    timeout=30
-                )
-                response_time = int((time.time() - start_time) * 1000)
-                search_times.append(response_time)
-                
-            except requests.exceptions.RequestException:
-                pass
+        names = READ_TARGETS + (WRITE_TARGETS if LOAD_TEST_WRITES else ())
+        generator = LoadGenerator([TARGETS[name] for name in names], base_url=LOCAL_API_URL)
+        report = generator.run_closed(users, duration, warmup)
+        print_report(report, out)
+        self.performance_report = report
         
-        if search_times:
-            avg_time = sum(search_times) / len(search_times)
-            max_time = max(search_times)
-            min_time = min(search_times)
-            
+        for name, data in report['endpoints'].items():
+            latency = data['latency']
+            ok = data['status_codes'].get('200', 0)
             self.log_result(
-                "Search Performance", 
-                avg_time < 5000,  # Pass if average < 5 seconds
-                f"Avg: {avg_time:.0f}ms, Min: {min_time}ms, Max: {max_time}ms"
+                f"{name} Performance",
+                ok > 0 and latency['p99_ms'] < 5000,  # Pass if p99 < 5 seconds
+                f"{latency['count']} requests, {data['throughput_rps']} req/s, "
+                f"p50: {latency['p50_ms']}ms, p99: {latency['p99_ms']}ms, "
+                f"p99.9: {latency['p99.9_ms']}ms, status: {data['status_codes']}",
+                out=out
             )
-        else:
-            self.log_result("Search Performance", False, "No successful requests")
+        
+        if not report['endpoints']:
+            self.log_result("Load Test", False, "No requests completed", out=out)
     
-    def test_data_validation(self):
+    def test_data_validation(self, out=None):
         """Test data validation and response formats"""
-        print("\n" + "="*60)
-        print("DATA VALIDATION TESTS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("DATA VALIDATION TESTS", file=out)
+        print("="*60, file=out)
         
         try:
             # Test tour search response format
@@ -291,9 +271,9 @@ class TourplanTester:
                 
                 # Check if response has expected structure
                 if 'tours' in data or 'results' in data or isinstance(data, list):
-                    self.log_result("Response Format", True, "Valid JSON structure")
+                    self.log_result("Response Format", True, "Valid JSON structure", out=out)
                 else:
-                    self.log_result("Response Format", False, "Unexpected response structure")
+                    self.log_result("Response Format", False, "Unexpected response structure", out=out)
                 
                 # Check for required fields in tour data
                 tours = data.get('tours', data if isinstance(data, list) else [])
@@ -303,16 +283,16 @@ class TourplanTester:
                     missing_fields = [field for field in required_fields if field not in tour]
                     
                     if not missing_fields:
-                        self.log_result("Tour Data Fields", True, "All required fields present")
+                        self.log_result("Tour Data Fields", True, "All required fields present", out=out)
                     else:
-                        self.log_result("Tour Data Fields", False, f"Missing fields: {missing_fields}")
+                        self.log_result("Tour Data Fields", False, f"Missing fields: {missing_fields}", out=out)
                 else:
-                    self.log_result("Tour Data Fields", False, "No tour data returned")
+                    self.log_result("Tour Data Fields", False, "No tour data returned", out=out)
             else:
-                self.log_result("Response Format", False, f"HTTP {response.status_code}")
+                self.log_result("Response Format", False, f"HTTP {response.status_code}", out=out)
                 
         except Exception as e:
-            self.log_result("Data Validation", False, f"Validation failed: {str(e)}")
+            self.log_result("Data Validation", False, f"Validation failed: {str(e)}", out=out)
     
     def generate_report(self):
         """Generate comprehensive test report"""
@@ -320,23 +300,39 @@ class TourplanTester:
         print("TEST REPORT SUMMARY")
         print("="*60)
         
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result['success'])
-        failed_tests = total_tests - passed_tests
+        summary = self.results.summary
+        total_tests = summary.total
+        passed_tests = summary.passed
+        failed_tests = summary.failed
         
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests}")
         print(f"Failed: {failed_tests}")
         print(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%")
         print(f"Test Duration: {datetime.now() - self.start_time}")
+        print(self.client.connection_summary())
+        if self.client.cache is not None:
+            print(self.client.cache_summary())
+        print(f"Coalesced calls: {self.client.coalescing_stats()['coalesced']}")
+        if self.client.cassette is not None:
+            print(self.client.cassette_summary())
+        if self.client.router is not None:
+            print(self.client.router_summary())
+        if self.client.breakers is not None:
+            print(self.client.breaker_summary())
+        print(self.client.phase_stats.table())
+        if self.runner is not None:
+            print(self.runner.table())
         
         if failed_tests > 0:
             print(f"\nFailed Tests:")
-            for result in self.test_results:
-                if not result['success']:
-                    print(f"  ❌ {result['test']}: {result['message']}")
+            for failure in summary.recent_failures:
+                print(f"  ❌ {failure['test']}: {failure['message']}")
+            if failed_tests > len(summary.recent_failures):
+                print(f"  ... {failed_tests - len(summary.recent_failures)} earlier failures in {self.results.path}")
         
-        # Save detailed report
+        # Save detailed report (the individual results are read back from the JSONL file)
+        self.results.flush()
         report_data = {
             'summary': {
                 'total_tests': total_tests,
@@ -344,9 +340,20 @@ class TourplanTester:
                 'failed': failed_tests,
                 'success_rate': (passed_tests/total_tests)*100,
                 'start_time': self.start_time.isoformat(),
-                'end_time': datetime.now().isoformat()
+                'end_time': datetime.now().isoformat(),
+                'connection_stats': self.client.connection_stats(),
+                'cache_stats': self.client.cache.stats() if self.client.cache is not None else None,
+                'coalescing_stats': self.client.coalescing_stats(),
+                'routing_stats': self.client.router.stats() if self.client.router is not None else None,
+                'breaker_stats': self.client.breakers.stats() if self.client.breakers is not None else None,
+                'timeout_stats': self.client.timeouts.stats() if self.client.timeouts is not None else None,
+                'phase_stats': self.client.phase_summary(),
+                'suite': self.runner.summary() if self.runner is not None else None
             },
-            'results': self.test_results
+            'results_file': self.results.path,
+            'results': list(read_results(self.results.path)),
+            'result_summary': summary.as_dict(),
+            'performance': self.performance_report
         }
         
         report_filename = f"tourplan_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -364,13 +371,17 @@ class TourplanTester:
         print(f"Local API: {LOCAL_API_URL}")
         print("="*60)
         
-        # Run all test categories
-        self.test_connectivity()
-        self.test_authentication()
-        self.test_local_api_endpoints()
-        self.test_error_scenarios()
-        self.test_performance()
-        self.test_data_validation()
+        # Run all test categories, independent ones concurrently
+        self.runner = SuiteRunner()
+        self.runner.add("connectivity", self.test_connectivity)
+        self.runner.add("authentication", self.test_authentication, after=["connectivity"])
+        self.runner.add("local_api_endpoints", self.test_local_api_endpoints)
+        self.runner.add("error_scenarios", self.test_error_scenarios)
+        self.runner.add("data_validation", self.test_data_validation)
+        # The load test saturates the local API, so it runs once the functional checks are done
+        self.runner.add("performance", self.test_performance,
+                        wait_for=["local_api_endpoints", "error_scenarios", "data_validation"])
+        self.runner.run()
         
         # Generate final report
         self.generate_report()
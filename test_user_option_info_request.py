@@ -3,107 +3,95 @@
 Test the specific OptionInfoRequest XML format provided by the user
 """
 
+import asyncio
 import requests
 import json
 import time
 from xml.dom import minidom
-import re
 from datetime import datetime
 
-# API Configuration
-API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
-LOCAL_API_URL = "http://localhost:3000"
-AGENT_ID = "SAMAGT"
-PASSWORD = "S@MAgt01"
+from hostconnect import AsyncHostConnectClient, OptionInfoBatcher, get_default_client
+from hostconnect.config import API_BASE_URL, LOCAL_API_URL
+from hostconnect.formatting import BodyLogger, format_xml
+from hostconnect.overhead import PairedOverhead
+from hostconnect.results import ResultSink, read_results, results_path
+from hostconnect.runner import SuiteRunner
+
+# The user's OptionInfoRequest parameters
+USER_ROOM_CONFIGS = [{"adults": 2, "room_type": "DB"}]
+
+# Option codes priced together, as on a results page
+USER_OPTION_CODES = ["option_identifier", "option_identifier_2", "option_identifier_3"]
 
 class UserOptionInfoTester:
     def __init__(self):
-        self.test_results = []
+        self.results = ResultSink(results_path("user_option_info_test"))
         self.start_time = datetime.now()
+        self.client = get_default_client()
+        self.async_client = AsyncHostConnectClient(self.client)
+        self.bodies = BodyLogger()
+        self.runner = None
+        self.overhead_report = None
         
-    def log_result(self, test_name, success, message, response_time=None):
-        """Log test result"""
+    def log_result(self, test_name, success, message, response_time=None, phases=None, out=None):
+        """Log test result (phases: the reply's DNS/connect/TLS/TTFB/body breakdown, if any)
+
+        out is the suite step's output (see hostconnect.runner.StepOutput), which
+        the result counts toward; None prints to stdout.
+        """
         result = {
             'test': test_name,
             'success': success,
             'message': message,
             'timestamp': datetime.now().isoformat(),
-            'response_time': response_time
+            'response_time': response_time,
+            'phases': phases.as_dict() if phases else None
         }
-        self.test_results.append(result)
+        self.results.write(result)
+        if out is not None:
+            out.note_result(success)
         
         status = "✅ PASS" if success else "❌ FAIL"
         time_info = f" ({response_time}ms)" if response_time else ""
-        print(f"{status} {test_name}{time_info}: {message}")
-    
-    def pretty_print_xml(self, xml_string):
-        """Pretty print XML for better readability"""
-        try:
-            dom = minidom.parseString(xml_string)
-            return dom.toprettyxml(indent="  ")
-        except:
-            return xml_string
+        if phases:
+            time_info = f" ({response_time}ms: {phases})"
+        print(f"{status} {test_name}{time_info}: {message}", file=out)
     
-    def test_user_xml_format_direct(self):
+    def test_user_xml_format_direct(self, out=None):
         """Test the exact XML format provided by the user against Tourplan API"""
-        print("\n" + "="*60)
-        print("TESTING USER'S EXACT XML FORMAT - DIRECT API")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("TESTING USER'S EXACT XML FORMAT - DIRECT API", file=out)
+        print("="*60, file=out)
         
         # The exact XML format provided by the user, with real credentials
-        xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-  <OptionInfoRequest>
-    <AgentID>{AGENT_ID}</AgentID>
-    <Password>{PASSWORD}</Password>
-    <Opt>option_identifier</Opt>
-    <Info>GS</Info>
-    <DateFrom>2024-01-01</DateFrom>
-    <DateTo>2024-01-05</DateTo>
-    <RoomConfigs>
-      <RoomConfig>
-        <Adults>2</Adults>
-        <RoomType>DB</RoomType>
-      </RoomConfig>
-    </RoomConfigs>
-  </OptionInfoRequest>
-</Request>"""
-
-        headers = {
-            'Content-Type': 'application/xml',
-            'Accept': 'application/xml'
-        }
-
         try:
-            print("Testing User's XML Format:")
-            print(self.pretty_print_xml(xml_request))
-            
-            start_time = time.time()
-            response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-            response_time = int((time.time() - start_time) * 1000)
-
-            print(f"Response Status: {response.status_code}")
-            print("Response XML:")
-            print(self.pretty_print_xml(response.text))
+            response = self.client.option_info(
+                opt="option_identifier",
+                info="GS",
+                date_from="2024-01-01",
+                date_to="2024-01-05",
+                room_configs=USER_ROOM_CONFIGS
+            )
+            response_time = response.elapsed_ms
+            print(f"Response Status: {response.status_code}", file=out)
 
-            if "<ErrorReply>" in response.text:
-                error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-                error_msg = error_match.group(1) if error_match else "Unknown error"
-                self.log_result("User XML Format (Direct API)", False, f"API Error: {error_msg}", response_time)
-            elif "<OptionInfoReply>" in response.text:
-                self.log_result("User XML Format (Direct API)", True, "OptionInfoRequest successful", response_time)
+            if response.reply_type == "ErrorReply":
+                success, message = False, f"API Error: {response.error or 'Unknown error'}"
+            elif response.reply_type == "OptionInfoReply":
+                success, message = True, "OptionInfoRequest successful"
             else:
-                self.log_result("User XML Format (Direct API)", False, "Unexpected response format", response_time)
+                success, message = False, "Unexpected response format"
+            self.log_result("User XML Format (Direct API)", success, message, response_time, response.phases, out=out)
+            self.bodies.log_exchange("User's XML Format", response, failed=not success, file=out)
 
         except requests.exceptions.RequestException as e:
-            self.log_result("User XML Format (Direct API)", False, f"Request failed: {str(e)}")
+            self.log_result("User XML Format (Direct API)", False, f"Request failed: {str(e)}", out=out)
     
-    def test_user_xml_via_local_api(self):
+    def test_user_xml_via_local_api(self, out=None):
         """Test the user's XML format via local Next.js API"""
-        print("\n" + "="*60)
-        print("TESTING USER'S XML FORMAT - LOCAL API")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("TESTING USER'S XML FORMAT - LOCAL API", file=out)
+        print("="*60, file=out)
         
         # Convert user's XML structure to JSON payload for local API
         payload = {
@@ -120,8 +108,8 @@ class UserOptionInfoTester:
         }
         
         try:
-            print("Testing User's Format via Local API:")
-            print(f"Request payload: {json.dumps(payload, indent=2)}")
+            print("Testing User's Format via Local API:", file=out)
+            print(f"Request payload: {json.dumps(payload, indent=2)}", file=out)
             
             start_time = time.time()
             
@@ -134,29 +122,30 @@ class UserOptionInfoTester:
             
             response_time = int((time.time() - start_time) * 1000)
             
-            print(f"Response Status: {response.status_code}")
-            print(f"Response Body: {response.text}")
+            print(f"Response Status: {response.status_code}", file=out)
             
             if response.status_code == 200:
                 try:
                     data = response.json()
                     if data.get('success'):
-                        self.log_result("User XML Format (Local API)", True, "OptionInfo request successful", response_time)
+                        success, message = True, "OptionInfo request successful"
                     else:
-                        self.log_result("User XML Format (Local API)", False, f"API returned error: {data.get('error', 'Unknown')}", response_time)
+                        success, message = False, f"API returned error: {data.get('error', 'Unknown')}"
                 except json.JSONDecodeError:
-                    self.log_result("User XML Format (Local API)", False, "Invalid JSON response", response_time)
+                    success, message = False, "Invalid JSON response"
             else:
-                self.log_result("User XML Format (Local API)", False, f"HTTP {response.status_code}", response_time)
+                success, message = False, f"HTTP {response.status_code}"
+            self.log_result("User XML Format (Local API)", success, message, response_time, out=out)
+            self.bodies.log("User XML Format (Local API) - response", response.content, failed=not success)
                 
         except requests.exceptions.RequestException as e:
-            self.log_result("User XML Format (Local API)", False, f"Request failed: {str(e)}")
+            self.log_result("User XML Format (Local API)", False, f"Request failed: {str(e)}", out=out)
     
-    def test_xml_variations(self):
+    def test_xml_variations(self, out=None):
         """Test variations of the user's XML format"""
-        print("\n" + "="*60)
-        print("TESTING XML FORMAT VARIATIONS")
-        print("="*60)
+        print("\n" + "="*60, file=out)
+        print("TESTING XML FORMAT VARIATIONS", file=out)
+        print("="*60, file=out)
         
         # Test different Info values
         info_variations = [
@@ -167,62 +156,106 @@ class UserOptionInfoTester:
             ("Availability", "A")
         ]
         
-        for test_name, info_value in info_variations:
-            xml_request = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-  <OptionInfoRequest>
-    <AgentID>{AGENT_ID}</AgentID>
-    <Password>{PASSWORD}</Password>
-    <Opt>option_identifier</Opt>
-    <Info>{info_value}</Info>
-    <DateFrom>2024-01-01</DateFrom>
-    <DateTo>2024-01-05</DateTo>
-    <RoomConfigs>
-      <RoomConfig>
-        <Adults>2</Adults>
-        <RoomType>DB</RoomType>
-      </RoomConfig>
-    </RoomConfigs>
-  </OptionInfoRequest>
-</Request>"""
-
-            headers = {
-                'Content-Type': 'application/xml',
-                'Accept': 'application/xml'
-            }
-
-            try:
-                print(f"\n--- Testing {test_name} (Info={info_value}) ---")
-                
-                start_time = time.time()
-                response = requests.post(API_BASE_URL, data=xml_request, headers=headers, timeout=30)
-                response_time = int((time.time() - start_time) * 1000)
-
-                print(f"Response Status: {response.status_code}")
-                
-                if "<ErrorReply>" in response.text:
-                    error_match = re.search(r'<Error>(.*?)</Error>', response.text)
-                    error_msg = error_match.group(1) if error_match else "Unknown error"
-                    self.log_result(f"{test_name} Variation", False, f"API Error: {error_msg}", response_time)
-                    print(f"Error: {error_msg}")
-                elif "<OptionInfoReply>" in response.text:
-                    self.log_result(f"{test_name} Variation", True, "OptionInfoRequest successful", response_time)
-                    print("✅ Success - OptionInfoReply received")
-                else:
-                    self.log_result(f"{test_name} Variation", False, "Unexpected response format", response_time)
-                    print("❌ Unexpected response format")
+        # Send every variation at once; replies come back in info_variations order
+        responses = asyncio.run(self.async_client.option_info_many(
+            [
+                {
+                    "opt": "option_identifier",
+                    "info": info_value,
+                    "date_from": "2024-01-01",
+                    "date_to": "2024-01-05",
+                    "room_configs": USER_ROOM_CONFIGS
+                }
+                for _, info_value in info_variations
+            ],
+            fail_fast=False
+        ))
+        
+        for (test_name, info_value), response in zip(info_variations, responses):
+            print(f"\n--- Testing {test_name} (Info={info_value}) ---", file=out)
+            
+            if isinstance(response, Exception):
+                self.log_result(f"{test_name} Variation", False, f"Request failed: {str(response)}", out=out)
+                print(f"❌ Request failed: {str(response)}", file=out)
+                continue
+            
+            response_time = response.elapsed_ms
 
-            except requests.exceptions.RequestException as e:
-                self.log_result(f"{test_name} Variation", False, f"Request failed: {str(e)}")
-                print(f"❌ Request failed: {str(e)}")
+            print(f"Response Status: {response.status_code}", file=out)
+            
+            if response.reply_type == "ErrorReply":
+                error_msg = response.error or "Unknown error"
+                self.log_result(f"{test_name} Variation", False, f"API Error: {error_msg}", response_time, response.phases, out=out)
+                print(f"Error: {error_msg}", file=out)
+            elif response.reply_type == "OptionInfoReply":
+                self.log_result(f"{test_name} Variation", True, "OptionInfoRequest successful", response_time, response.phases, out=out)
+                print("✅ Success - OptionInfoReply received", file=out)
+            else:
+                self.log_result(f"{test_name} Variation", False, "Unexpected response format", response_time, response.phases, out=out)
+                print("❌ Unexpected response format", file=out)
     
-    def validate_xml_structure(self):
-        """Validate the XML structure"""
+    def test_batched_option_lookup(self, out=None):
+        """Price several options in one multi-<Opt> OptionInfoRequest"""
+        print("\n" + "="*60, file=out)
+        print("TESTING BATCHED OPTION LOOKUP (MULTI-OPT)", file=out)
+        print("="*60, file=out)
+        
+        try:
+            with OptionInfoBatcher(self.client) as batcher:
+                results = batcher.option_info_many(
+                    USER_OPTION_CODES,
+                    info="GS",
+                    date_from="2024-01-01",
+                    date_to="2024-01-05",
+                    room_configs=USER_ROOM_CONFIGS
+                )
+                stats = batcher.stats()
+        except requests.exceptions.RequestException as e:
+            self.log_result("Batched Option Lookup", False, f"Request failed: {str(e)}", out=out)
+            return
+        
+        reply = results[0].reply
+        print(f"{stats['lookups']} lookups sent as {stats['requests']} request(s)", file=out)
+        for result in results:
+            print(f"  {'✅' if result.found else '❌'} {result.opt}", file=out)
+        
+        if reply.reply_type == "ErrorReply":
+            error_msg = reply.error or "Unknown error"
+            self.log_result("Batched Option Lookup", False, f"API Error: {error_msg}", reply.elapsed_ms, reply.phases, out=out)
+        elif reply.reply_type == "OptionInfoReply":
+            found = sum(1 for result in results if result.found)
+            self.log_result("Batched Option Lookup", True,
+                            f"{found}/{len(results)} options in {stats['requests']} round trip(s)", reply.elapsed_ms, reply.phases, out=out)
+        else:
+            self.log_result("Batched Option Lookup", False, "Unexpected response format", reply.elapsed_ms, reply.phases, out=out)
+    
+    def test_route_overhead(self, pairs=50):
+        """Paired direct vs local API OptionInfo calls: what the Next.js route adds"""
         print("\n" + "="*60)
-        print("XML STRUCTURE VALIDATION")
+        print("DIRECT VS LOCAL API OVERHEAD (PAIRED)")
         print("="*60)
         
+        benchmark = PairedOverhead(self.client)
+        benchmark.run(USER_OPTION_CODES, pairs=pairs, info="GS")
+        print(benchmark.table())
+        self.overhead_report = benchmark.summary()
+        
+        overhead = self.overhead_report['overhead'] if benchmark.pairs else None
+        if not benchmark.pairs:
+            self.log_result("Route Overhead", False, f"No pairs completed ({benchmark.errors} errors)")
+        elif not self.overhead_report['server_timing']:
+            self.log_result("Route Overhead", False, "Local API sent no Server-Timing header, overhead cannot be split")
+        else:
+            self.log_result("Route Overhead", True,
+                            f"{len(benchmark.pairs)} pairs, overhead p50: {overhead['p50_ms']}ms, "
+                            f"p99: {overhead['p99_ms']}ms, {benchmark.errors} errors")
+    
+    def validate_xml_structure(self, out=None):
+        """Validate the XML structure"""
+        print("\n" + "="*60, file=out)
+        print("XML STRUCTURE VALIDATION", file=out)
+        print("="*60, file=out)
+        
         xml_template = """<?xml version="1.0"?>
 <!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
 <Request>
@@ -244,13 +277,13 @@ class UserOptionInfoTester:
         
         try:
             dom = minidom.parseString(xml_template)
-            self.log_result("XML Structure Validation", True, "XML structure is valid")
+            self.log_result("XML Structure Validation", True, "XML structure is valid", out=out)
             
-            print("User's XML Template:")
-            print(self.pretty_print_xml(xml_template))
+            print("User's XML Template:", file=out)
+            print(format_xml(xml_template), file=out)
             
         except Exception as e:
-            self.log_result("XML Structure Validation", False, f"XML validation failed: {str(e)}")
+            self.log_result("XML Structure Validation", False, f"XML validation failed: {str(e)}", out=out)
     
     def generate_report(self):
         """Generate test report"""
@@ -258,23 +291,39 @@ class UserOptionInfoTester:
         print("USER OPTION INFO REQUEST TEST REPORT")
         print("="*60)
         
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result['success'])
-        failed_tests = total_tests - passed_tests
+        summary = self.results.summary
+        total_tests = summary.total
+        passed_tests = summary.passed
+        failed_tests = summary.failed
         
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests}")
         print(f"Failed: {failed_tests}")
         print(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%" if total_tests > 0 else "No tests run")
         print(f"Test Duration: {datetime.now() - self.start_time}")
+        print(self.client.connection_summary())
+        if self.client.cache is not None:
+            print(self.client.cache_summary())
+        print(f"Coalesced calls: {self.client.coalescing_stats()['coalesced']}")
+        if self.client.cassette is not None:
+            print(self.client.cassette_summary())
+        if self.client.router is not None:
+            print(self.client.router_summary())
+        if self.client.breakers is not None:
+            print(self.client.breaker_summary())
+        print(self.client.phase_stats.table())
+        if self.runner is not None:
+            print(self.runner.table())
         
         if failed_tests > 0:
             print(f"\nFailed Tests:")
-            for result in self.test_results:
-                if not result['success']:
-                    print(f"  ❌ {result['test']}: {result['message']}")
+            for failure in summary.recent_failures:
+                print(f"  ❌ {failure['test']}: {failure['message']}")
+            if failed_tests > len(summary.recent_failures):
+                print(f"  ... {failed_tests - len(summary.recent_failures)} earlier failures in {self.results.path}")
         
-        # Save detailed report
+        # Save detailed report (the individual results are read back from the JSONL file)
+        self.results.flush()
         report_data = {
             'summary': {
                 'total_tests': total_tests,
@@ -282,9 +331,20 @@ class UserOptionInfoTester:
                 'failed': failed_tests,
                 'success_rate': (passed_tests/total_tests)*100 if total_tests > 0 else 0,
                 'start_time': self.start_time.isoformat(),
-                'end_time': datetime.now().isoformat()
+                'end_time': datetime.now().isoformat(),
+                'connection_stats': self.client.connection_stats(),
+                'cache_stats': self.client.cache.stats() if self.client.cache is not None else None,
+                'coalescing_stats': self.client.coalescing_stats(),
+                'routing_stats': self.client.router.stats() if self.client.router is not None else None,
+                'breaker_stats': self.client.breakers.stats() if self.client.breakers is not None else None,
+                'timeout_stats': self.client.timeouts.stats() if self.client.timeouts is not None else None,
+                'phase_stats': self.client.phase_summary(),
+                'suite': self.runner.summary() if self.runner is not None else None
             },
-            'results': self.test_results
+            'results_file': self.results.path,
+            'results': list(read_results(self.results.path)),
+            'result_summary': summary.as_dict(),
+            'route_overhead': self.overhead_report
         }
         
         report_filename = f"user_option_info_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -318,11 +378,14 @@ class UserOptionInfoTester:
 </OptionInfoRequest>""")
         print("="*60)
         
-        # Run all test categories
-        self.validate_xml_structure()
-        self.test_user_xml_format_direct()
-        self.test_user_xml_via_local_api()
-        self.test_xml_variations()
+        # Run all test categories concurrently
+        self.runner = SuiteRunner()
+        self.runner.add("xml_structure", self.validate_xml_structure)
+        self.runner.add("user_xml_direct", self.test_user_xml_format_direct)
+        self.runner.add("user_xml_local_api", self.test_user_xml_via_local_api)
+        self.runner.add("xml_variations", self.test_xml_variations)
+        self.runner.add("batched_option_lookup", self.test_batched_option_lookup)
+        self.runner.run()
         
         # Generate final report
         self.generate_report()
@@ -349,8 +412,10 @@ def main():
     print("3. Local API test only")
     print("4. XML Variations test only")
     print("5. Full test suite (all tests)")
+    print("6. Batched multi-option lookup only")
+    print("7. Direct vs local API overhead (paired benchmark)")
     
-    choice = input("Enter choice (1-5) or press Enter for full suite: ").strip()
+    choice = input("Enter choice (1-7) or press Enter for full suite: ").strip()
     
     tester = UserOptionInfoTester()
     
@@ -363,6 +428,10 @@ def main():
         tester.test_user_xml_via_local_api()
     elif choice == "4":
         tester.test_xml_variations()
+    elif choice == "6":
+        tester.test_batched_option_lookup()
+    elif choice == "7":
+        tester.test_route_overhead()
     else:
         tester.run_all_tests()
     
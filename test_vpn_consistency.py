@@ -2,12 +2,12 @@ import requests
 import time
 from datetime import datetime
 
+from hostconnect import get_default_client
+
 def test_ip_consistency_detailed():
     """Test IP consistency and Tourplan response over multiple attempts"""
     
-    AGENT_ID = "SAMAGT"
-    PASSWORD = "S@MAgt01"  # You revealed this in your message
-    API_BASE_URL = "https://pa-thisis.nx.tourplan.net/hostconnect_test/api/hostConnectApi"
+    client = get_default_client()
     
     print("=== Testing IP Consistency & Tourplan Responses ===")
     
@@ -24,38 +24,22 @@ def test_ip_consistency_detailed():
             continue
         
         # Test Ping (should work)
-        ping_xml = """<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request><PingRequest/></Request>"""
-        
         try:
-            ping_response = requests.post(API_BASE_URL, data=ping_xml, 
-                                        headers={'Content-Type': 'text/xml'}, timeout=10)
-            ping_status = "✅ Working" if ping_response.status_code == 200 and "PingReply" in ping_response.text else "❌ Failed"
+            ping_response = client.ping(timeout=10)
+            ping_status = "✅ Working" if ping_response.status_code == 200 and ping_response.reply_type == "PingReply" else "❌ Failed"
             print(f"Ping test: {ping_status}")
         except Exception as e:
             print(f"Ping test: ❌ Error - {e}")
         
         # Test Authentication
-        auth_xml = f"""<?xml version="1.0"?>
-<!DOCTYPE Request SYSTEM "hostConnect_5_05_000.dtd">
-<Request>
-    <AgentInfoRequest>
-        <AgentID>{AGENT_ID}</AgentID>
-        <Password>{PASSWORD}</Password>
-        <ReturnAccountInfo>N</ReturnAccountInfo>
-    </AgentInfoRequest>
-</Request>"""
-        
         try:
-            auth_response = requests.post(API_BASE_URL, data=auth_xml, 
-                                        headers={'Content-Type': 'text/xml'}, timeout=10)
+            auth_response = client.agent_info(return_account_info=False, timeout=10)
             
-            if "AgentInfoReply" in auth_response.text:
+            if auth_response.reply_type == "AgentInfoReply":
                 auth_status = "✅ Success"
-            elif "2050" in auth_response.text:
+            elif auth_response.error_code == "2050":
                 auth_status = "❌ IP Not Whitelisted (Error 2050)"
-            elif "ErrorReply" in auth_response.text:
+            elif auth_response.reply_type == "ErrorReply":
                 auth_status = "❌ Other Error"
             else:
                 auth_status = f"❌ Unknown ({auth_response.status_code})"
@@ -67,5 +51,7 @@ def test_ip_consistency_detailed():
         
         if attempt < 4:  # Don't wait after the last attempt
             time.sleep(10)  # Wait 10 seconds between attempts
+    
+    print(f"\n{client.connection_summary()}")
 
 test_ip_consistency_detailed()
@@ -1,48 +1,16 @@
-import requests
+from hostconnect.config import EXPECTED_EGRESS_IP
+from hostconnect.egress import check_egress_ip, print_result
 
 def verify_exit_ip():
     """Verify the IP that external services actually see"""
     print("=== IP Verification (What External Services See) ===")
     
-    services = [
-        ('httpbin.org', 'https://httpbin.org/ip'),
-        ('ipify.org', 'https://api.ipify.org?format=json'),
-        ('whatismyipaddress.com', 'https://ipv4bot.whatismyipaddress.com/'),
-        ('ipinfo.io', 'https://ipinfo.io/json')
-    ]
+    # Asks every service at once and stops when enough of them agree
+    result = check_egress_ip(refresh=True)
+    print_result(result, EXPECTED_EGRESS_IP)
     
-    expected_ip = "84.46.231.251"
-    all_match = True
-    
-    for service_name, url in services:
-        try:
-            response = requests.get(url, timeout=10)
-            
-            if 'ipify' in url:
-                ip = response.json()['ip']
-            elif 'httpbin' in url:
-                ip = response.json()['origin']
-            elif 'whatismyipaddress' in url:
-                ip = response.text.strip()
-            elif 'ipinfo' in url:
-                data = response.json()
-                ip = data['ip']
-                print(f"{service_name}: {ip} (Location: {data.get('city', 'Unknown')}, ISP: {data.get('org', 'Unknown')})")
-                continue
-            else:
-                ip = response.text.strip()
-                
-            status = "✅" if ip == expected_ip else "❌"
-            print(f"{service_name}: {ip} {status}")
-            
-            if ip != expected_ip:
-                all_match = False
-                
-        except Exception as e:
-            print(f"{service_name}: Error - {e}")
-    
-    print(f"\nExpected IP: {expected_ip}")
-    print(f"All services match: {'✅ Yes' if all_match else '❌ No'}")
+    all_match = result.matches(EXPECTED_EGRESS_IP)
+    print(f"Services agree on expected IP: {'✅ Yes' if all_match else '❌ No'}")
     
     return all_match
 